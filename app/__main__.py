@@ -6,10 +6,26 @@ from app.run import main
 import logging
 import sys
 
+try:
+    # libuv 기반 이벤트 루프 (설치되지 않았거나 Windows면 기본 루프 사용)
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """uvloop(있으면) 이벤트 루프에 eager task factory를 적용하여 생성 (Python 3.12+)"""
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+        loop.set_task_factory(eager_task_factory)
+    return loop
+
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         print("Interrupted by user")
     except Exception:
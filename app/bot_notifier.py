@@ -4,19 +4,42 @@
 Telegram Bot API를 통해 개인 chat_id로 알림을 보내는 기능
 """
 
+import asyncio
 import aiohttp
 import logging
-import sys
-import os
 from typing import Optional, Dict, Any
-
-# 프로젝트 루트를 Python 경로에 추가
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from app.config import Settings
+from app.json_utils import dumps, loads
 
 logger = logging.getLogger("app.bot_notifier")
 
+# sendMessage 요청별 타임아웃 (응답 없는 소켓이 알림 루프를 막지 않도록)
+POST_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+JSON_HEADERS = {"Content-Type": "application/json"}
+# 봇별 동시 전송 수 (커넥터 limit_per_host와 맞춤)
+MAX_CONCURRENT_SENDS = 5
+
+
+class TelegramRateLimited(Exception):
+    """Bot API 429 응답 (_post 재시도 시 retry_after 만큼 대기)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"429 Too Many Requests (retry_after={retry_after}s)")
+        self.retry_after = retry_after
+
+
+_backoff = wait_exponential(multiplier=1, min=2, max=10)
+
+
+def _wait_retry_after(retry_state) -> float:
+    """429는 서버가 알려준 retry_after만큼, 그 외 오류는 지수 백오프로 대기"""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, TelegramRateLimited):
+        return exc.retry_after
+    return _backoff(retry_state)
+
 
 class BotNotifier:
     def __init__(self, settings: Settings):
@@ -25,6 +48,11 @@ class BotNotifier:
         self.important_bot_token = settings.important_bot_token
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
         self.important_base_url = f"https://api.telegram.org/bot{self.important_bot_token}" if self.important_bot_token else None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._send_sems = {
+            url: asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+            for url in (self.base_url, self.important_base_url) if url
+        }
         
         if not self.personal_chat_id:
             logger.warning("PERSONAL_CHAT_ID가 설정되지 않았습니다. 개인 알림 기능이 비활성화됩니다.")
@@ -32,116 +60,104 @@ class BotNotifier:
         if not self.important_bot_token:
             logger.warning("IMPORTANT_BOT_TOKEN이 설정되지 않았습니다. 중요 봇 알림 기능이 비활성화됩니다.")
     
-    def send_personal_notification(self, message: str, disable_notification: bool = False) -> bool:
-        """개인 DM으로 알림 메시지 전송"""
-        if not self.personal_chat_id:
-            logger.warning("개인 chat_id가 설정되지 않아 알림을 보낼 수 없습니다.")
-            return False
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """재사용 HTTP 세션 (api.telegram.org 연결 풀 유지)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=20, limit_per_host=MAX_CONCURRENT_SENDS, enable_cleanup_closed=True)
+            timeout = aiohttp.ClientTimeout(total=30, connect=5)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+    
+    async def aclose(self) -> None:
+        """HTTP 세션 종료"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_wait_retry_after,
+        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError, TelegramRateLimited)),
+        reraise=True,
+    )
+    async def _post(self, base_url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """sendMessage 호출 (네트워크 오류/5xx/429는 재시도, 그 밖의 4xx는 재시도 없이 ok=False 결과 반환)"""
+        session = await self._get_session()
+        async with self._send_sems[base_url]:
+            async with session.post(
+                f"{base_url}/sendMessage", data=dumps(payload), headers=JSON_HEADERS, timeout=POST_TIMEOUT
+            ) as response:
+                if response.status >= 500:
+                    response.raise_for_status()
+                result = loads(await response.read())
+            
+            if response.status == 429:
+                # 대기는 tenacity가 retry_after만큼 수행 (마지막 시도에서는 대기 없이 실패)
+                retry_after = result.get("parameters", {}).get("retry_after", 1)
+                logger.warning(f"⏳ Bot API 속도 제한: retry_after={retry_after}초")
+                raise TelegramRateLimited(retry_after)
         
+        if response.status != 200 and result.get("ok") is not False:
+            result = {"ok": False, "description": f"HTTP {response.status}"}
+        return result
+    
+    async def _send(self, base_url: str, payload: Dict[str, Any], label: str) -> bool:
+        """메시지 전송 후 결과 로깅"""
         try:
-            payload = {
-                "chat_id": self.personal_chat_id,
-                "text": message,
-                "parse_mode": "HTML",
-                "disable_notification": disable_notification
-            }
-            
-            response = requests.post(f"{self.base_url}/sendMessage", json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("ok"):
-                    logger.info(f"✅ 개인 알림 전송 성공: {self.personal_chat_id}")
-                    return True
-                else:
-                    logger.error(f"❌ 봇 API 오류: {result.get('description', 'Unknown error')}")
-                    return False
-            else:
-                logger.error(f"❌ HTTP 오류: {response.status_code}")
-                return False
-                
+            result = await self._post(base_url, payload)
+            if result.get("ok"):
+                logger.info(f"✅ {label} 전송 성공: {payload['chat_id']}")
+                return True
+            logger.error(f"❌ {label} API 오류: {result.get('description', 'Unknown error')}")
+            return False
         except Exception as e:
-            logger.error(f"❌ 개인 알림 전송 실패: {e}")
+            logger.error(f"❌ {label} 전송 실패: {e}")
             return False
     
+    def _payload(self, text: str, disable_notification: bool) -> Dict[str, Any]:
+        return {
+            "chat_id": self.personal_chat_id,
+            "text": text,
+            "parse_mode": "HTML",
+            "disable_notification": disable_notification
+        }
+    
+    async def send_personal_notification(self, message: str, disable_notification: bool = False) -> bool:
+        """개인 DM으로 알림 메시지 전송"""
+        if not self.personal_chat_id:
+            logger.warning("개인 chat_id가 설정되지 않아 알림을 보낼 수 없습니다.")
+            return False
+        return await self._send(self.base_url, self._payload(message, disable_notification), "개인 알림")
+    
     async def send_personal_html(self, html_content: str, disable_notification: bool = False) -> bool:
         """HTML 형식의 개인 DM 전송"""
         if not self.personal_chat_id:
             logger.warning("개인 chat_id가 설정되지 않아 알림을 보낼 수 없습니다.")
             return False
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "chat_id": self.personal_chat_id,
-                    "text": html_content,
-                    "parse_mode": "HTML",
-                    "disable_notification": disable_notification
-                }
-                
-                async with session.post(f"{self.base_url}/sendMessage", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get("ok"):
-                            logger.info(f"✅ 개인 HTML 알림 전송 성공: {self.personal_chat_id}")
-                            return True
-                        else:
-                            logger.error(f"❌ 봇 API 오류: {result.get('description', 'Unknown error')}")
-                            return False
-                    else:
-                        logger.error(f"❌ HTTP 오류: {response.status}")
-                        return False
-                        
-        except Exception as e:
-            logger.error(f"❌ 개인 HTML 알림 전송 실패: {e}")
-            return False
+        return await self._send(self.base_url, self._payload(html_content, disable_notification), "개인 HTML 알림")
     
     async def send_important_html(self, html_content: str, disable_notification: bool = False) -> bool:
-        """HTML 형식의 중요 봇 전송"""
+        """HTML 형식의 중요 봇 전송 (같은 개인 chat_id로 전송)"""
         if not self.important_bot_token or not self.important_base_url:
             logger.warning("중요 봇 토큰이 설정되지 않아 중요 알림을 보낼 수 없습니다.")
             return False
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "chat_id": self.personal_chat_id,  # 같은 개인 chat_id로 전송
-                    "text": html_content,
-                    "parse_mode": "HTML",
-                    "disable_notification": disable_notification
-                }
-                
-                async with session.post(f"{self.important_base_url}/sendMessage", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get("ok"):
-                            logger.info(f"✅ 중요 봇 HTML 알림 전송 성공: {self.personal_chat_id}")
-                            return True
-                        else:
-                            logger.error(f"❌ 중요 봇 API 오류: {result.get('description', 'Unknown error')}")
-                            return False
-                    else:
-                        logger.error(f"❌ 중요 봇 HTTP 오류: {response.status}")
-                        return False
-                        
-        except Exception as e:
-            logger.error(f"❌ 중요 봇 HTML 알림 전송 실패: {e}")
-            return False
+        return await self._send(self.important_base_url, self._payload(html_content, disable_notification), "중요 봇 HTML 알림")
     
     async def get_updates(self) -> Optional[Dict[str, Any]]:
         """봇 업데이트 확인 (chat_id 확보용)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/getUpdates") as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if result.get("ok"):
-                            return result
-                        else:
-                            logger.error(f"❌ 봇 API 오류: {result.get('description', 'Unknown error')}")
-                            return None
+            session = await self._get_session()
+            async with session.get(f"{self.base_url}/getUpdates") as response:
+                if response.status == 200:
+                    result = await response.json()
+                    if result.get("ok"):
+                        return result
                     else:
-                        logger.error(f"❌ HTTP 오류: {response.status}")
+                        logger.error(f"❌ 봇 API 오류: {result.get('description', 'Unknown error')}")
                         return None
+                else:
+                    logger.error(f"❌ HTTP 오류: {response.status}")
+                    return None
                         
         except Exception as e:
             logger.error(f"❌ 봇 업데이트 확인 실패: {e}")
@@ -179,7 +195,10 @@ async def setup_personal_chat_id(settings: Settings) -> Optional[str]:
     logger.info("봇에게 /start를 보내고 Enter를 눌러주세요.")
     #input("Enter를 눌러 계속...")
     
-    updates = await notifier.get_updates()
+    try:
+        updates = await notifier.get_updates()
+    finally:
+        await notifier.aclose()
     if updates:
         chat_id = notifier.extract_personal_chat_id(updates)
         if chat_id:
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import functools
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 
 from dotenv import load_dotenv
 
@@ -24,15 +25,27 @@ class Settings:
     openai_api_key: str
     openai_model: str
     upstage_api_key: str
+    llm_batch_size: int
+    llm_batch_wait_ms: int
+    llm_concurrency: int
+    llm_rpm: int
+    pipeline_concurrency: int
+    ocr_processes: int
+    enable_ocr: bool
+    enable_link_fetch: bool
 
     important_threshold: str
+    min_text_len: int
     dedup_similarity_threshold: float
     dedup_recent_minutes: int
+    dedup_embedding_dtype: str
 
     sqlite_path: str
 
 
+@functools.lru_cache(maxsize=1)
 def load_settings() -> Settings:
+    """환경변수에서 설정 로드 (프로세스당 한 번만 파싱, 이후 캐시 반환)"""
     load_dotenv()
 
     telegram_api_id = int(os.getenv("TELEGRAM_API_ID", "0"))
@@ -53,10 +66,30 @@ def load_settings() -> Settings:
     openai_api_key = os.getenv("OPENAI_API_KEY", "")
     openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     upstage_api_key = os.getenv("UPSTAGE_API_KEY", "")
+    # 1이면 메시지마다 개별 요청, 2 이상이면 동시에 도착한 메시지를 한 요청으로 묶음
+    llm_batch_size = max(1, int(os.getenv("LLM_BATCH_SIZE", "1")))
+    llm_batch_wait_ms = int(os.getenv("LLM_BATCH_WAIT_MS", "200"))
+    # 동시에 진행할 LLM API 호출 수 (속도 제한에 맞춰 조정)
+    llm_concurrency = max(1, int(os.getenv("LLM_CONCURRENCY", "8")))
+    # 분당 LLM API 요청 수 상한 (0이면 제한 없음)
+    llm_rpm = max(0, int(os.getenv("LLM_RPM", "500")))
+    # 동시에 처리할 메시지 수 (OCR/링크/LLM 대기를 겹치되 메모리와 API 사용량을 제한)
+    pipeline_concurrency = max(1, int(os.getenv("PIPELINE_CONCURRENCY", "8")))
+    # CPU OCR을 실행할 워커 프로세스 수 (0이면 봇 프로세스의 스레드에서 실행, GPU 사용 시 무시)
+    ocr_processes = max(0, int(os.getenv("OCR_PROCESSES", "2")))
+    # 0이면 이미지 OCR / 링크 본문 가져오기를 건너뜀 (OCR 끄면 EasyOCR 모델도 로드하지 않음)
+    enable_ocr = os.getenv("ENABLE_OCR", "1").strip().lower() not in ("0", "false", "no")
+    enable_link_fetch = os.getenv("ENABLE_LINK_FETCH", "1").strip().lower() not in ("0", "false", "no")
 
     important_threshold = os.getenv("IMPORTANT_THRESHOLD", "low").lower()
+    # 이보다 짧은 텍스트 전용 메시지는 임베딩/DB/LLM 처리 없이 버림
+    min_text_len = int(os.getenv("MIN_TEXT_LEN", "12"))
     dedup_similarity_threshold = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.85"))
     dedup_recent_minutes = int(os.getenv("DEDUP_RECENT_MINUTES", "360"))
+    # 중복 검사용 임베딩 캐시 정밀도: float32 | float16 | int8
+    dedup_embedding_dtype = os.getenv("DEDUP_EMBEDDING_DTYPE", "float32").strip().lower()
+    if dedup_embedding_dtype not in ("float32", "float16", "int8"):
+        raise ValueError(f"DEDUP_EMBEDDING_DTYPE는 float32, float16, int8 중 하나여야 합니다: {dedup_embedding_dtype!r}")
 
     sqlite_path = os.getenv("SQLITE_PATH", "data/db.sqlite3")
 
@@ -73,16 +106,31 @@ def load_settings() -> Settings:
         openai_api_key=openai_api_key,
         openai_model=openai_model,
         upstage_api_key=upstage_api_key,
+        llm_batch_size=llm_batch_size,
+        llm_batch_wait_ms=llm_batch_wait_ms,
+        llm_concurrency=llm_concurrency,
+        llm_rpm=llm_rpm,
+        pipeline_concurrency=pipeline_concurrency,
+        ocr_processes=ocr_processes,
+        enable_ocr=enable_ocr,
+        enable_link_fetch=enable_link_fetch,
         important_threshold=important_threshold,
+        min_text_len=min_text_len,
         dedup_similarity_threshold=dedup_similarity_threshold,
         dedup_recent_minutes=dedup_recent_minutes,
+        dedup_embedding_dtype=dedup_embedding_dtype,
         sqlite_path=sqlite_path,
     )
 
 
+def reload_settings() -> Settings:
+    """설정 캐시를 비우고 다시 로드합니다."""
+    load_settings.cache_clear()
+    return load_settings()
+
+
 def load_source_channels() -> List[str]:
-    """SOURCE_CHANNELS를 동적으로 로드합니다."""
-    load_dotenv()
+    """SOURCE_CHANNELS를 동적으로 로드합니다. (.env는 load_settings에서 이미 로드됨)"""
     source_channels_raw = os.getenv("SOURCE_CHANNELS", "").strip()
     return [s.strip() for s in source_channels_raw.split(",") if s.strip()]
 
@@ -131,60 +179,54 @@ def get_channel_username(channel_id: str) -> Optional[str]:
         return channel_id
 
 
+ENV_PATH = ".env"
+
+
+def _read_env_lines(env_path: str = ENV_PATH) -> List[str]:
+    """.env 파일의 모든 라인을 읽습니다."""
+    with open(env_path, 'r', encoding='utf-8') as f:
+        return f.readlines()
+
+
+def _write_env_lines(lines: List[str], env_path: str = ENV_PATH) -> None:
+    """임시 파일에 쓴 뒤 os.replace로 교체 (중간에 실패해도 .env가 깨지지 않음)"""
+    tmp_path = f"{env_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, env_path)
+
+
+def _parse_source_channels(lines: List[str]) -> Tuple[Optional[int], Set[str], List[str]]:
+    """SOURCE_CHANNELS 라인 위치, 채널 집합(멤버십 확인용), 채널 목록(순서 유지용) 반환"""
+    for i, line in enumerate(lines):
+        if line.strip().startswith("SOURCE_CHANNELS="):
+            channel_list = [s.strip() for s in line.split("=", 1)[1].split(",") if s.strip()]
+            return i, set(channel_list), channel_list
+    return None, set(), []
+
+
 def add_source_channel(channel_id: str) -> bool:
     """새로운 채널을 SOURCE_CHANNELS에 추가합니다."""
-    import re
-    
-    # .env 파일 경로
-    env_path = ".env"
-    
     try:
-        # 현재 .env 파일 읽기
-        with open(env_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        lines = _read_env_lines()
+        line_index, channel_set, channel_list = _parse_source_channels(lines)
         
-        # SOURCE_CHANNELS 라인 찾기
-        source_channels_line_index = None
-        for i, line in enumerate(lines):
-            if line.strip().startswith("SOURCE_CHANNELS="):
-                source_channels_line_index = i
-                break
+        # @username 형태 우선으로 추가
+        username_form = get_channel_username(channel_id)
         
-        if source_channels_line_index is not None:
-            # 기존 SOURCE_CHANNELS 라인 업데이트
-            current_line = lines[source_channels_line_index]
-            current_channels = current_line.split("=", 1)[1].strip()
-            
-            # 채널 ID가 이미 있는지 확인 (숫자 ID와 @username 모두 체크)
-            channel_list = [s.strip() for s in current_channels.split(",") if s.strip()]
-            
-            # 숫자 ID가 이미 있는지 확인
-            if channel_id in channel_list:
-                return False  # 이미 존재함
-            
-            # @username 형태로 변환 시도
-            username_form = get_channel_username(channel_id)
-            
-            # @username 형태가 이미 있는지 확인
-            if username_form in channel_list:
-                return False  # 이미 존재함
-            
-            # 새 채널 추가 (@username 형태 우선)
-            if current_channels:
-                new_channels = f"{current_channels},{username_form}"
-            else:
-                new_channels = username_form
-            
-            lines[source_channels_line_index] = f"SOURCE_CHANNELS={new_channels}\n"
+        # 숫자 ID와 @username 모두 체크
+        if channel_id in channel_set or username_form in channel_set:
+            return False  # 이미 존재함
+        
+        channel_list.append(username_form)
+        new_line = f"SOURCE_CHANNELS={','.join(channel_list)}\n"
+        if line_index is not None:
+            lines[line_index] = new_line
         else:
             # SOURCE_CHANNELS 라인이 없으면 새로 추가
-            username_form = get_channel_username(channel_id)
-            lines.append(f"SOURCE_CHANNELS={username_form}\n")
-        
-        # .env 파일 업데이트
-        with open(env_path, 'w', encoding='utf-8') as f:
-            f.writelines(lines)
+            lines.append(new_line)
         
+        _write_env_lines(lines)
         return True
         
     except Exception as e:
@@ -194,55 +236,20 @@ def add_source_channel(channel_id: str) -> bool:
 
 def remove_source_channel(channel_id: str) -> bool:
     """채널을 SOURCE_CHANNELS에서 제거합니다."""
-    import re
-    
-    # .env 파일 경로
-    env_path = ".env"
-    
     try:
-        # 현재 .env 파일 읽기
-        with open(env_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # SOURCE_CHANNELS 라인 찾기
-        source_channels_line_index = None
-        for i, line in enumerate(lines):
-            if line.strip().startswith("SOURCE_CHANNELS="):
-                source_channels_line_index = i
-                break
-        
-        if source_channels_line_index is None:
-            return False  # SOURCE_CHANNELS 라인이 없음
+        lines = _read_env_lines()
+        line_index, channel_set, channel_list = _parse_source_channels(lines)
         
-        # 기존 SOURCE_CHANNELS 라인 업데이트
-        current_line = lines[source_channels_line_index]
-        current_channels = current_line.split("=", 1)[1].strip()
+        if line_index is None or channel_id not in channel_set:
+            return False  # SOURCE_CHANNELS 라인이 없거나 존재하지 않음
         
-        # 채널 ID가 있는지 확인
-        if channel_id not in current_channels:
-            return False  # 존재하지 않음
-        
-        # 채널 제거
-        channel_list = [s.strip() for s in current_channels.split(",") if s.strip()]
-        if channel_id in channel_list:
-            channel_list.remove(channel_id)
-        
-        # 새로운 SOURCE_CHANNELS 라인 생성
-        if channel_list:
-            new_channels = ",".join(channel_list)
-            lines[source_channels_line_index] = f"SOURCE_CHANNELS={new_channels}\n"
-        else:
-            # 모든 채널이 제거된 경우 빈 문자열로 설정
-            lines[source_channels_line_index] = f"SOURCE_CHANNELS=\n"
-        
-        # .env 파일 업데이트
-        with open(env_path, 'w', encoding='utf-8') as f:
-            f.writelines(lines)
+        channel_list = [c for c in channel_list if c != channel_id]
+        # 모든 채널이 제거된 경우 빈 문자열로 설정
+        lines[line_index] = f"SOURCE_CHANNELS={','.join(channel_list)}\n"
         
+        _write_env_lines(lines)
         return True
         
     except Exception as e:
         print(f"SOURCE_CHANNELS 제거 실패: {e}")
         return False
-
-
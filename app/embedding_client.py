@@ -1,14 +1,35 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
-import numpy as np
-from typing import List, Optional
-import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from collections import OrderedDict
+from typing import List, Optional, Set, Tuple
+import aiohttp
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from app.json_utils import dumps, loads
 
 logger = logging.getLogger("app.embedding")
 
+_numpy = None
+
+
+def _np():
+    """numpy 지연 로드 (유사도 계산 시점에만 import)"""
+    global _numpy
+    if _numpy is None:
+        import numpy
+        _numpy = numpy
+    return _numpy
+
+
+# 배치 요청 설정
+BATCH_MAX = 64
+BATCH_WAIT_MS = 15
+# 동일 텍스트 임베딩 캐시 크기 (여러 채널에 같은 메시지가 포워딩되는 경우 API 호출 생략)
+EMBEDDING_CACHE_SIZE = 4096
+
 
 class UpstageEmbeddingClient:
     def __init__(self, api_key: str):
@@ -18,67 +39,198 @@ class UpstageEmbeddingClient:
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pending: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()  # 응답 대기 중인 배치 요청
+        self._cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """재사용 HTTP 세션 (keep-alive 연결 풀)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=32, limit_per_host=16)
+            timeout = aiohttp.ClientTimeout(total=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers)
+        return self._session
+    
+    async def aclose(self) -> None:
+        """배치 작업 및 HTTP 세션 종료"""
+        if self._batch_task is not None and not self._batch_task.done():
+            self._batch_task.cancel()
+        self._batch_task = None
+        for task in self._inflight:
+            task.cancel()
+        self._inflight.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _prepare_text(self, text: str) -> Optional[str]:
+        """임베딩 요청 전 텍스트 검증 및 길이 제한"""
+        # 텍스트가 비어있거나 너무 짧은 경우 처리
+        if not text or len(text.strip()) < 3:
+            logger.warning(f"텍스트가 너무 짧음: '{text}'")
+            return None
+        
+        # 텍스트 길이 제한 (API 제한 고려)
+        if len(text) > 8000:
+            text = text[:8000]
+            logger.warning(f"텍스트가 너무 길어서 잘림: {len(text)}자")
+        
+        return text.strip()
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def get_embedding(self, text: str) -> Optional[List[float]]:
-        """텍스트의 임베딩 벡터를 가져옵니다."""
-        try:
-            # 텍스트가 비어있거나 너무 짧은 경우 처리
-            if not text or len(text.strip()) < 3:
-                logger.warning(f"텍스트가 너무 짧음: '{text}'")
-                return None
-            
-            # 텍스트 길이 제한 (API 제한 고려)
-            if len(text) > 8000:
-                text = text[:8000]
-                logger.warning(f"텍스트가 너무 길어서 잘림: {len(text)}자")
-            
-            payload = {
-                "input": text.strip(),
-                "model": "embedding-query"  # Upstage.ai 지원 모델명
-            }
-            
-            logger.debug(f"임베딩 요청: 모델={payload['model']}, 텍스트 길이={len(text)}")
-            
-            # 비동기로 requests 실행
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                lambda: requests.post(
-                    self.base_url, 
-                    json=payload, 
-                    headers=self.headers,
-                    timeout=30
-                )
-            )
+        """텍스트의 임베딩 벡터를 가져옵니다. (동시 요청은 배치로 묶어 전송)"""
+        prepared = self._prepare_text(text)
+        if prepared is None:
+            return None
+        
+        key = hashlib.blake2b(prepared.encode("utf-8"), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            logger.debug("임베딩 캐시 적중")
+            return cached
+        
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.create_task(self._batch_worker())
+        
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._pending.put((prepared, future))
+        embedding = await future
+        
+        if embedding is not None:
+            self._cache[key] = embedding
+            if len(self._cache) > EMBEDDING_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return embedding
+    
+    async def get_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """여러 텍스트의 임베딩을 한 번의 요청으로 가져옵니다. (입력 순서 유지)"""
+        prepared = [self._prepare_text(text) for text in texts]
+        valid = [text for text in prepared if text is not None]
+        if not valid:
+            return [None] * len(texts)
+        
+        results: List[Optional[List[float]]] = []
+        for i in range(0, len(valid), BATCH_MAX):
+            chunk = valid[i:i + BATCH_MAX]
+            try:
+                embeddings = await self._request_embeddings(chunk)
+            except Exception as e:
+                logger.error(f"임베딩 생성 실패: {e}")
+                embeddings = None
+            results.extend(embeddings if embeddings else [None] * len(chunk))
+        
+        it = iter(results)
+        return [next(it) if text is not None else None for text in prepared]
+    
+    async def _batch_worker(self) -> None:
+        """대기 중인 get_embedding 요청을 모아 한 번에 전송"""
+        loop = asyncio.get_running_loop()
+        while True:
+            text, future = await self._pending.get()
+            batch = [(text, future)]
+            deadline = loop.time() + BATCH_WAIT_MS / 1000
+            while len(batch) < BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
             
+            # 대기 중 취소된 요청 (추측 실행 후 버려진 임베딩 등)은 전송하지 않음
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+            # 응답을 기다리는 동안 다음 배치를 모을 수 있도록 전송은 별도 태스크로 수행
+            task = asyncio.create_task(self._dispatch_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+    
+    async def _dispatch_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """배치 요청을 전송하고 각 요청의 future에 결과 전달"""
+        try:
+            embeddings = await self._request_embeddings([item[0] for item in batch])
+        except asyncio.CancelledError:
+            for _, fut in batch:
+                fut.cancel()
+            raise
+        except Exception as e:
+            # 재시도까지 실패한 경우 이 배치의 요청은 모두 None
+            logger.error(f"임베딩 생성 실패: {e}")
+            embeddings = None
+        for i, (_, fut) in enumerate(batch):
+            if not fut.done():
+                fut.set_result(embeddings[i] if embeddings else None)
+    
+    @retry(
+        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        reraise=True,
+    )
+    async def _request_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """임베딩 API 호출 (여러 입력을 한 요청으로, 네트워크 오류/429/5xx는 예외로 올려 재시도)"""
+        payload = {
+            "input": texts,
+            "model": "embedding-query"  # Upstage.ai 지원 모델명
+        }
+        
+        logger.debug(f"임베딩 요청: 모델={payload['model']}, 입력 {len(texts)}개")
+        
+        session = await self._get_session()
+        async with session.post(self.base_url, data=dumps(payload)) as response:
             # 응답 상태 코드 확인
-            if response.status_code == 400:
-                logger.error(f"API 요청 형식 오류: {response.text}")
+            if response.status == 429 or response.status >= 500:
+                logger.warning(f"API 요청 실패 (재시도): HTTP {response.status}")
+                response.raise_for_status()
+            
+            if response.status == 400:
+                logger.error(f"API 요청 형식 오류: {await response.text()}")
                 logger.error(f"요청 페이로드: {payload}")
                 return None
             
-            response.raise_for_status()
-            data = response.json()
-            
-            if "data" in data and len(data["data"]) > 0:
-                embedding = data["data"][0]["embedding"]
-                logger.debug(f"임베딩 생성 성공: {len(embedding)}차원 벡터")
-                return embedding
-            else:
-                logger.error(f"임베딩 응답 형식 오류: {data}")
+            if response.status >= 400:
+                logger.error(f"API 요청 실패: HTTP {response.status}")
+                logger.error(f"응답 내용: {await response.text()}")
                 return None
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API 요청 실패: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"응답 내용: {e.response.text}")
-            return None
-        except Exception as e:
-            logger.error(f"임베딩 생성 실패: {e}")
+            
+            data = loads(await response.read())
+        
+        if "data" in data and len(data["data"]) == len(texts):
+            # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준으로 정렬
+            items = sorted(data["data"], key=lambda item: item.get("index", 0))
+            embeddings = [self._to_unit_vector(item["embedding"]) for item in items]
+            logger.debug(f"임베딩 생성 성공: {len(embeddings)}개, {len(embeddings[0])}차원 벡터")
+            return embeddings
+        else:
+            logger.error(f"임베딩 응답 형식 오류: {data}")
             return None
     
+    def _to_unit_vector(self, embedding: List[float]) -> List[float]:
+        """임베딩을 L2 단위 벡터로 정규화 (이후 코사인 유사도는 내적만으로 계산)"""
+        np = _np()
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector /= (np.linalg.norm(vector) + 1e-12)
+        return vector.tolist()
+    
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """두 벡터 간의 코사인 유사도를 계산합니다."""
+        """두 단위 벡터 간의 코사인 유사도 (get_embedding 결과는 이미 정규화되어 있음)"""
+        np = _np()
+        try:
+            return float(np.dot(np.asarray(vec1, dtype=np.float32), np.asarray(vec2, dtype=np.float32)))
+        except Exception as e:
+            logger.error(f"코사인 유사도 계산 실패: {e}")
+            return 0.0
+    
+    def cosine_similarity_raw(self, vec1: List[float], vec2: List[float]) -> float:
+        """정규화되지 않은 두 벡터 간의 코사인 유사도를 계산합니다."""
+        np = _np()
         try:
             vec1_array = np.array(vec1)
             vec2_array = np.array(vec2)
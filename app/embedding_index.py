@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.similarity_kernel import first_above, warm_up
+
+
+def normalize(embedding: Sequence[float]) -> np.ndarray:
+    """float32 단위 벡터로 변환 (코사인 유사도 = 내적)"""
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def quantize_int8(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+    """행 단위 스케일을 사용한 int8 양자화 (vector ≈ q * scale)"""
+    scale = float(np.abs(vector).max()) / 127 or 1.0
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+class RecentEmbeddingIndex:
+    """최근 메시지 임베딩을 단위 벡터 (N, D) 링 버퍼로 보관하는 중복 검사용 캐시
+
+    dtype은 float32(기본), float16, int8(행별 스케일) 중 선택하며
+    float16/int8은 메모리 사용량과 스캔 대역폭을 각각 1/2, 1/4로 줄인다.
+    """
+
+    def __init__(self, capacity: int = 1000, dtype: str = "float32") -> None:
+        if dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"지원하지 않는 임베딩 dtype: {dtype}")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._scales = np.ones(capacity, dtype=np.float32)  # int8 행별 스케일 (float 타입은 1)
+        self._date_ts = np.full(capacity, -1, dtype=np.int64)
+        self._keys: List[Optional[Tuple[int, int]]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reset(self, dim: int) -> None:
+        self._matrix = np.zeros((self.capacity, dim), dtype=self.dtype)
+        self._scales.fill(1.0)
+        warm_up(self.dtype.name, dim)
+        self._date_ts.fill(-1)
+        self._keys = [None] * self.capacity
+        self._next = 0
+        self._size = 0
+
+    def add(self, chat_id: int, message_id: int, date_ts: int, embedding: Sequence[float]) -> None:
+        """임베딩 추가 (용량 초과 시 가장 오래된 항목을 덮어씀)"""
+        vector = normalize(embedding)
+        with self._lock:
+            self._add_locked(chat_id, message_id, date_ts, vector)
+
+    def _add_locked(self, chat_id: int, message_id: int, date_ts: int, vector: np.ndarray) -> None:
+        if vector.ndim != 1 or vector.size == 0:
+            return
+        # 차원이 바뀌면(모델 변경 등) 기존 캐시는 비교 불가하므로 초기화
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            self._reset(vector.shape[0])
+
+        slot = self._next
+        if self.dtype == np.int8:
+            self._matrix[slot], self._scales[slot] = quantize_int8(vector)
+        else:
+            self._matrix[slot] = vector
+        self._date_ts[slot] = date_ts
+        self._keys[slot] = (chat_id, message_id)
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def search(
+        self,
+        embedding: Sequence[float],
+        since_ts: int,
+        threshold: float,
+    ) -> Optional[Tuple[int, int, float]]:
+        """since_ts 이후 항목 중 임계값 이상인 첫 (chat_id, message_id, similarity) 반환"""
+        query = normalize(embedding)
+        with self._lock:
+            return self._search_locked(query, since_ts, threshold)
+
+    def search_or_add(
+        self,
+        chat_id: int,
+        message_id: int,
+        date_ts: int,
+        embedding: Sequence[float],
+        since_ts: int,
+        threshold: float,
+    ) -> Optional[Tuple[int, int, float]]:
+        """search()와 같되 유사 항목이 없으면 이 임베딩을 바로 추가 (검사와 추가를 한 잠금 안에서 수행)"""
+        vector = normalize(embedding)
+        with self._lock:
+            hit = self._search_locked(vector, since_ts, threshold)
+            if hit is None:
+                self._add_locked(chat_id, message_id, date_ts, vector)
+            return hit
+
+    def _search_locked(self, query: np.ndarray, since_ts: int, threshold: float) -> Optional[Tuple[int, int, float]]:
+        if self._size == 0 or self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+            return None
+
+        n = self._size
+        hit = first_above(self._matrix[:n], query, self._scales[:n], self._date_ts[:n], since_ts, threshold)
+        if hit < 0:
+            return None
+
+        similarity = float(self._matrix[hit].astype(np.float32) @ query) * float(self._scales[hit])
+        chat_id, message_id = self._keys[hit]
+        return chat_id, message_id, similarity
@@ -1,28 +1,43 @@
 from __future__ import annotations
 
+import functools
 from html import escape
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import logging
 
 
+# 중요도별 (제목 템플릿, 본문 템플릿)
+_IMPORTANCE_STYLES = {
+    "high": ("<b>🚨🔥 {}</b>", "<blockquote><b>{}</b></blockquote>"),
+    "medium": ("<b>⚡ {}</b>", "<blockquote>{}</blockquote>"),
+    "low": ("<b>📝 {}</b>", "<blockquote>{}</blockquote>"),
+}
+
+
 def build_original_link(chat_id: int, message_id: int, is_public: bool, username: Optional[str], internal_id: Optional[int]) -> str:
     logger = logging.getLogger("app.formatter")
     
-    logger.info(f"링크 생성: chat_id={chat_id}, msg_id={message_id}, is_public={is_public}, username={username}, internal_id={internal_id}")
+    logger.debug(
+        "링크 생성: chat_id=%s, msg_id=%s, is_public=%s, username=%s, internal_id=%s",
+        chat_id, message_id, is_public, username, internal_id,
+    )
     
     if is_public and username:
         link = f"https://t.me/{username}/{message_id}"
-        logger.info(f"공개 채널 링크 생성: {link}")
+        logger.debug("공개 채널 링크 생성: %s", link)
         return link
     
     if internal_id is not None:
         # private channel: t.me/c/<internal_id>/<msg_id>
         link = f"https://t.me/c/{internal_id}/{message_id}"
-        logger.info(f"비공개 채널 링크 생성: {link}")
+        logger.debug("비공개 채널 링크 생성: %s", link)
         return link
     
     # 링크를 생성할 수 없는 경우
-    logger.warning(f"링크 생성 실패: chat_id={chat_id}, msg_id={message_id}, is_public={is_public}, username={username}, internal_id={internal_id}")
+    logger.warning(
+        "링크 생성 실패: chat_id=%s, msg_id=%s, is_public=%s, username=%s, internal_id=%s",
+        chat_id, message_id, is_public, username, internal_id,
+    )
     return ""
 
 
@@ -42,97 +57,119 @@ def format_html(
     original_snippet: Optional[str] = None,
     extracted_links: Optional[List[str]] = None,
 ) -> str:
-    imp_emoji = {
-        "high": "🚨🔥",
-        "medium": "⚡",
-        "low": "📝",
-    }.get(importance, "📝")
-    
+    # dict/list 인자를 해시 가능한 값으로 투영하여 캐시된 조립 함수 호출
+    image_desc = image_content.get("description", "") if image_content else None
+    link_info = (link_content.get("title", ""), link_content.get("domain", "")) if link_content else None
+    forward = (
+        (
+            forward_info.get("forward_channel"),
+            forward_info.get("original_channel"),
+            forward_info.get("current_time"),
+            forward_info.get("original_time"),
+        )
+        if forward_info
+        else None
+    )
+    return _assemble_html(
+        source_title,
+        summary,
+        importance,
+        tuple(categories) if categories else (),
+        tuple(tags) if tags else (),
+        money_making_info,
+        action_guide,
+        event_products,
+        original_link,
+        image_desc,
+        link_info,
+        forward,
+        tuple(extracted_links) if extracted_links else (),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _assemble_html(
+    source_title: str,
+    summary: str,
+    importance: str,
+    categories: Tuple[str, ...],
+    tags: Tuple[str, ...],
+    money_making_info: str,
+    action_guide: str,
+    event_products: str,
+    original_link: str,
+    image_desc: Optional[str],
+    link_info: Optional[Tuple[str, str]],
+    forward: Optional[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]],
+    extracted_links: Tuple[str, ...],
+) -> str:
+    """format_html 본문 조립 (순수 함수, 같은 메시지를 다시 렌더링하면 캐시 사용)"""
     # 제목과 본문, 링크는 스타일 적용 전에 이스케이프 처리하여 준비
     title = escape(source_title)
     body = escape(summary)
     original_link_escaped = escape(original_link)
 
     # 중요도별 스타일 적용
-    if importance == "high":
-        title_style = f"<b>🚨🔥 {title}</b>"
-        body_style = f"<blockquote><b>{body}</b></blockquote>"
-    elif importance == "medium":
-        title_style = f"<b>⚡ {title}</b>"
-        body_style = f"<blockquote>{body}</blockquote>"
-    else:
-        title_style = f"<b>📝 {title}</b>"
-        body_style = f"<blockquote>{body}</blockquote>"
+    title_tmpl, body_tmpl = _IMPORTANCE_STYLES.get(importance, _IMPORTANCE_STYLES["low"])
+    title_style = title_tmpl.format(title)
+    body_style = body_tmpl.format(body)
 
     cats = ", ".join(categories) if categories else "-"
     tag_str = ", ".join(tags) if tags else "-"
 
-    html = (
-        f"{title_style}\n"
-        f"{body_style}\n"
-    )
+    parts = [title_style, "\n", body_style, "\n"]
 
     # # 원문 일부 추가(요청 사항)
     # if original_snippet:
     #     snippet = escape(original_snippet)
-    #     html += f"<b>원문 일부:</b>\n<blockquote>{snippet}</blockquote>\n"
+    #     parts.append(f"<b>원문 일부:</b>\n<blockquote>{snippet}</blockquote>\n")
 
-    html += (
-        f"<b>Categories:</b> {cats}\n"
-        f"<b>Tags:</b> {tag_str}\n"
-    )
+    parts.append(f"<b>Categories:</b> {cats}\n")
+    parts.append(f"<b>Tags:</b> {tag_str}\n")
     
     # 돈 버는 정보와 행동 가이드 추가
     if money_making_info and money_making_info != "없음":
         money_info = escape(money_making_info)
         action = escape(action_guide)
-        html += f"<b>💰 돈 버는 정보:</b> {money_info}\n"
-        html += f"<b>🎯 행동 가이드:</b> {action}\n"
+        parts.append(f"<b>💰 돈 버는 정보:</b> {money_info}\n")
+        parts.append(f"<b>🎯 행동 가이드:</b> {action}\n")
     
     # 이벤트 상품 정보 추가
     if event_products and event_products != "없음":
         products = escape(event_products)
-        html += f"<b>🎁 이벤트 상품:</b> {products}\n"
+        parts.append(f"<b>🎁 이벤트 상품:</b> {products}\n")
     
     # 이미지 정보 추가
-    if image_content:
-        img_desc = escape(image_content.get("description", ""))
-        html += f"<b>📷 이미지:</b> {img_desc}\n"
+    if image_desc is not None:
+        parts.append(f"<b>📷 이미지:</b> {escape(image_desc)}\n")
     
     # 링크 정보 추가
-    if link_content:
-        link_title = escape(link_content.get("title", "")[:100])
-        link_domain = escape(link_content.get("domain", ""))
-        html += f"<b>🔗 링크:</b> {link_title}\n"
-        html += f"<b>🌐 도메인:</b> {link_domain}\n"
+    if link_info is not None:
+        link_title, link_domain = link_info
+        parts.append(f"<b>🔗 링크:</b> {escape(link_title[:100])}\n")
+        parts.append(f"<b>🌐 도메인:</b> {escape(link_domain)}\n")
     
     # 추출된 링크 목록 추가
     if extracted_links:
-        html += f"<b>🔗 포함된 링크:</b>\n"
+        parts.append(f"<b>🔗 포함된 링크:</b>\n")
         for i, extracted_link in enumerate(extracted_links, 1):
             # 링크를 클릭 가능한 형태로 표시
-            html += f"{i}. <a href=\"{extracted_link}\">{escape(extracted_link)}</a>\n"
+            parts.append(f"{i}. <a href=\"{extracted_link}\">{escape(extracted_link)}</a>\n")
     
     # 포워드 정보 추가
-    if forward_info:
-        forward_channel = forward_info.get("forward_channel")
-        original_channel = forward_info.get("original_channel")
+    if forward is not None:
+        forward_channel, original_channel, current_time, original_time = forward
         
         if forward_channel and original_channel:
             # 포워드 메시지인 경우
-            html += f"<b>📤 포워드:</b> {escape(forward_channel)} → {escape(original_channel)}\n"
+            parts.append(f"<b>📤 포워드:</b> {escape(forward_channel)} → {escape(original_channel)}\n")
         
         # 시간 정보 추가 (포워드/일반 메시지 모두)
-        current_time = forward_info.get("current_time")
-        original_time = forward_info.get("original_time")
-        
         if current_time:
-            html += f"<b>📅 작성시간:</b> {escape(current_time)}\n"
+            parts.append(f"<b>📅 작성시간:</b> {escape(current_time)}\n")
         if original_time:
-            html += f"<b>📅 원본 작성시간:</b> {escape(original_time)}\n"
+            parts.append(f"<b>📅 원본 작성시간:</b> {escape(original_time)}\n")
     
     if original_link_escaped:
-        html += f"<a href=\"{original_link_escaped}\">원문 열기</a>"
-    return html
-
-
+        parts.append(f"<a href=\"{original_link_escaped}\">원문 열기</a>")
+    return "".join(parts)
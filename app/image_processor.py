@@ -1,29 +1,173 @@
 from __future__ import annotations
 
 import asyncio
-import io
+import functools
 import logging
-from typing import Optional
-from PIL import Image
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+import cv2
 import easyocr
+import numpy as np
 
 logger = logging.getLogger("app.image")
 
+# OCR 입력 이미지의 최대 변 길이 (초과 시 비율 유지 축소)
+MAX_IMAGE_SIDE = 2000
+
+# 텍스트가 없는 이미지의 분석 결과 (읽기 전용 공유 객체)
+_NO_TEXT_RESULT = MappingProxyType({
+    "content_type": "image",
+    "description": "텍스트가 없는 이미지",
+    "summary": "이미지 파일"
+})
+
+# 간단한 키워드 기반 분석용 카테고리별 키워드
+_IMAGE_KEYWORDS = {
+    "가격": ["가격", "price", "cost", "원", "$", "₩"],
+    "차트": ["차트", "chart", "그래프", "graph", "candle"],
+    "뉴스": ["뉴스", "news", "발표", "announcement"],
+    "이벤트": ["이벤트", "event", "프로모션", "promotion"],
+    "코인": ["코인", "coin", "토큰", "token", "btc", "eth"],
+    "거래": ["거래", "trade", "매수", "매도", "buy", "sell"]
+}
+_ASCII_WORD_RE = re.compile(r"[a-z0-9]+(?: [a-z0-9]+)*")
+
+
+def _keyword_pattern(word: str) -> str:
+    """영문 단어 키워드는 단어 경계로 매치 ("token"이 "tokenization"에 걸리지 않도록), 한글/기호는 부분 문자열"""
+    word = word.lower()
+    if _ASCII_WORD_RE.fullmatch(word):
+        return rf"(?<![a-z0-9]){re.escape(word)}(?![a-z0-9])"
+    return re.escape(word)
+
+
+# 카테고리별 키워드를 소문자화한 뒤 하나의 정규식으로 미리 컴파일 (메시지당 카테고리별 1회 검색)
+_IMAGE_KEYWORD_RES = {
+    category: re.compile("|".join(_keyword_pattern(word) for word in words))
+    for category, words in _IMAGE_KEYWORDS.items()
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _analyze_image_text(text: str) -> dict:
+    """OCR 텍스트 키워드 분석 (순수 함수, 반환값은 캐시되므로 호출자가 복사해서 사용)"""
+    # 간단한 키워드 기반 분석
+    text_lc = text.lower()
+    found_keywords = [category for category, pattern in _IMAGE_KEYWORD_RES.items() if pattern.search(text_lc)]
+    
+    if found_keywords:
+        content_type = "image_with_text"
+        description = f"텍스트 포함 이미지 ({', '.join(found_keywords)})"
+        summary = f"이미지에 {', '.join(found_keywords)} 관련 텍스트가 포함되어 있습니다."
+    else:
+        content_type = "image_with_text"
+        description = "텍스트 포함 이미지"
+        summary = f"이미지에서 '{text[:50]}{'...' if len(text) > 50 else ''}' 텍스트를 추출했습니다."
+    
+    return {
+        "content_type": content_type,
+        "description": description,
+        "summary": summary,
+        "extracted_text": text
+    }
+
+
+def _cuda_available() -> bool:
+    """EasyOCR가 사용하는 torch에서 CUDA 사용 가능 여부 확인"""
+    try:
+        import torch
+        return bool(torch.cuda.is_available())
+    except Exception:
+        return False
+
+
+def _decode_image(image_data: bytes) -> Optional[np.ndarray]:
+    """OpenCV로 한 번만 디코딩 (EasyOCR 내부와 같은 디코더), 너무 크면 비율 유지 축소"""
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    
+    height, width = image.shape[:2]
+    if width > MAX_IMAGE_SIDE or height > MAX_IMAGE_SIDE:
+        scale = MAX_IMAGE_SIDE / max(width, height)
+        image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return image
+
+
+# OCR 워커 프로세스의 EasyOCR 리더 (_init_ocr_worker에서 프로세스당 한 번 생성)
+_worker_reader = None
+
+
+def _init_ocr_worker(torch_threads: int) -> None:
+    """OCR 워커 프로세스 초기화 (CPU 모델 로드, 프로세스 간 코어 과다 할당 방지)"""
+    global _worker_reader
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception:
+        pass
+    _worker_reader = easyocr.Reader(['ko', 'en'], gpu=False, quantize=True, verbose=False)
+
+
+def _ocr_worker(image_data: bytes) -> Optional[List[Tuple[str, float]]]:
+    """워커 프로세스에서 디코딩 + OCR 수행 (디코딩 실패 시 None, 결과는 (텍스트, 신뢰도) 목록)"""
+    image = _decode_image(image_data)
+    if image is None:
+        return None
+    return [(text, float(confidence)) for (_, text, confidence) in _worker_reader.readtext(image)]
+
 
 class ImageProcessor:
-    def __init__(self):
+    def __init__(self, processes: int = 0):
         logger.info("EasyOCR 이미지 처리기 초기화 중...")
+        self.reader = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # EasyOCR 리더 초기화 (한국어 + 영어, CUDA가 있으면 GPU / 없으면 int8 양자화 CPU 모델)
+        use_gpu = _cuda_available()
+        if processes > 0 and not use_gpu:
+            # CPU OCR은 별도 프로세스에서 실행하여 이벤트 루프 프로세스의 GIL과 경쟁하지 않도록 함
+            torch_threads = max(1, (os.cpu_count() or 1) // processes)
+            self._pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+                initargs=(torch_threads,),
+            )
+            logger.info(f"EasyOCR 프로세스 풀 사용 (CPU, 워커 {processes}개)")
+            return
         try:
-            # EasyOCR 리더 초기화 (한국어 + 영어)
-            self.reader = easyocr.Reader(['ko', 'en'], gpu=False)
-            logger.info("EasyOCR 초기화 완료")
+            self.reader = easyocr.Reader(['ko', 'en'], gpu=use_gpu, quantize=True)
+            logger.info(f"EasyOCR 초기화 완료 ({'GPU' if use_gpu else 'CPU'})")
         except Exception as e:
             logger.error(f"EasyOCR 초기화 실패: {e}")
-            self.reader = None
+
+    def close(self) -> None:
+        """OCR 프로세스 풀 종료"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _readtext(self, image_data: bytes) -> Optional[List[Tuple[str, float]]]:
+        """디코딩 + OCR (프로세스 풀이 있으면 워커 프로세스, 없으면 스레드에서 실행)"""
+        loop = asyncio.get_running_loop()
+        if self._pool is not None:
+            return await loop.run_in_executor(self._pool, _ocr_worker, image_data)
+        
+        image = _decode_image(image_data)
+        if image is None:
+            return None
+        logger.debug("이미지 처리: %s", image.shape)
+        results = await loop.run_in_executor(None, self.reader.readtext, image)
+        return [(text, confidence) for (_, text, confidence) in results]
 
     async def extract_text_from_image(self, image_data: bytes) -> Optional[str]:
-        """이미지에서 텍스트 추출 (EasyOCR 사용)"""
-        if not self.reader:
+        """이미지에서 텍스트 추출 (EasyOCR 사용, 텍스트가 없으면 "", OCR을 수행하지 못하면 None)"""
+        if not self.reader and self._pool is None:
             logger.error("EasyOCR이 초기화되지 않음")
             return None
             
@@ -32,41 +176,14 @@ class ImageProcessor:
             return None
             
         try:
-            # 이미지 데이터를 BytesIO로 변환
-            image_bytes = io.BytesIO(image_data)
-            
-            # 이미지 로드 및 검증
-            try:
-                image = Image.open(image_bytes)
-                # 이미지가 실제로 로드되었는지 확인
-                image.verify()
-                # 이미지를 다시 열기 (verify 후에는 닫힘)
-                image = Image.open(io.BytesIO(image_data))
-                
-                # 이미지 크기 확인 (너무 크면 리사이즈)
-                if image.size[0] > 2000 or image.size[1] > 2000:
-                    image.thumbnail((2000, 2000), Image.Resampling.LANCZOS)
-                    logger.info(f"이미지 리사이즈: {image.size}")
-                    
-            except Exception as img_error:
-                logger.error(f"이미지 로드 실패: {img_error}")
-                return None
-            
-            logger.info(f"이미지 처리: {image.format}, {image.size}, {image.mode}")
-            
             # EasyOCR로 텍스트 추출
-            results = await asyncio.get_event_loop().run_in_executor(
-                None, 
-                self.reader.readtext, 
-                image
-            )
+            results = await self._readtext(image_data)
+            if results is None:
+                logger.error("이미지 로드 실패: 디코딩할 수 없는 이미지 데이터")
+                return None
             
             # 결과에서 텍스트 추출
-            texts = []
-            for (bbox, text, confidence) in results:
-                if confidence > 0.5:  # 신뢰도 50% 이상만 사용
-                    texts.append(text.strip())
-                    logger.debug(f"텍스트 감지: '{text}' (신뢰도: {confidence:.2f})")
+            texts = [text.strip() for (text, confidence) in results if confidence > 0.5]  # 신뢰도 50% 이상만 사용
             
             if texts:
                 full_text = ' '.join(texts)
@@ -74,50 +191,16 @@ class ImageProcessor:
                 return full_text
             else:
                 logger.info("이미지에서 텍스트를 찾을 수 없음")
-                return None
+                return ""
                 
         except Exception as e:
             logger.error(f"이미지 텍스트 추출 실패: {e}")
             return None
 
-    def analyze_image_content(self, text: str) -> dict:
+    def analyze_image_content(self, text: str) -> Mapping[str, str]:
         """추출된 텍스트를 분석하여 내용 요약"""
-        if not text:
-            return {
-                "content_type": "image",
-                "description": "텍스트가 없는 이미지",
-                "summary": "이미지 파일"
-            }
-        
-        # 간단한 키워드 기반 분석
-        keywords = {
-            "가격": ["가격", "price", "cost", "원", "$", "₩"],
-            "차트": ["차트", "chart", "그래프", "graph", "candle"],
-            "뉴스": ["뉴스", "news", "발표", "announcement"],
-            "이벤트": ["이벤트", "event", "프로모션", "promotion"],
-            "코인": ["코인", "coin", "토큰", "token", "btc", "eth"],
-            "거래": ["거래", "trade", "매수", "매도", "buy", "sell"]
-        }
-        
-        found_keywords = []
-        for category, words in keywords.items():
-            for word in words:
-                if word.lower() in text.lower():
-                    found_keywords.append(category)
-                    break
-        
-        if found_keywords:
-            content_type = "image_with_text"
-            description = f"텍스트 포함 이미지 ({', '.join(found_keywords)})"
-            summary = f"이미지에 {', '.join(found_keywords)} 관련 텍스트가 포함되어 있습니다."
-        else:
-            content_type = "image_with_text"
-            description = "텍스트 포함 이미지"
-            summary = f"이미지에서 '{text[:50]}{'...' if len(text) > 50 else ''}' 텍스트를 추출했습니다."
+        if not text or text.isspace():
+            return _NO_TEXT_RESULT
         
-        return {
-            "content_type": content_type,
-            "description": description,
-            "summary": summary,
-            "extracted_text": text
-        }
+        # 같은 OCR 텍스트(여러 채널로 포워딩된 이미지 등)는 캐시된 분석 결과 사용
+        return dict(_analyze_image_text(text))
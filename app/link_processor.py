@@ -1,17 +1,179 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import re
-from typing import Optional, Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
-from playwright.async_api import async_playwright
+import aiohttp
+import lxml.html
+from playwright.async_api import Browser, Playwright, async_playwright
 import base64
 
 logger = logging.getLogger("app.link")
 
+# URL 추출 패턴 (모듈 로드 시 한 번만 컴파일)
+_URL_PATTERNS = tuple(re.compile(p) for p in (
+    r'https?://[^\s<>"]+',  # http/https 링크
+    r'www\.[^\s<>"]+',      # www로 시작하는 링크
+    r't\.me/[^\s<>"]+',     # Telegram 링크
+    r'x\.com/[^\s<>"]+',    # X(Twitter) 링크
+    r'forms\.gle/[^\s<>"]+', # Google Forms 링크
+))
+# 스킴 없이 시작하는 링크 접두사 (https:// 를 붙여 정규화)
+_SCHEMELESS_PREFIXES = ('www.', 't.me/', 'x.com/', 'forms.gle/')
+_TRAILING_RE = re.compile(r'[.,;!?)\]}>"\s]+$')
+_WS_RE = re.compile(r'\s+')
+# Playwright 렌더링 최대 시도 횟수
+RENDER_ATTEMPTS = 3
+# 정적 HTML 요청의 호스트별 동시 연결 수 (메시지 내 링크를 동시에 가져올 때 같은 사이트 과부하 방지)
+HTTP_LIMIT_PER_HOST = 4
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# 도메인 기반 카테고리 키워드
+_DOMAIN_KEYWORDS = {
+    "뉴스": ["news", "media", "press", "coindesk", "cointelegraph"],
+    "거래소": ["binance", "upbit", "bithumb", "coinbase", "exchange"],
+    "블로그": ["blog", "medium", "substack", "mirror"],
+    "소셜": ["twitter", "x.com", "telegram", "discord"],
+    "기술": ["github", "docs", "technical", "whitepaper"]
+}
+# 내용 기반 카테고리 키워드
+_CONTENT_KEYWORDS = {
+    "가격": ["가격", "price", "cost", "원", "$", "₩", "market cap"],
+    "차트": ["차트", "chart", "그래프", "graph", "candle", "technical"],
+    "뉴스": ["뉴스", "news", "발표", "announcement", "update"],
+    "이벤트": ["이벤트", "event", "프로모션", "promotion", "airdrop"],
+    "코인": ["코인", "coin", "토큰", "token", "btc", "eth", "crypto"],
+    "거래": ["거래", "trade", "매수", "매도", "buy", "sell", "trading"]
+}
+
+
+_ASCII_WORD_RE = re.compile(r"[a-z0-9]+(?: [a-z0-9]+)*")
+
+
+def _keyword_pattern(word: str, word_boundary: bool) -> str:
+    """영문 단어 키워드는 (word_boundary일 때) 단어 경계로 매치, 한글/기호는 부분 문자열"""
+    if word_boundary and _ASCII_WORD_RE.fullmatch(word):
+        return rf"(?<![a-z0-9]){re.escape(word)}(?![a-z0-9])"
+    return re.escape(word)
+
+
+def _compile_keywords(keywords: Dict[str, list], *, word_boundary: bool) -> Tuple[re.Pattern, Dict[str, str]]:
+    """모든 키워드를 소문자 합집합 정규식 하나로 컴파일하고 키워드 → 카테고리 매핑 반환 (소문자 텍스트에 사용)"""
+    word_category: Dict[str, str] = {}
+    for category, words in keywords.items():
+        for word in words:
+            word_category.setdefault(word.lower(), category)
+    # 긴 키워드를 먼저 시도하여 짧은 키워드가 매치를 가로채지 않도록 함
+    alternation = "|".join(
+        _keyword_pattern(word, word_boundary) for word in sorted(word_category, key=len, reverse=True)
+    )
+    return re.compile(alternation), word_category
+
+
+def _match_categories(keywords: Dict[str, list], compiled: Tuple[re.Pattern, Dict[str, str]], text_lc: str) -> List[str]:
+    """텍스트를 한 번만 스캔하여 매치된 카테고리를 키워드 테이블 순서대로 반환"""
+    pattern, word_category = compiled
+    matched = {word_category[word] for word in pattern.findall(text_lc)}
+    return [category for category in keywords if category in matched]
+
+
+# 도메인은 "cryptonews", "coindesk"처럼 붙여 쓰므로 부분 문자열 매치 유지
+_DOMAIN_KEYWORD_RE = _compile_keywords(_DOMAIN_KEYWORDS, word_boundary=False)
+_CONTENT_KEYWORD_RE = _compile_keywords(_CONTENT_KEYWORDS, word_boundary=True)
+
+
+# 본문 후보 컨테이너 (앞에서부터 우선)
+_CONTENT_XPATHS = (
+    "//main",
+    "//article",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' post ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' entry ')]",
+)
+_NOISE_XPATH = "//script|//style|//nav|//header|//footer|//aside"
+
+
+def _first_attr(tree, xpath: str) -> Optional[str]:
+    values = tree.xpath(xpath)
+    return values[0] if values else None
+
+
+def _element_text(element) -> str:
+    return " ".join(part.strip() for part in element.itertext() if part.strip())
+
+
+def _parse_html(html: str, url: str, max_content_len: int) -> Dict[str, Any]:
+    """HTML에서 메타 태그와 본문 텍스트 추출 (lxml XPath)"""
+    tree = lxml.html.fromstring(html)
+
+    # 메타 태그 추출
+    title_text = (tree.findtext(".//title") or "").strip()
+    og_title = _first_attr(tree, "//meta[@property='og:title']/@content")
+    og_description = _first_attr(tree, "//meta[@property='og:description']/@content")
+    og_image = _first_attr(tree, "//meta[@property='og:image']/@content")
+    meta_description = _first_attr(tree, "//meta[@name='description']/@content")
+
+    # 본문 텍스트 추출 (불필요 태그 제거)
+    for element in tree.xpath(_NOISE_XPATH):
+        element.drop_tree()
+
+    main_content = ""
+    for xpath in _CONTENT_XPATHS:
+        found = tree.xpath(xpath)
+        if found:
+            main_content = _element_text(found[0])
+            break
+    if not main_content:
+        body = tree.find(".//body")
+        if body is not None:
+            main_content = _element_text(body)
+
+    main_content = _WS_RE.sub(' ', main_content).strip()
+
+    return {
+        "url": url,
+        "title": og_title if og_title is not None else title_text,
+        "description": og_description if og_description is not None else (meta_description or ""),
+        "image": og_image or "",
+        "content": main_content[:max_content_len],
+        "domain": urlparse(url).netloc,
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _analyze_link_fields(title: str, description: str, content: str, domain: str) -> Dict[str, Any]:
+    """웹페이지 필드 키워드 분석 (순수 함수, 반환값은 캐시되므로 호출자가 복사해서 사용)"""
+    # 도메인 기반 카테고리 분류
+    found_categories = _match_categories(_DOMAIN_KEYWORDS, _DOMAIN_KEYWORD_RE, domain.lower())
+    
+    # 내용 기반 키워드 분석
+    all_text_lc = " ".join((title, description, content)).lower()
+    found_keywords = _match_categories(_CONTENT_KEYWORDS, _CONTENT_KEYWORD_RE, all_text_lc)
+    
+    # 요약 생성
+    if title:
+        summary = f"제목: {title}"
+        if description:
+            summary += f"\n설명: {description[:100]}{'...' if len(description) > 100 else ''}"
+    else:
+        summary = f"웹페이지 링크 ({domain})"
+    
+    return {
+        "content_type": "link_with_content",
+        "description": f"링크 ({', '.join(found_categories + found_keywords) if found_categories or found_keywords else '웹페이지'})",
+        "summary": summary,
+        "title": title,
+        "domain": domain,
+        "categories": found_categories,
+        "keywords": found_keywords
+    }
+
 
 class LinkProcessor:
     def __init__(self, *, request_timeout_sec: int = 12, render_wait_ms: int = 2000, max_content_len: int = 1000, enable_screenshot: bool = False):
@@ -19,22 +181,16 @@ class LinkProcessor:
         self.render_wait_ms = render_wait_ms
         self.max_content_len = max_content_len
         self.enable_screenshot = enable_screenshot
+        self._pw: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._http_session: Optional[aiohttp.ClientSession] = None
     
     def extract_links_from_text(self, text: str) -> list[str]:
         """텍스트에서 링크 추출"""
-        # 더 포괄적인 URL 패턴 매칭
-        url_patterns = [
-            r'https?://[^\s<>"]+',  # http/https 링크
-            r'www\.[^\s<>"]+',      # www로 시작하는 링크
-            r't\.me/[^\s<>"]+',     # Telegram 링크
-            r'x\.com/[^\s<>"]+',    # X(Twitter) 링크
-            r'forms\.gle/[^\s<>"]+', # Google Forms 링크
-        ]
-        
         urls = []
-        for pattern in url_patterns:
-            found_urls = re.findall(pattern, text)
-            urls.extend(found_urls)
+        for pattern in _URL_PATTERNS:
+            urls.extend(pattern.findall(text))
         
         # 중복 제거 및 정리
         processed_urls = []
@@ -42,16 +198,10 @@ class LinkProcessor:
         
         for url in urls:
             # 링크 끝의 불필요한 문자 제거 (괄호, 마침표, 쉼표 등)
-            url = re.sub(r'[.,;!?)\]}>"\s]+$', '', url)
+            url = _TRAILING_RE.sub('', url)
             
-            # www로 시작하는 URL을 https://로 변환
-            if url.startswith('www.'):
-                url = 'https://' + url
-            elif url.startswith('t.me/') and not url.startswith('http'):
-                url = 'https://' + url
-            elif url.startswith('x.com/') and not url.startswith('http'):
-                url = 'https://' + url
-            elif url.startswith('forms.gle/') and not url.startswith('http'):
+            # www., t.me/ 등 스킴 없는 URL을 https://로 변환
+            if url.startswith(_SCHEMELESS_PREFIXES):
                 url = 'https://' + url
             
             # 중복 제거
@@ -61,75 +211,106 @@ class LinkProcessor:
         
         return processed_urls
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=3, max=10))
-    async def fetch_webpage_content(self, url: str) -> Optional[Dict[str, Any]]:
-        """Playwright로 렌더링하여 웹페이지 메타/본문 추출"""
+    async def _get_browser(self) -> Browser:
+        """재사용 Chromium 브라우저 (최초 호출 시 실행, 연결이 끊기면 재실행)"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(headless=True)
+            return self._browser
+    
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """정적 HTML 요청용 재사용 HTTP 세션"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=HTTP_LIMIT_PER_HOST),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout_sec),
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._http_session
+    
+    async def _fetch_static(self, url: str) -> Optional[Dict[str, Any]]:
+        """렌더링 없이 서버 HTML만으로 메타/본문 추출 (제목·본문이 모두 없으면 None)"""
         try:
-            async with async_playwright() as pw:
-                browser = await pw.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=(
-                        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                        '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                    )
-                )
-                page = await context.new_page()
-                await page.goto(url, timeout=self.request_timeout_sec * 1000)
-                # 네트워크/DOM 안정화 대기
-                await page.wait_for_timeout(self.render_wait_ms)
-
-                html = await page.content()
-                screenshot_b64: Optional[str] = None
-                if self.enable_screenshot:
-                    try:
-                        img_bytes = await page.screenshot(full_page=True, type='png')
-                        screenshot_b64 = base64.b64encode(img_bytes).decode('ascii')
-                    except Exception:
-                        screenshot_b64 = None
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # 메타 태그 추출
-                title_el = soup.find('title')
-                title_text = title_el.get_text().strip() if title_el else ""
-                og_title = soup.find('meta', property='og:title')
-                og_description = soup.find('meta', property='og:description')
-                og_image = soup.find('meta', property='og:image')
-                meta_description = soup.find('meta', attrs={'name': 'description'})
-
-                # 본문 텍스트 추출 (불필요 태그 제거)
-                for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                    tag.decompose()
-
-                main_content = ""
-                for selector in ['main', 'article', '.content', '.post', '.entry']:
-                    content = soup.select_one(selector)
-                    if content:
-                        main_content = content.get_text(separator=' ', strip=True)
-                        break
-                if not main_content:
-                    body = soup.find('body')
-                    if body:
-                        main_content = body.get_text(separator=' ', strip=True)
-
-                main_content = re.sub(r'\s+', ' ', main_content).strip()
-
-                await context.close()
-                await browser.close()
-
-                result = {
-                    "url": url,
-                    "title": og_title.get('content', '') if og_title else title_text,
-                    "description": og_description.get('content', '') if og_description else (meta_description.get('content', '') if meta_description else ""),
-                    "image": og_image.get('content', '') if og_image else "",
-                    "content": main_content[: self.max_content_len],
-                    "domain": urlparse(url).netloc,
-                }
-                if screenshot_b64:
-                    result["screenshot_b64"] = screenshot_b64
-                return result
+            session = await self._get_http_session()
+            async with session.get(url) as response:
+                if response.status != 200 or "html" not in response.content_type:
+                    return None
+                html = await response.text(errors="replace")
+            result = _parse_html(html, url, self.max_content_len)
         except Exception as e:
-            logger.error(f"웹페이지 가져오기 실패 ({url}): {e}")
+            logger.debug("정적 페이지 가져오기 실패 (%s): %s", url, e)
             return None
+        if not result["title"] and not result["content"]:
+            return None
+        return result
+    
+    async def aclose(self) -> None:
+        """HTTP 세션, 브라우저 및 Playwright 드라이버 종료"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug("브라우저 종료 실패: %s", e)
+            self._browser = None
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
+    
+    async def fetch_webpage_content(self, url: str) -> Optional[Dict[str, Any]]:
+        """웹페이지 메타/본문 추출 (정적 HTML 우선, 비어 있으면 Playwright 렌더링)"""
+        # 대부분의 뉴스 페이지는 서버 HTML에 og 메타/본문이 있으므로 Chromium 없이 처리
+        if not self.enable_screenshot:
+            result = await self._fetch_static(url)
+            if result is not None:
+                logger.debug("정적 HTML로 추출: %s", url)
+                return result
+        
+        # 렌더링 실패 시 지수 백오프로 최대 RENDER_ATTEMPTS회 시도
+        delay = 3.0
+        for attempt in range(1, RENDER_ATTEMPTS + 1):
+            try:
+                return await self._fetch_rendered(url)
+            except Exception as e:
+                if attempt == RENDER_ATTEMPTS:
+                    logger.error(f"웹페이지 가져오기 실패 ({url}): {e}")
+                    return None
+                logger.debug("웹페이지 렌더링 재시도 %d/%d (%s): %s", attempt, RENDER_ATTEMPTS, url, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10.0)
+        return None
+    
+    async def _fetch_rendered(self, url: str) -> Dict[str, Any]:
+        """Playwright로 렌더링하여 추출 (브라우저는 재사용, URL마다 새 컨텍스트)"""
+        browser = await self._get_browser()
+        context = await browser.new_context(user_agent=USER_AGENT)
+        try:
+            page = await context.new_page()
+            await page.goto(url, timeout=self.request_timeout_sec * 1000)
+            # 네트워크/DOM 안정화 대기
+            await page.wait_for_timeout(self.render_wait_ms)
+
+            html = await page.content()
+            screenshot_b64: Optional[str] = None
+            if self.enable_screenshot:
+                try:
+                    img_bytes = await page.screenshot(full_page=True, type='png')
+                    screenshot_b64 = base64.b64encode(img_bytes).decode('ascii')
+                except Exception:
+                    screenshot_b64 = None
+        finally:
+            await context.close()
+
+        result = _parse_html(html, url, self.max_content_len)
+        if screenshot_b64:
+            result["screenshot_b64"] = screenshot_b64
+        return result
     
     def analyze_link_content(self, webpage_data: Dict[str, Any]) -> Dict[str, Any]:
         """웹페이지 내용 분석"""
@@ -140,59 +321,11 @@ class LinkProcessor:
                 "summary": "웹페이지 링크"
             }
         
-        title = webpage_data.get("title", "")
-        description = webpage_data.get("description", "")
-        content = webpage_data.get("content", "")
-        domain = webpage_data.get("domain", "")
-        
-        # 도메인 기반 카테고리 분류
-        domain_keywords = {
-            "뉴스": ["news", "media", "press", "coindesk", "cointelegraph"],
-            "거래소": ["binance", "upbit", "bithumb", "coinbase", "exchange"],
-            "블로그": ["blog", "medium", "substack", "mirror"],
-            "소셜": ["twitter", "x.com", "telegram", "discord"],
-            "기술": ["github", "docs", "technical", "whitepaper"]
-        }
-        
-        found_categories = []
-        for category, keywords in domain_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in domain.lower():
-                    found_categories.append(category)
-                    break
-        
-        # 내용 기반 키워드 분석
-        content_keywords = {
-            "가격": ["가격", "price", "cost", "원", "$", "₩", "market cap"],
-            "차트": ["차트", "chart", "그래프", "graph", "candle", "technical"],
-            "뉴스": ["뉴스", "news", "발표", "announcement", "update"],
-            "이벤트": ["이벤트", "event", "프로모션", "promotion", "airdrop"],
-            "코인": ["코인", "coin", "토큰", "token", "btc", "eth", "crypto"],
-            "거래": ["거래", "trade", "매수", "매도", "buy", "sell", "trading"]
-        }
-        
-        all_text = f"{title} {description} {content}".lower()
-        found_keywords = []
-        for category, words in content_keywords.items():
-            for word in words:
-                if word.lower() in all_text:
-                    found_keywords.append(category)
-                    break
-        
-        # 요약 생성
-        if title:
-            summary = f"제목: {title}"
-            if description:
-                summary += f"\n설명: {description[:100]}{'...' if len(description) > 100 else ''}"
-        else:
-            summary = f"웹페이지 링크 ({domain})"
-        
-        return {
-            "content_type": "link_with_content",
-            "description": f"링크 ({', '.join(found_categories + found_keywords) if found_categories or found_keywords else '웹페이지'})",
-            "summary": summary,
-            "title": title,
-            "domain": domain,
-            "categories": found_categories,
-            "keywords": found_keywords
-        }
+        # 같은 웹페이지(여러 채널에 공유된 링크)는 캐시된 분석 결과 사용
+        result = _analyze_link_fields(
+            webpage_data.get("title", ""),
+            webpage_data.get("description", ""),
+            webpage_data.get("content", ""),
+            webpage_data.get("domain", ""),
+        )
+        return {**result, "categories": list(result["categories"]), "keywords": list(result["keywords"])}
@@ -136,7 +136,7 @@ async def _main(args) -> None:
                 if item not in seen_items:
                     source_items.append(item)
                     seen_items.add(item)
-        env_line = "SOURCE_CHANNELS=" + ",".join(source_items)
+        env_line = f"SOURCE_CHANNELS={','.join(source_items)}"
         print("\n" + env_line)
 
 
@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import List
+import asyncio
+import contextlib
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import TYPE_CHECKING, List, Literal, Optional, Tuple
 
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+import httpx
+from openai import AsyncOpenAI
+from pydantic import BaseModel
 
+from app.json_utils import dumps_str, loads
+from app.rate_limit import TokenBucket
 
-@dataclass
+if TYPE_CHECKING:
+    from app.storage import SQLiteStore
+
+logger = logging.getLogger("app.llm")
+
+
+@dataclass(slots=True, frozen=True)
 class AnalysisResult:
     is_coin_related: bool
     has_valuable_info: bool
@@ -76,6 +90,101 @@ SYSTEM_PROMPT = (
 )
 
 
+# 동일 원문(포워드/재게시) 분석 결과 캐시 크기 및 유효 기간
+LLM_CACHE_SIZE = 2048
+LLM_CACHE_TTL_SEC = 24 * 3600
+# API 호출 재시도 횟수 (SDK 내장 지수 백오프 재시도 사용)
+LLM_MAX_RETRIES = 3
+# API 호출 타임아웃 (배치 응답은 생성이 길어질 수 있어 읽기 여유를 둠)
+LLM_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# 동시에 진행할 수 있는 API 호출 수 기본값 (속도 제한 보호)
+LLM_MAX_CONCURRENCY = 8
+# 분당 API 요청 수 기본값 (0이면 제한 없음, 조직 RPM 한도에 맞춰 조정)
+LLM_MAX_RPM = 500
+
+
+def _copy_result(result: AnalysisResult) -> AnalysisResult:
+    """호출자가 categories/tags를 수정해도 캐시가 오염되지 않도록 복사"""
+    return replace(result, categories=list(result.categories), tags=list(result.tags))
+
+
+class AnalysisCache:
+    """원문 해시 → AnalysisResult TTL LRU 캐시 (store가 있으면 SQLite에 영속화하여 재시작 후에도 재사용)"""
+
+    def __init__(
+        self,
+        store: Optional["SQLiteStore"] = None,
+        maxsize: int = LLM_CACHE_SIZE,
+        ttl_sec: int = LLM_CACHE_TTL_SEC,
+    ) -> None:
+        self.store = store
+        self.maxsize = maxsize
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[str, Tuple[int, AnalysisResult]]" = OrderedDict()
+        if store is not None:
+            self._load()
+
+    def _load(self) -> None:
+        """만료되지 않은 캐시 항목을 DB에서 적재하고 만료 항목은 정리"""
+        since_ts = int(time.time()) - self.ttl_sec
+        try:
+            self.store.prune_analysis_cache(since_ts)
+            rows = self.store.load_analysis_cache(since_ts, self.maxsize)
+        except Exception as e:
+            logger.warning(f"분석 캐시 로드 실패: {e}")
+            return
+        # 오래된 것부터 넣어 LRU 순서 유지
+        for key, result_json, ts in reversed(rows):
+            try:
+                self._entries[key] = (ts, AnalysisResult(**loads(result_json)))
+            except (ValueError, TypeError) as e:
+                logger.debug("분석 캐시 항목 파싱 실패: %s", e)
+        logger.info(f"분석 캐시 로드: {len(self._entries)}개")
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ts, result = entry
+        if ts < time.time() - self.ttl_sec:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return _copy_result(result)
+
+    async def put(self, key: str, result: AnalysisResult) -> None:
+        """메모리 캐시에 저장하고 SQLite 영속화는 스레드에서 실행 (이벤트 루프 블로킹 방지)"""
+        ts = int(time.time())
+        self._entries[key] = (ts, _copy_result(result))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.save_analysis_cache, key, dumps_str(asdict(result)), ts)
+            except Exception as e:
+                logger.warning(f"분석 캐시 저장 실패: {e}")
+
+
+# 규칙 기반으로 분류가 끝난 메시지의 요약만 요청할 때 사용하는 짧은 프롬프트
+BATCH_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT
+    + "\n\n여러 메시지를 한 번에 분석하는 경우 입력은 {\"items\":[{\"id\":정수,\"text\":원문}]} 형식입니다. "
+    "각 항목을 서로 독립적으로 위 기준에 따라 분석하고, "
+    "{\"results\":[{\"id\":입력 id, 위의 키들...}]} 형식의 JSON 하나만 출력하세요."
+)
+
+
+def _prompt_cache_key(system_prompt: str) -> str:
+    """시스템 프롬프트별 고정 prompt_cache_key (같은 접두부 요청이 같은 캐시 서버로 라우팅되도록)"""
+    return "tg-summary-" + hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=8).hexdigest()
+
+
+# 시스템 프롬프트는 요청마다 바이트 단위로 동일해야 OpenAI 프롬프트 캐시(접두부 재사용)가 적중함
+PROMPT_CACHE_KEY = _prompt_cache_key(SYSTEM_PROMPT)
+BATCH_PROMPT_CACHE_KEY = _prompt_cache_key(BATCH_SYSTEM_PROMPT)
+
+
 def _build_user_prompt(text: str) -> str:
     return (
         "다음 원문을 분석하세요. 요약은 2~4문장, 한국어. 중복·광고는 낮은 중요도.\n\n"
@@ -83,48 +192,210 @@ def _build_user_prompt(text: str) -> str:
     )
 
 
+def _build_batch_prompt(texts: List[str]) -> str:
+    items = [{"id": i, "text": text.strip()} for i, text in enumerate(texts)]
+    return (
+        "다음 원문들을 각각 분석하세요. 요약은 2~4문장, 한국어. 중복·광고는 낮은 중요도.\n\n"
+        + dumps_str({"items": items})
+    )
+
+
+class _AnalysisSchema(BaseModel):
+    """Structured Outputs 응답 스키마 (서버 측에서 형식이 강제되므로 JSON 파싱/타입 변환 불필요)"""
+
+    is_coin_related: bool
+    has_valuable_info: bool
+    importance: Literal["low", "medium", "high"]
+    categories: List[str]
+    tags: List[str]
+    summary: str
+    money_making_info: str
+    action_guide: str
+    event_products: str
+    relevance_reason: str
+    info_value_reason: str
+
+
+class _BatchItemSchema(_AnalysisSchema):
+    id: int
+
+
+class _BatchSchema(BaseModel):
+    results: List[_BatchItemSchema]
+
+
+def _to_result(parsed: _AnalysisSchema) -> AnalysisResult:
+    """스키마 응답을 AnalysisResult로 변환 (개수 제한은 프롬프트로만 지시하므로 여기서 자름)"""
+    return AnalysisResult(
+        is_coin_related=parsed.is_coin_related,
+        has_valuable_info=parsed.has_valuable_info,
+        importance=parsed.importance,
+        categories=parsed.categories[:3],
+        tags=parsed.tags[:7],
+        summary=parsed.summary.strip(),
+        money_making_info=parsed.money_making_info.strip(),
+        action_guide=parsed.action_guide.strip(),
+        event_products=parsed.event_products.strip(),
+        relevance_reason=parsed.relevance_reason.strip(),
+        info_value_reason=parsed.info_value_reason.strip(),
+    )
+
+
+def _parsed_message(resp):
+    """파싱된 응답 객체 (모델이 응답을 거부하면 예외)"""
+    message = resp.choices[0].message
+    if message.parsed is None:
+        raise ValueError(f"LLM 응답 파싱 실패: {message.refusal or 'empty response'}")
+    return message.parsed
+
+
 class OpenAILLM:
-    def __init__(self, api_key: str, model: str) -> None:
-        self.client = OpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        store: Optional["SQLiteStore"] = None,
+        batch_size: int = 1,
+        batch_wait_ms: int = 200,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_rpm: int = LLM_MAX_RPM,
+    ) -> None:
+        # HTTP/2 + keep-alive 연결 풀을 재사용하여 호출마다 TLS 핸드셰이크 생략
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=LLM_MAX_RETRIES,
+            timeout=LLM_TIMEOUT,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                timeout=LLM_TIMEOUT,
+                limits=httpx.Limits(max_connections=max_concurrency * 2, max_keepalive_connections=max_concurrency),
+            ),
+        )
         self.model = model
+        self._cache = AnalysisCache(store)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # 버스트 시 RPM 한도를 넘겨 429 재시도가 몰리지 않도록 요청 속도 평탄화
+        self._rate_limiter = TokenBucket(max_rpm, per=60) if max_rpm > 0 else None
+        # batch_size > 1이면 동시에 도착한 메시지를 한 요청으로 묶어 분석
+        self.batch_size = batch_size
+        self.batch_wait_ms = batch_wait_ms
+        self._pending: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+
+    async def aclose(self) -> None:
+        """배치 작업 및 API 클라이언트 종료"""
+        if self._batch_task is not None and not self._batch_task.done():
+            self._batch_task.cancel()
+        self._batch_task = None
+        await self.client.close()
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        """동시 호출 수 제한 + 분당 요청 수 제한을 통과한 API 호출 구간"""
+        async with self._semaphore:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+            yield
+
+    def _cache_key(self, text: str) -> str:
+        # 공백 차이만 있는 재게시도 같은 키가 되도록 공백 정규화
+        normalized = " ".join(text.split())
+        return hashlib.blake2b(
+            f"{self.model}\x00{SYSTEM_PROMPT}\x00{normalized}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    async def analyze(self, text: str) -> AnalysisResult:
+        """원문 분석 (같은 모델/프롬프트/원문은 캐시된 결과를 복사해 반환)"""
+        key = self._cache_key(text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug("LLM 분석 캐시 적중")
+            return cached
+
+        result = await self._submit(text) if self.batch_size > 1 else None
+        if result is None:
+            # 배치 비활성화, 또는 배치 응답에 이 항목이 빠진 경우 단건 요청
+            async with self._slot():
+                result = await self._request(text)
+        await self._cache.put(key, result)
+        return result
+
+    async def _submit(self, text: str) -> Optional[AnalysisResult]:
+        """배치 큐에 넣고 결과를 기다림 (배치 응답에 항목이 빠지면 None)"""
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.create_task(self._batch_worker())
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._pending.put((text, future))
+        return await future
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
-    def analyze(self, text: str) -> AnalysisResult:
+    async def _batch_worker(self) -> None:
+        """대기 중인 analyze 요청을 batch_wait_ms 또는 batch_size까지 모아 한 번에 전송"""
+        loop = asyncio.get_running_loop()
+        while True:
+            text, future = await self._pending.get()
+            batch = [(text, future)]
+            deadline = loop.time() + self.batch_wait_ms / 1000
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                async with self._slot():
+                    results = await self._request_batch([item[0] for item in batch])
+            except asyncio.CancelledError:
+                for _, fut in batch:
+                    fut.cancel()
+                raise
+            except Exception as e:
+                logger.warning(f"LLM 배치 분석 실패: {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def _request(self, text: str) -> AnalysisResult:
         prompt = _build_user_prompt(text)
-        resp = self.client.chat.completions.create(
+        resp = await self.client.beta.chat.completions.parse(
             model=self.model,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.2,
-            response_format={"type": "json_object"},
+            response_format=_AnalysisSchema,
+            extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
         )
-        content = resp.choices[0].message.content
-        data = json.loads(content)
-        is_coin_related = bool(data.get("is_coin_related", True))  # 기본값은 True (안전성)
-        has_valuable_info = bool(data.get("has_valuable_info", True))  # 기본값은 True (안전성)
-        importance = str(data.get("importance", "low")).lower()
-        categories = [str(c) for c in data.get("categories", [])][:3]
-        tags = [str(t) for t in data.get("tags", [])][:7]
-        summary = str(data.get("summary", "")).strip()
-        money_making_info = str(data.get("money_making_info", "없음")).strip()
-        action_guide = str(data.get("action_guide", "추가 정보 대기")).strip()
-        event_products = str(data.get("event_products", "없음")).strip()
-        relevance_reason = str(data.get("relevance_reason", "판단 근거 없음")).strip()
-        info_value_reason = str(data.get("info_value_reason", "판단 근거 없음")).strip()
-        return AnalysisResult(
-            is_coin_related=is_coin_related,
-            has_valuable_info=has_valuable_info,
-            importance=importance, 
-            categories=categories, 
-            tags=tags, 
-            summary=summary,
-            money_making_info=money_making_info,
-            action_guide=action_guide,
-            event_products=event_products,
-            relevance_reason=relevance_reason,
-            info_value_reason=info_value_reason
+        return _to_result(_parsed_message(resp))
+
+    async def _request_batch(self, texts: List[str]) -> List[Optional[AnalysisResult]]:
+        """여러 원문을 한 요청으로 분석 (응답에 없는 항목은 None)"""
+        if len(texts) == 1:
+            return [await self._request(texts[0])]
+        resp = await self.client.beta.chat.completions.parse(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": _build_batch_prompt(texts)},
+            ],
+            temperature=0.2,
+            response_format=_BatchSchema,
+            extra_body={"prompt_cache_key": BATCH_PROMPT_CACHE_KEY},
         )
+        results: List[Optional[AnalysisResult]] = [None] * len(texts)
+        for item in _parsed_message(resp).results:
+            if 0 <= item.id < len(texts):
+                results[item.id] = _to_result(item)
+        return results
 
 
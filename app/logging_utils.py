@@ -1,103 +1,104 @@
 from __future__ import annotations
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 from datetime import datetime
+from typing import List
 
+# 파일/콘솔 쓰기를 전담하는 백그라운드 리스너들 (호출 스레드는 큐에 넣기만 함)
+_listeners: List[logging.handlers.QueueListener] = []
 
-def setup_logging():
+
+def stop_logging() -> None:
+    """큐에 남은 로그를 모두 기록하고 리스너 종료"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def _attach_queued(logger: logging.Logger, *handlers: logging.Handler) -> None:
+    """로거에는 QueueHandler만 붙이고 실제 핸들러는 리스너 스레드에서 실행"""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(min(handler.level for handler in handlers))
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+# 공통 로그 포맷
+_LINE_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+_FULL_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+
+def _make_rotating_handler(
+    path: str,
+    max_bytes: int,
+    backup_count: int,
+    level: int,
+    fmt: str = _LINE_FORMAT,
+    datefmt: str = _FULL_DATEFMT,
+) -> logging.handlers.RotatingFileHandler:
+    """레벨/포맷이 지정된 회전 파일 핸들러 생성"""
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    handler.setLevel(level)
+    handler.setFormatter(logging.Formatter(fmt, datefmt=datefmt))
+    return handler
+
+
+def setup_logging(level: int = logging.INFO):
     """로깅 설정"""
-    # 일자별 로그 디렉토리 생성
+    # 일자별 로그 디렉토리 생성 (상위 logs 디렉토리도 함께 생성됨)
     today = datetime.now().strftime("%Y-%m-%d")
     log_dir = f"logs/{today}"
     os.makedirs(log_dir, exist_ok=True)
-    
-    # 기존 logs 디렉토리도 유지 (하위 호환성)
-    os.makedirs("logs", exist_ok=True)
 
     # 루트 로거 설정
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
+    root_logger.setLevel(level)
 
     # 콘솔 핸들러
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(logging.Formatter(_LINE_FORMAT, datefmt='%H:%M:%S'))
 
     # 파일 핸들러 (회전) - 일자별 디렉터리
-    file_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/app.log",
-        maxBytes=50*1024*1024,  # 50MB
-        backupCount=10,
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.INFO)
-    file_formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    file_handler = _make_rotating_handler(f"{log_dir}/app.log", 50*1024*1024, 10, level)  # 50MB
 
     # 에러 전용 파일 핸들러 - 일자별 디렉터리
-    error_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/error.log",
-        maxBytes=20*1024*1024,  # 20MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(name)s: %(message)s\n%(pathname)s:%(lineno)d\n',
-        datefmt='%Y-%m-%d %H:%M:%S'
+    error_handler = _make_rotating_handler(
+        f"{log_dir}/error.log", 20*1024*1024, 5, logging.ERROR,  # 20MB
+        fmt=_LINE_FORMAT + '\n%(pathname)s:%(lineno)d\n',
     )
-    error_handler.setFormatter(error_formatter)
-    root_logger.addHandler(error_handler)
 
-    # 메시지 처리 로거 설정 (더 상세한 로깅)
+    # 루트 로거에는 QueueHandler만 붙이고 실제 핸들러는 리스너 스레드에서 실행
+    # (재호출 시 이전에 붙인 QueueHandler를 제거하여 중복 기록 방지)
+    stop_logging()
+    for name in ("", "app.msg", "app.sent"):
+        logger = logging.getLogger(name)
+        for handler in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+            logger.removeHandler(handler)
+    _attach_queued(root_logger, console_handler, file_handler, error_handler)
+    atexit.register(stop_logging)
+
+    # 메시지 처리 로거 설정 (더 상세한 로깅) - 일자별 디렉터리
     msg_logger = logging.getLogger("app.msg")
-    msg_logger.setLevel(logging.INFO)
-    
-    # 메시지 처리 전용 파일 핸들러 - 일자별 디렉터리
-    msg_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/messages.log",
-        maxBytes=100*1024*1024,  # 100MB
-        backupCount=20,
-        encoding='utf-8'
-    )
-    msg_handler.setLevel(logging.INFO)
-    msg_formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    msg_handler.setFormatter(msg_formatter)
-    msg_logger.addHandler(msg_handler)
-    
-    # 전송된 메시지 전용 로거 설정
+    msg_logger.setLevel(level)
+    _attach_queued(msg_logger, _make_rotating_handler(f"{log_dir}/messages.log", 100*1024*1024, 20, level))  # 100MB
+
+    # 전송된 메시지 전용 로거 설정 - 일자별 디렉터리
     sent_logger = logging.getLogger("app.sent")
-    sent_logger.setLevel(logging.INFO)
-    
-    # 전송된 메시지 전용 파일 핸들러 - 일자별 디렉터리
-    sent_handler = logging.handlers.RotatingFileHandler(
-        f"{log_dir}/sent_messages.log",
-        maxBytes=50*1024*1024,  # 50MB
-        backupCount=30,
-        encoding='utf-8'
+    sent_logger.setLevel(level)
+    _attach_queued(
+        sent_logger,
+        _make_rotating_handler(f"{log_dir}/sent_messages.log", 50*1024*1024, 30, level, fmt='%(asctime)s | %(message)s'),  # 50MB
     )
-    sent_handler.setLevel(logging.INFO)
-    sent_formatter = logging.Formatter(
-        '%(asctime)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    sent_handler.setFormatter(sent_formatter)
-    sent_logger.addHandler(sent_handler)
-    
+
     # 외부 라이브러리 로그 레벨 조정
     logging.getLogger("telethon").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
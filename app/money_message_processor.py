@@ -4,7 +4,6 @@
 저장된 돈버는 정보 메시지들을 조회하고 분석/처리할 수 있는 도구
 """
 
-import json
 import os
 import sys
 from datetime import datetime
@@ -14,6 +13,7 @@ import argparse
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.json_utils import dumps_pretty, loads
 from app.storage import SQLiteStore, MoneyMessageRecord
 
 # settings 대신 직접 DB 경로 설정
@@ -48,7 +48,7 @@ class MoneyMessageProcessor:
                     print(f"   포워딩: {msg.forward_text[:200]}...")
                 if msg.image_paths != '[]':
                     try:
-                        images = json.loads(msg.image_paths)
+                        images = loads(msg.image_paths)
                         print(f"   이미지: {len(images)}개")
                     except:
                         print(f"   이미지: {msg.image_paths}")
@@ -59,41 +59,44 @@ class MoneyMessageProcessor:
             
             print("-" * 40)
     
-    def export_money_messages(self, output_file: str, format: str = 'json') -> None:
-        """돈버는 정보 메시지들을 파일로 내보내기"""
-        messages = self.store.get_money_messages(limit=1000)  # 최대 1000개
-        
-        if not messages:
-            print("💰 내보낼 돈버는 정보 메시지가 없습니다.")
-            return
+    def _export_record(self, msg: MoneyMessageRecord) -> dict:
+        """JSON 내보내기용 레코드 변환"""
+        return {
+            'id': msg.id,
+            'chat_id': msg.chat_id,
+            'message_id': msg.message_id,
+            'date': datetime.fromtimestamp(msg.date_ts).isoformat(),
+            'author': msg.author,
+            'original_text': msg.original_text,
+            'forward_text': msg.forward_text,
+            'money_making_info': msg.money_making_info,
+            'action_guide': msg.action_guide,
+            'image_paths': loads(msg.image_paths) if msg.image_paths != '[]' else [],
+            'forward_info': loads(msg.forward_info) if msg.forward_info != '{}' else {},
+            'original_link': msg.original_link,
+            'importance': msg.importance,
+            'categories': msg.categories,
+            'tags': msg.tags,
+            'summary': msg.summary,
+        }
+    
+    def export_money_messages(self, output_file: str, format: str = 'json', limit: Optional[int] = None) -> None:
+        """돈버는 정보 메시지들을 파일로 내보내기 (행 단위로 스트리밍, limit이 None이면 전체)"""
+        messages = self.store.iter_money_messages(limit=limit)
+        count = 0
         
         if format == 'json':
-            # JSON 형태로 내보내기
-            export_data = []
-            for msg in messages:
-                export_data.append({
-                    'id': msg.id,
-                    'chat_id': msg.chat_id,
-                    'message_id': msg.message_id,
-                    'date': datetime.fromtimestamp(msg.date_ts).isoformat(),
-                    'author': msg.author,
-                    'original_text': msg.original_text,
-                    'forward_text': msg.forward_text,
-                    'money_making_info': msg.money_making_info,
-                    'action_guide': msg.action_guide,
-                    'image_paths': json.loads(msg.image_paths) if msg.image_paths != '[]' else [],
-                    'forward_info': json.loads(msg.forward_info) if msg.forward_info != '{}' else {},
-                    'original_link': msg.original_link,
-                    'importance': msg.importance,
-                    'categories': msg.categories,
-                    'tags': msg.tags,
-                    'summary': msg.summary,
-                })
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            # JSON 배열을 한 항목씩 기록 (전체 목록을 메모리에 만들지 않음)
+            with open(output_file, 'wb') as f:
+                f.write(b'[')
+                for msg in messages:
+                    f.write(b',\n' if count else b'\n')
+                    f.write(dumps_pretty(self._export_record(msg)))
+                    count += 1
+                f.write(b'\n]\n' if count else b']\n')
             
-            print(f"💰 {len(export_data)}개의 돈버는 정보 메시지를 {output_file}에 JSON 형태로 내보냈습니다.")
+            if count:
+                print(f"💰 {count}개의 돈버는 정보 메시지를 {output_file}에 JSON 형태로 내보냈습니다.")
         
         elif format == 'csv':
             # CSV 형태로 내보내기
@@ -115,60 +118,43 @@ class MoneyMessageProcessor:
                         msg.importance, msg.categories, msg.tags, msg.original_link,
                         msg.original_text[:500], msg.forward_text[:500], msg.summary[:500]
                     ])
+                    count += 1
             
-            print(f"💰 {len(messages)}개의 돈버는 정보 메시지를 {output_file}에 CSV 형태로 내보냈습니다.")
+            if count:
+                print(f"💰 {count}개의 돈버는 정보 메시지를 {output_file}에 CSV 형태로 내보냈습니다.")
+        
+        if not count:
+            print("💰 내보낼 돈버는 정보 메시지가 없습니다.")
     
     def get_money_stats(self) -> None:
         """돈버는 정보 메시지 통계 출력"""
-        messages = self.store.get_money_messages(limit=1000)
+        # 집계는 SQLite에서 GROUP BY로 수행 (행을 파이썬으로 가져와 순회하지 않음)
+        stats = self.store.get_money_stats(top_n=10)
         
-        if not messages:
+        if not stats["total"]:
             print("💰 통계를 계산할 돈버는 정보 메시지가 없습니다.")
             return
         
-        # 중요도별 통계
-        importance_stats = {}
-        category_stats = {}
-        tag_stats = {}
-        
-        for msg in messages:
-            # 중요도 통계
-            importance_stats[msg.importance] = importance_stats.get(msg.importance, 0) + 1
-            
-            # 카테고리 통계
-            categories = msg.categories.split(',') if msg.categories else []
-            for cat in categories:
-                cat = cat.strip()
-                if cat:
-                    category_stats[cat] = category_stats.get(cat, 0) + 1
-            
-            # 태그 통계
-            tags = msg.tags.split(',') if msg.tags else []
-            for tag in tags:
-                tag = tag.strip()
-                if tag:
-                    tag_stats[tag] = tag_stats.get(tag, 0) + 1
-        
-        print(f"💰 돈버는 정보 메시지 통계 (총 {len(messages)}개):")
+        print(f"💰 돈버는 정보 메시지 통계 (총 {stats['total']}개):")
         print("=" * 50)
         
         print("\n📊 중요도별 분포:")
-        for importance, count in sorted(importance_stats.items(), key=lambda x: x[1], reverse=True):
+        for importance, count in stats["importance"].items():
             print(f"   {importance}: {count}개")
         
         print("\n📊 카테고리별 분포:")
-        for category, count in sorted(category_stats.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for category, count in stats["categories"].items():
             print(f"   {category}: {count}개")
         
         print("\n📊 태그별 분포 (상위 10개):")
-        for tag, count in sorted(tag_stats.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for tag, count in stats["tags"].items():
             print(f"   {tag}: {count}개")
 
 
 def main():
     parser = argparse.ArgumentParser(description="돈버는 정보 메시지 처리 유틸리티")
     parser.add_argument('action', choices=['list', 'export', 'stats'], help='실행할 작업')
-    parser.add_argument('--limit', type=int, default=50, help='조회할 메시지 개수 (기본값: 50)')
+    parser.add_argument('--limit', type=int, default=None, help='조회할 메시지 개수 (기본값: list 50, export 전체)')
     parser.add_argument('--details', action='store_true', help='상세 정보 출력 (list 명령어와 함께 사용)')
     parser.add_argument('--output', type=str, help='출력 파일 경로 (export 명령어와 함께 사용)')
     parser.add_argument('--format', choices=['json', 'csv'], default='json', help='내보내기 형식 (기본값: json)')
@@ -178,13 +164,13 @@ def main():
     processor = MoneyMessageProcessor()
     
     if args.action == 'list':
-        processor.list_money_messages(limit=args.limit, show_details=args.details)
+        processor.list_money_messages(limit=args.limit or 50, show_details=args.details)
     
     elif args.action == 'export':
         if not args.output:
             print("❌ export 명령어는 --output 옵션이 필요합니다.")
             sys.exit(1)
-        processor.export_money_messages(args.output, args.format)
+        processor.export_money_messages(args.output, args.format, limit=args.limit)
     
     elif args.action == 'stats':
         processor.get_money_stats()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """per초마다 rate개씩 채워지는 토큰 버킷 (최대 burst개 누적, 기본은 rate개)
+
+    acquire()는 토큰이 생길 때까지 대기하며, 대기자는 도착 순서대로 처리된다.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, burst: Optional[float] = None) -> None:
+        if rate <= 0 or per <= 0:
+            raise ValueError(f"잘못된 속도 제한: rate={rate}, per={per}")
+        self.fill_rate = rate / per  # 초당 채워지는 토큰 수
+        self.capacity = burst if burst is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """토큰 하나 사용 (부족하면 채워질 때까지 대기)"""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.fill_rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self) -> "TokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
@@ -1,18 +1,48 @@
 from __future__ import annotations
 
 import re
-from typing import List, Tuple
+from enum import IntEnum
+from typing import List, Optional, Sequence, Tuple
 
+from app.llm import AnalysisResult
 
-EVENT_TERMS = re.compile(
-    r"(이벤트|추첨|경품|기프티콘|커피|스타벅스|나눔|쿠폰|리워드|럭키\s?드로우|라플|raffle|giveaway|bounty|reward|에어\s?드랍|air\s?drop|airdrop)",
-    re.IGNORECASE,
-)
+try:
+    # google-re2: 리터럴 대안 위주의 패턴을 DFA로 매칭 (백트래킹 없음)
+    import re2 as _regex
+except ImportError:  # 미설치 시 표준 re 사용
+    _regex = re
+
+try:
+    # pyahocorasick: 리터럴 키워드 집합을 한 번의 선형 스캔으로 매칭
+    import ahocorasick
+except ImportError:  # 미설치 시 결합 정규식으로 판정
+    ahocorasick = None
+
+
+class Importance(IntEnum):
+    """중요도 순서 (정수 비교로 부스팅/임계값 판정)"""
+
+    low = 0
+    medium = 1
+    high = 2
+
+    @classmethod
+    def parse(cls, value: str) -> "Importance":
+        """문자열 중요도 변환 (알 수 없는 값은 low)"""
+        return cls.__members__.get(value, cls.low)
+
+
+def _compile(pattern: str):
+    """대소문자 무시 정규식 컴파일 (re2/re 공통으로 인라인 (?i) 플래그 사용)"""
+    return _regex.compile(f"(?i){pattern}")
 
-ACTION_TERMS = re.compile(
-    r"(참여|참가|신청|등록|리트윗|\bRT\b|팔로우|팔로윙|팔로|like|좋아요|코멘트|댓글|share|공유|퀘스트|gleam|galxe|zealy)",
-    re.IGNORECASE,
-)
+
+_EVENT_PATTERN = r"(이벤트|추첨|경품|기프티콘|커피|스타벅스|나눔|쿠폰|리워드|럭키\s?드로우|라플|raffle|giveaway|bounty|reward|에어\s?드랍|air\s?drop|airdrop)"
+_ACTION_PATTERN = r"(참여|참가|신청|등록|리트윗|\bRT\b|팔로우|팔로윙|팔로|like|좋아요|코멘트|댓글|share|공유|퀘스트|gleam|galxe|zealy)"
+
+EVENT_TERMS = _compile(_EVENT_PATTERN)
+
+ACTION_TERMS = _compile(_ACTION_PATTERN)
 
 # 중요 링크 패턴 추가
 IMPORTANT_LINK_PATTERNS = [
@@ -27,7 +57,90 @@ IMPORTANT_LINK_PATTERNS = [
     r"(event|launch|listing|announcement)",
 ]
 
-IMPORTANT_LINK_REGEX = re.compile("|".join(IMPORTANT_LINK_PATTERNS), re.IGNORECASE)
+_LINK_PATTERN = "|".join(IMPORTANT_LINK_PATTERNS)
+IMPORTANT_LINK_REGEX = _compile(_LINK_PATTERN)
+
+# 세 패턴을 이름 있는 그룹으로 합친 정규식 (메시지당 한 번의 스캔으로 세 플래그를 판정)
+_RULE_PATTERNS = {
+    "event": EVENT_TERMS,
+    "action": ACTION_TERMS,
+    "link": IMPORTANT_LINK_REGEX,
+}
+_COMBINED = _compile(
+    f"(?P<event>{_EVENT_PATTERN})|(?P<action>{_ACTION_PATTERN})|(?P<link>{_LINK_PATTERN})"
+)
+
+
+def _scan_rule_flags_regex(text: str) -> dict:
+    """event/action/link 패턴 포함 여부를 한 번의 스캔으로 판정"""
+    flags = dict.fromkeys(_RULE_PATTERNS, False)
+    matched_any = False
+    for m in _COMBINED.finditer(text):
+        matched_any = True
+        flags[m.lastgroup] = True
+        # 한 위치에서는 한 그룹만 매치되므로 ("airdrop"은 event/link 모두 해당) 매치 구간을 다른 패턴으로도 확인
+        span = m.group()
+        for name, pattern in _RULE_PATTERNS.items():
+            if not flags[name] and pattern.search(span):
+                flags[name] = True
+        if all(flags.values()):
+            break
+    # 매치가 전혀 없으면 어떤 패턴도 없음이 확정되고, 일부만 확인된 경우에만 남은 패턴을 개별 확인
+    if matched_any:
+        for name, pattern in _RULE_PATTERNS.items():
+            if not flags[name]:
+                flags[name] = pattern.search(text) is not None
+    return flags
+
+
+_REGEX_META = re.compile(r"[\\.^$*+?{}\[\]()]")
+
+
+def _split_literals(pattern: str) -> Tuple[List[str], Optional[str]]:
+    """(a|b|...) 형태 패턴을 리터럴 키워드 목록과 나머지 정규식 대안으로 분리"""
+    literals: List[str] = []
+    rest: List[str] = []
+    for alternative in pattern[1:-1].split("|"):
+        (rest if _REGEX_META.search(alternative) else literals).append(alternative)
+    return literals, ("|".join(rest) or None)
+
+
+def _build_automaton():
+    """event/action 리터럴 키워드의 Aho-Corasick 오토마톤과 리터럴이 아닌 대안(공백 허용 키워드, 단어 경계 RT)의 정규식"""
+    names_by_word = {}
+    residual = {}
+    for name, pattern in (("event", _EVENT_PATTERN), ("action", _ACTION_PATTERN)):
+        literals, rest = _split_literals(pattern)
+        for word in literals:
+            names_by_word.setdefault(word.lower(), set()).add(name)
+        residual[name] = _compile(rest) if rest else None
+    automaton = ahocorasick.Automaton()
+    for word, names in names_by_word.items():
+        automaton.add_word(word, tuple(names))
+    automaton.make_automaton()
+    return automaton, residual
+
+
+def _scan_rule_flags_automaton(text: str) -> dict:
+    """event/action은 오토마톤 한 번 + 남은 정규식 대안, link는 정규식으로 판정"""
+    flags = dict.fromkeys(_RULE_PATTERNS, False)
+    for _, names in _AUTOMATON.iter(text.lower()):
+        for name in names:
+            flags[name] = True
+        if flags["event"] and flags["action"]:
+            break
+    for name, pattern in _RESIDUAL_PATTERNS.items():
+        if not flags[name] and pattern is not None:
+            flags[name] = pattern.search(text) is not None
+    flags["link"] = IMPORTANT_LINK_REGEX.search(text) is not None
+    return flags
+
+
+if ahocorasick is not None:
+    _AUTOMATON, _RESIDUAL_PATTERNS = _build_automaton()
+    _scan_rule_flags = _scan_rule_flags_automaton
+else:
+    _scan_rule_flags = _scan_rule_flags_regex
 
 
 def boost_importance_for_events(text: str, current_importance: str) -> Tuple[str, List[str], List[str]]:
@@ -35,26 +148,24 @@ def boost_importance_for_events(text: str, current_importance: str) -> Tuple[str
     Rule-based boost: If text mentions an event/giveaway and participation/action terms,
     raise importance. Returns (new_importance, extra_categories, extra_tags).
     """
-    has_event = EVENT_TERMS.search(text) is not None
-    has_action = ACTION_TERMS.search(text) is not None
-    has_important_link = IMPORTANT_LINK_REGEX.search(text) is not None
+    flags = _scan_rule_flags(text)
+    has_event = flags["event"]
+    has_action = flags["action"]
+    has_important_link = flags["link"]
 
-    importance_order = {"low": 0, "medium": 1, "high": 2}
-    cur = importance_order.get(current_importance, 0)
-    new = cur
+    new = Importance.parse(current_importance)
 
     # 중요 링크가 있으면 무조건 high로 부스팅
     if has_important_link:
-        new = max(new, importance_order["high"])
+        new = max(new, Importance.high)
     
     # 이벤트 + 액션 키워드가 있으면 high로 부스팅
     elif has_event and has_action:
-        new = max(new, importance_order["high"])  # strong boost
+        new = max(new, Importance.high)  # strong boost
     elif has_event:
-        new = max(new, importance_order["medium"])  # mild boost
+        new = max(new, Importance.medium)  # mild boost
 
-    inv = {v: k for k, v in importance_order.items()}
-    new_importance = inv.get(new, current_importance)
+    new_importance = new.name
 
     extra_categories: List[str] = []
     extra_tags: List[str] = []
@@ -70,3 +181,37 @@ def boost_importance_for_events(text: str, current_importance: str) -> Tuple[str
     return new_importance, extra_categories, extra_tags
 
 
+# 문자(한글/영문 등)가 하나도 없는 이 길이 미만의 메시지는 LLM 없이 버림 (이모지/숫자/기호만)
+QUICK_SKIP_MAX_LEN = 20
+
+
+def quick_classify(text: str) -> Optional[AnalysisResult]:
+    """LLM 호출 전 규칙 기반 사전 분류 (LLM 분석이 필요하면 None)
+
+    - 짧고 문자가 없는 메시지: 코인 무관/low 결과 (LLM 호출 생략)
+    """
+    stripped = text.strip()
+    if len(stripped) < QUICK_SKIP_MAX_LEN and not any(ch.isalpha() for ch in stripped):
+        return AnalysisResult(
+            is_coin_related=False,
+            has_valuable_info=False,
+            importance="low",
+            categories=[],
+            tags=[],
+            summary="",
+            money_making_info="없음",
+            action_guide="추가 정보 대기",
+            event_products="없음",
+            relevance_reason="규칙 기반 사전 분류: 문자가 없는 짧은 메시지",
+            info_value_reason="규칙 기반 사전 분류: 문자가 없는 짧은 메시지",
+        )
+
+    return None
+
+
+def is_important_event(text: str, links: Sequence[str]) -> bool:
+    """이벤트 + 참여 키워드가 있고 추출된 링크 중 중요 링크(폼/에어드랍 등)가 있는지"""
+    if not any(IMPORTANT_LINK_REGEX.search(link) for link in links):
+        return False
+    flags = _scan_rule_flags(text)
+    return flags["event"] and flags["action"]
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timedelta
+import dataclasses
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, Optional, Tuple
 
 from app.config import load_settings, load_source_channels, add_source_channel, remove_source_channel
 from app.formatter import build_original_link, format_html
 from app.llm import OpenAILLM
-from app.storage import SQLiteStore
+from app.storage import EMPTY_EMBEDDING, AnalysisWriter, SQLiteStore, pack_embedding
 from app.telegram_client import TG
 from app.logging_utils import setup_logging
-from app.rules import boost_importance_for_events
-from app.image_processor import ImageProcessor
+from app.rules import Importance, boost_importance_for_events, is_important_event, quick_classify
 from app.link_processor import LinkProcessor
 from app.embedding_client import UpstageEmbeddingClient
 from app.sent_message_logger import SentMessageLogger
@@ -21,11 +24,73 @@ import logging
 import sqlite3
 import os
 import re
-import json
+import time
 from telethon import utils
 
 
-IMPORTANCE_ORDER = {"low": 0, "medium": 1, "high": 2}
+# 캐시에 없는 채널의 메타데이터 (메시지마다 빈 dict를 만들지 않도록 공유하는 읽기 전용 객체)
+EMPTY_META = MappingProxyType({})
+
+# SQLite에 저장된 채널 메타데이터 유효 기간 (초과 시 get_entity로 갱신)
+CHANNEL_META_TTL_SEC = 30 * 24 * 3600
+# 메모리 채널 메타데이터 캐시 크기와 유효 기간 (초과 시 SQLite/get_entity에서 다시 조회)
+CHANNEL_CACHE_SIZE = 1024
+CHANNEL_CACHE_TTL_SEC = 3600
+
+
+def _media_key(media) -> Optional[str]:
+    """Telegram 미디어의 사진/문서 ID 기반 키 (ID가 없으면 None)"""
+    for attr in ("photo", "document"):
+        file_id = getattr(getattr(media, attr, None), "id", None)
+        if file_id is not None:
+            return f"{attr}:{file_id}"
+    return None
+
+
+# 무의미한 메시지 패턴 (한 정규식으로 합쳐 모듈 로드 시 한 번만 컴파일)
+_MEANINGLESS_PATTERNS = (
+    r'^\s*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>/?~`]+\s*$',  # 특수문자만
+    r'^\s*[a-zA-Z0-9]{1,3}\s*$',  # 1-3자리 영숫자만
+    r'^\s*(안녕|하이|ㅎㅇ|ㅎㅇㅎㅇ|ㅋㅋ|ㅎㅎ|ㅇㅇ|ㄴㄴ|ㅇㅈ|ㄴㄴㄴ)\s*$',  # 인사말만
+    r'^\s*(좋아요|👍|❤️|💕|💖|💗|💘|💙|💚|💛|💜|🖤|🤍|🤎)\s*$',  # 이모지만
+    r'^\s*(ㅇ|ㄴ|ㅇㅇ|ㄴㄴ|ㅇㅈ|ㄴㄴㄴ)\s*$',  # 짧은 답변만
+)
+_MEANINGLESS_RE = re.compile("|".join(f"(?:{p})" for p in _MEANINGLESS_PATTERNS), re.IGNORECASE)
+
+# 내용 없는 요약 문구 (LLM이 요약을 거부한 경우)
+_MEANINGLESS_SUMMARY_RE = re.compile("|".join((
+    r'구체적인 내용이 부족',
+    r'요약하기 어렵습니다',
+    r'추가적인 정보나 문맥이 필요',
+    r'요약할 수 있는 구체적인 내용이 없',
+    r'내용이 부족하여 요약하기 어렵',
+    r'구체적인 정보가 부족',
+    r'요약할 만한 내용이',
+    r'추가 정보가 필요합니다',
+    r'문맥이 부족',
+    r'구체적인 내용이 없습니다',
+    r'요약하기 어려운 내용입니다',
+    r'추가적인 내용이나 맥락이 부족',
+)), re.IGNORECASE)
+
+# 중요도가 낮아도 전송할 키워드 (소문자)
+_IMPORTANT_KEYWORDS = ('airdrop', 'launch', 'listing', 'whitelist', 'presale', 'ico', 'ido', 'nft', 'dao', 'defi', 'gamefi', 'metaverse')
+
+
+async def _resolved(value):
+    """asyncio.gather에 넘길 즉시 완료되는 코루틴 (건너뛴 작업의 기본값)"""
+    return value
+
+
+class PolledEvent:
+    """폴링으로 가져온 메시지를 handle_message가 기대하는 이벤트 형태로 감싼 객체"""
+
+    __slots__ = ("message", "chat_id", "chat")
+
+    def __init__(self, message, chat_id: int):
+        self.message = message
+        self.chat_id = chat_id
+        self.chat = None
 
 
 def format_time(timestamp):
@@ -36,6 +101,11 @@ def format_time(timestamp):
     return None
 
 
+# 포워드 헤더에서 원본 채팅 ID / 메시지 ID를 찾을 속성 (우선순위 순)
+_FWD_CHAT_ATTRS = ("chat_id", "channel_id", "user_id")
+_FWD_MSG_ATTRS = ("channel_post", "saved_from_msg_id", "id")
+
+
 def extract_forward_info(msg) -> Tuple[bool, Optional[int], Optional[int], Optional[str]]:
 	"""
 	메시지가 forward된 것인지 확인하고 원본 정보를 추출
@@ -45,10 +115,9 @@ def extract_forward_info(msg) -> Tuple[bool, Optional[int], Optional[int], Optio
 	"""
 	# Telethon 스펙 기반 포워드 감지
 	mlog = logging.getLogger("app.msg")
-	from telethon import utils as _tg_utils
 	fwd = getattr(msg, 'fwd_from', None) or getattr(msg, 'forward', None)
 	is_forward = fwd is not None
-	mlog.info(f"포워드 감지: is_forward={is_forward}, fwd_type={type(fwd)}")
+	mlog.debug("포워드 감지: is_forward=%s", is_forward)
 	
 	if is_forward:
 		# Forward된 메시지인 경우
@@ -56,69 +125,66 @@ def extract_forward_info(msg) -> Tuple[bool, Optional[int], Optional[int], Optio
 		original_message_id = None
 		original_text = getattr(msg, 'message', '')
 		
-		# Forward 객체 정보 로깅 (디버깅용)
-		mlog.info(f"=== FORWARD 정보 추출 시작 ===")
-		mlog.info(f"Forward 객체 타입: {type(fwd)}")
-		mlog.info(f"Forward 객체 속성: {[attr for attr in dir(fwd) if not attr.startswith('_')]}")
+		# Forward 객체 정보 로깅 (디버깅용, dir()은 비싸므로 DEBUG 레벨에서만)
+		mlog.debug("=== FORWARD 정보 추출 시작 ===")
+		if mlog.isEnabledFor(logging.DEBUG):
+			mlog.debug("Forward 객체 타입: %s", type(fwd))
+			mlog.debug("Forward 객체 속성: %s", [attr for attr in dir(fwd) if not attr.startswith('_')])
+		
+		# 원본 채널/채팅 정보 추출 (값이 있는 첫 속성 사용)
+		for attr in _FWD_CHAT_ATTRS:
+			value = getattr(fwd, attr, None)
+			if value is not None:
+				original_chat_id = value
+				mlog.debug("%s에서 추출: %s", attr, original_chat_id)
+				break
 		
-		# 원본 채널/채팅 정보 추출
-		if hasattr(fwd, 'chat_id'):
-			original_chat_id = fwd.chat_id
-			mlog.info(f"chat_id에서 추출: {original_chat_id}")
-		elif hasattr(fwd, 'channel_id'):
-			original_chat_id = fwd.channel_id
-			mlog.info(f"channel_id에서 추출: {original_chat_id}")
-		elif hasattr(fwd, 'user_id'):
-			original_chat_id = fwd.user_id
-			mlog.info(f"user_id에서 추출: {original_chat_id}")
-		elif hasattr(fwd, 'from_id') and getattr(fwd, 'from_id') is not None:
+		from_id = getattr(fwd, 'from_id', None)
+		if original_chat_id is None and from_id is not None:
 			# MessageFwdHeader.from_id → PeerChannel/PeerUser/PeerChat
-			from_id = fwd.from_id
-			mlog.info(f"from_id 타입: {type(from_id)}")
-			mlog.info(f"from_id 속성: {[attr for attr in dir(from_id) if not attr.startswith('_')]}")
+			if mlog.isEnabledFor(logging.DEBUG):
+				mlog.debug("from_id 타입: %s", type(from_id))
+				mlog.debug("from_id 속성: %s", [attr for attr in dir(from_id) if not attr.startswith('_')])
 			try:
 				# from_id가 유효한 peer 객체인지 확인하고 타입 체크 (Channel, User, Chat 등 허용)
 				if (hasattr(from_id, 'channel_id') or hasattr(from_id, 'user_id') or hasattr(from_id, 'chat_id')) and not isinstance(from_id, str) and hasattr(from_id, '__class__'):
-					original_chat_id = _tg_utils.get_peer_id(from_id)
-					mlog.info(f"utils.get_peer_id(from_id) → {original_chat_id}")
+					original_chat_id = utils.get_peer_id(from_id)
+					mlog.debug("utils.get_peer_id(from_id) → %s", original_chat_id)
 				else:
-					mlog.info(f"유효하지 않은 from_id 타입: {type(from_id)}, 클래스: {getattr(from_id, '__class__', 'Unknown')}")
+					mlog.debug("유효하지 않은 from_id 타입: %s, 클래스: %s", type(from_id), getattr(from_id, '__class__', 'Unknown'))
 			except Exception as e:
-				mlog.info(f"from_id peer 변환 실패: {e}")
+				mlog.debug("from_id peer 변환 실패: %s", e)
 		
 		# Saved-from 경로 (메시지 링크로 저장된 경우)
-		if original_chat_id is None and hasattr(fwd, 'saved_from_peer') and getattr(fwd, 'saved_from_peer') is not None:
+		saved_from_peer = getattr(fwd, 'saved_from_peer', None)
+		if original_chat_id is None and saved_from_peer is not None:
 			try:
 				# saved_from_peer도 타입 체크 (Channel, User, Chat 등 허용)
-				if (not isinstance(fwd.saved_from_peer, str) and 
-					hasattr(fwd.saved_from_peer, '__class__')):
-					original_chat_id = _tg_utils.get_peer_id(fwd.saved_from_peer)
-					mlog.info(f"saved_from_peer → {original_chat_id}")
+				if (not isinstance(saved_from_peer, str) and 
+					hasattr(saved_from_peer, '__class__')):
+					original_chat_id = utils.get_peer_id(saved_from_peer)
+					mlog.debug("saved_from_peer → %s", original_chat_id)
 				else:
-					mlog.info(f"유효하지 않은 saved_from_peer 타입: {type(fwd.saved_from_peer)}, 클래스: {getattr(fwd.saved_from_peer, '__class__', 'Unknown')}")
+					mlog.debug("유효하지 않은 saved_from_peer 타입: %s, 클래스: %s", type(saved_from_peer), getattr(saved_from_peer, '__class__', 'Unknown'))
 			except Exception as e:
-				mlog.info(f"saved_from_peer 변환 실패: {e}")
+				mlog.debug("saved_from_peer 변환 실패: %s", e)
 		
-		# 원본 메시지 ID 추출
-		if hasattr(fwd, 'channel_post') and getattr(fwd, 'channel_post') is not None:
-			original_message_id = fwd.channel_post
-			mlog.info(f"fwd.channel_post에서 메시지 ID 추출: {original_message_id}")
-		elif hasattr(fwd, 'saved_from_msg_id') and getattr(fwd, 'saved_from_msg_id') is not None:
-			original_message_id = fwd.saved_from_msg_id
-			mlog.info(f"fwd.saved_from_msg_id에서 메시지 ID 추출: {original_message_id}")
-		elif hasattr(fwd, 'id') and getattr(fwd, 'id') is not None:
-			# 일부 클라이언트가 id 필드를 제공하기도 함
-			original_message_id = fwd.id
-			mlog.info(f"fwd.id에서 메시지 ID 추출: {original_message_id}")
+		# 원본 메시지 ID 추출 (일부 클라이언트는 id 필드를 제공하기도 함)
+		for attr in _FWD_MSG_ATTRS:
+			value = getattr(fwd, attr, None)
+			if value is not None:
+				original_message_id = value
+				mlog.debug("fwd.%s에서 메시지 ID 추출: %s", attr, original_message_id)
+				break
 		
-		mlog.info(f"=== FORWARD 정보 추출 결과 ===")
-		mlog.info(f"원본 chat_id: {original_chat_id}")
-		mlog.info(f"원본 msg_id: {original_message_id}")
-		mlog.info(f"원본 텍스트 길이: {len(original_text)}")
+		mlog.debug("=== FORWARD 정보 추출 결과 ===")
+		mlog.debug("원본 chat_id: %s", original_chat_id)
+		mlog.debug("원본 msg_id: %s", original_message_id)
+		mlog.debug("원본 텍스트 길이: %s", len(original_text))
 		return True, original_chat_id, original_message_id, original_text
 	
 	# Forward 아님
-	mlog.info("포워드 메시지가 아님")
+	mlog.debug("포워드 메시지가 아님")
 	return False, None, None, None
 
 
@@ -135,7 +201,8 @@ async def main() -> None:
         logger.error("SOURCE_CHANNELS is empty")
         raise RuntimeError("SOURCE_CHANNELS가 비어 있습니다.")
 
-    store = SQLiteStore(settings.sqlite_path)
+    store = SQLiteStore(settings.sqlite_path, embedding_dtype=settings.dedup_embedding_dtype)
+    analysis_writer = AnalysisWriter(store)  # 분석이 끝난 메시지 행은 모아서 한 트랜잭션으로 기록
     if not settings.openai_api_key:
         logger.error("Missing OPENAI_API_KEY")
         raise RuntimeError("OPENAI_API_KEY가 필요합니다. .env를 설정하세요.")
@@ -143,12 +210,26 @@ async def main() -> None:
         logger.error("Missing UPSTAGE_API_KEY")
         raise RuntimeError("UPSTAGE_API_KEY가 필요합니다. .env를 설정하세요.")
     
-    llm = OpenAILLM(settings.openai_api_key, settings.openai_model)
+    llm = OpenAILLM(
+        settings.openai_api_key,
+        settings.openai_model,
+        store=store,
+        batch_size=settings.llm_batch_size,
+        batch_wait_ms=settings.llm_batch_wait_ms,
+        max_concurrency=settings.llm_concurrency,
+        max_rpm=settings.llm_rpm,
+    )
     tg = TG(settings.telegram_session, settings.telegram_api_id, settings.telegram_api_hash, settings.bot_token)
     
     # 임베딩, 이미지, 링크 처리기 초기화
     embedding_client = UpstageEmbeddingClient(settings.upstage_api_key)
-    image_processor = ImageProcessor()
+    if settings.enable_ocr:
+        # EasyOCR/OpenCV/torch는 OCR을 켠 경우에만 로드
+        from app.image_processor import ImageProcessor
+        image_processor = ImageProcessor(processes=settings.ocr_processes)
+    else:
+        logger.info("OCR 비활성화 (ENABLE_OCR=0): 이미지 텍스트 추출 건너뜀")
+        image_processor = None
     link_processor = LinkProcessor()
     sent_logger = SentMessageLogger()
     
@@ -172,7 +253,9 @@ async def main() -> None:
             )
         raise
 
-    channel_cache: Dict[int, dict] = {}  # 메타데이터 캐시
+    channel_cache: "OrderedDict[int, Tuple[dict, float]]" = OrderedDict()  # 메타데이터 LRU 캐시 (메타데이터, 저장 시각)
+    channel_meta_inflight: Dict[int, asyncio.Task] = {}  # 조회 중인 채널 메타데이터 (같은 채널 동시 조회는 한 번만 수행)
+    pipeline_sem = asyncio.Semaphore(settings.pipeline_concurrency)  # 동시 처리 메시지 수 제한
     entity_cache: Dict[int, object] = {}  # Telethon 엔티티 캐시
     
     def clear_old_cache():
@@ -185,6 +268,25 @@ async def main() -> None:
                 del entity_cache[key]
             logger.info(f"캐시 정리 완료: {len(entity_cache)}개 엔티티 남음")
 
+    def cache_channel_meta(chat_id: int, meta: dict) -> None:
+        """채널 메타데이터를 메모리 캐시에 저장 (용량 초과 시 가장 오래 쓰이지 않은 항목 제거)"""
+        channel_cache[chat_id] = (meta, time.monotonic())
+        channel_cache.move_to_end(chat_id)
+        if len(channel_cache) > CHANNEL_CACHE_SIZE:
+            channel_cache.popitem(last=False)
+
+    def cached_channel_meta(chat_id: int) -> Optional[dict]:
+        """메모리 캐시의 채널 메타데이터 (없거나 만료되면 None)"""
+        entry = channel_cache.get(chat_id)
+        if entry is None:
+            return None
+        meta, cached_at = entry
+        if time.monotonic() - cached_at > CHANNEL_CACHE_TTL_SEC:
+            del channel_cache[chat_id]
+            return None
+        channel_cache.move_to_end(chat_id)
+        return meta
+
     async def ensure_channel_meta(identifier: str) -> dict:
         try:
             meta = await tg.iter_channel_meta(identifier)
@@ -243,8 +345,29 @@ async def main() -> None:
 
     async def get_channel_meta(chat_id: int) -> dict:
         """채널 메타데이터를 가져오거나 캐시에서 찾기"""
-        if chat_id in channel_cache:
-            return channel_cache[chat_id]
+        meta = cached_channel_meta(chat_id)
+        if meta is not None:
+            return meta
+        
+        task = channel_meta_inflight.get(chat_id)
+        if task is None:
+            task = asyncio.create_task(fetch_channel_meta(chat_id))
+            channel_meta_inflight[chat_id] = task
+            task.add_done_callback(lambda _: channel_meta_inflight.pop(chat_id, None))
+        # 한 대기자가 취소되어도 같은 채널을 기다리는 다른 메시지의 조회는 계속되도록 보호
+        return await asyncio.shield(task)
+
+    async def fetch_channel_meta(chat_id: int) -> dict:
+        """SQLite 또는 get_entity로 채널 메타데이터를 조회하여 캐시에 저장"""
+        # L2: 이전 실행에서 저장한 메타데이터 (Telegram RPC 생략)
+        try:
+            meta = await asyncio.to_thread(store.load_channel_meta, chat_id, int(time.time()) - CHANNEL_META_TTL_SEC)
+        except Exception as e:
+            logger.warning(f"채널 메타데이터 DB 조회 실패 (chat_id={chat_id}): {e}")
+            meta = None
+        if meta is not None:
+            cache_channel_meta(chat_id, meta)
+            return meta
         
         try:
             # 채널 엔티티를 직접 가져와서 메타데이터 생성
@@ -273,7 +396,11 @@ async def main() -> None:
                 else:
                     logger.warning(f"유효하지 않은 엔티티 타입으로 internal_id 계산 건너뜀: {type(entity)}")
             
-            channel_cache[chat_id] = meta
+            cache_channel_meta(chat_id, meta)
+            try:
+                await asyncio.to_thread(store.save_channel_meta, meta, int(time.time()))
+            except Exception as e:
+                logger.warning(f"채널 메타데이터 DB 저장 실패 (chat_id={chat_id}): {e}")
             logger.info(f"채널 메타데이터 캐시 저장: {meta}")
             return meta
         except Exception as e:
@@ -286,11 +413,11 @@ async def main() -> None:
                 "internal_id": None,
                 "is_public": False,
             }
-            channel_cache[chat_id] = meta
+            cache_channel_meta(chat_id, meta)
             return meta
 
     # Preload source channel metas and entities
-    chat_filters = []
+    chat_filters: set[int] = set()  # 모니터링 채널 ID (메시지마다 멤버십 검사)
     removed_channels = set()  # 제거된 채널 목록을 메모리에 유지
     logger.info(f"=== 소스 채널 메타데이터 및 엔티티 로딩 시작 ===")
     
@@ -304,7 +431,7 @@ async def main() -> None:
         logger.info(f"채널 로딩 중: {src}")
         try:
             meta = await ensure_channel_meta(src)
-            channel_cache[meta["chat_id"]] = meta
+            cache_channel_meta(meta["chat_id"], meta)
             
             # 삭제되었거나 접근할 수 없는 채널인지 확인
             if "Deleted/Inaccessible" in meta.get("title", "") or "Error" in meta.get("title", ""):
@@ -347,7 +474,7 @@ async def main() -> None:
             continue
         else:
             # 채팅 기능이 없는 경우 추가 (순수 방송 채널)
-            chat_filters.append(meta["chat_id"])
+            chat_filters.add(meta["chat_id"])
             
             # 연결된 채널/그룹 정보 로깅
             linked_info = ""
@@ -400,7 +527,7 @@ async def main() -> None:
         msg = event.message
 
         # 메시지 처리 시작 로깅
-        mlog.info(f"🔍 메시지 처리 시작: chat_id={getattr(event, 'chat_id', 'unknown')}, msg_id={getattr(msg, 'id', 'unknown')}")
+        mlog.info("🔍 메시지 처리 시작: chat_id=%s, msg_id=%s", getattr(event, 'chat_id', 'unknown'), getattr(msg, 'id', 'unknown'))
 
         # Use event.chat_id directly; event.chat can be None depending on cache/state
         chat_id = getattr(event, "chat_id", None) or getattr(getattr(event, "chat", None), "id", None)
@@ -410,24 +537,24 @@ async def main() -> None:
 
         # numeric_chat_id가 정의되지 않은 경우 안전하게 처리
         if 'numeric_chat_id' not in locals():
-            mlog.warning(f"numeric_chat_id가 정의되지 않음, chat_id 사용: {chat_id}")
+            mlog.warning("numeric_chat_id가 정의되지 않음, chat_id 사용: %s", chat_id)
             numeric_chat_id = chat_id
         
         # 중복 메시지 체크를 먼저 수행 (리소스 절약)
-        if store.is_message_processed(numeric_chat_id, msg.id):
-            mlog.info(f"⏭️ 이미 처리된 메시지 건너뜀: chat_id={numeric_chat_id}, msg_id={msg.id}")
+        if await asyncio.to_thread(store.is_message_processed, numeric_chat_id, msg.id):
+            mlog.info("⏭️ 이미 처리된 메시지 건너뜀: chat_id=%s, msg_id=%s", numeric_chat_id, msg.id)
             return
 
         # 모든 메시지에 대한 기본 로깅 (디버깅용)
         message_text = getattr(msg, "message", "").strip()
-        mlog.info(f"📨 메시지 수신: chat_id={chat_id}, msg_id={msg.id}, len={len(message_text)}, preview={message_text[:50]}...")
+        mlog.info("📨 메시지 수신: chat_id=%s, msg_id=%s, len=%s, preview=%.50s...", chat_id, msg.id, len(message_text), message_text)
 
         # 채널 필터링: chat_id가 -100으로 시작하거나 @username 형태인 경우 채널
         chat_id_str = str(chat_id)
         is_channel = chat_id_str.startswith("-100") or chat_id_str.startswith("@")
         
         if not is_channel:
-            mlog.info(f"❌ 메시지 버림: 채팅방 메시지 (chat_id={chat_id}) - 채널만 모니터링")
+            mlog.info("❌ 메시지 버림: 채팅방 메시지 (chat_id=%s) - 채널만 모니터링", chat_id)
             return
 
         # 채널 댓글 스레드 감지 및 처리
@@ -444,18 +571,18 @@ async def main() -> None:
                 # 채널 메타데이터에서 타입 확인
                 meta = await get_channel_meta(chat_id)
                 if meta.get("chat_type") == "supergroup":
-                    mlog.info(f"❌ 메시지 버림: 채널 댓글 스레드 메시지 (chat_id={chat_id}, msg_id={msg.id}, thread_id={message_thread_id})")
+                    mlog.info("❌ 메시지 버림: 채널 댓글 스레드 메시지 (chat_id=%s, msg_id=%s, thread_id=%s)", chat_id, msg.id, message_thread_id)
                     return
             
             # 일반 답글은 처리, 토픽 스레드만 무시
             if has_top_thread:
-                mlog.info(f"❌ 메시지 버림: 토픽 스레드 메시지 (chat_id={chat_id}, msg_id={msg.id})")
+                mlog.info("❌ 메시지 버림: 토픽 스레드 메시지 (chat_id=%s, msg_id=%s)", chat_id, msg.id)
                 return
             if is_comment:
-                mlog.info(f"↪️ 답글 메시지 처리: (chat_id={chat_id}, msg_id={msg.id})")
+                mlog.info("↪️ 답글 메시지 처리: (chat_id=%s, msg_id=%s)", chat_id, msg.id)
                 
         except Exception as e:
-            mlog.warning(f"채널 댓글 스레드 감지 중 오류: {e}")
+            mlog.warning("채널 댓글 스레드 감지 중 오류: %s", e)
             # 오류 발생 시 기본적으로 처리 진행
 
         # @username 형태의 chat_id를 숫자 ID로 변환
@@ -469,25 +596,25 @@ async def main() -> None:
                     not isinstance(entity, str) and 
                     hasattr(entity, '__class__')):
                     numeric_chat_id = utils.get_peer_id(entity)
-                    mlog.info(f"@username을 숫자 ID로 변환: {chat_id} → {numeric_chat_id}")
+                    mlog.debug("@username을 숫자 ID로 변환: %s → %s", chat_id, numeric_chat_id)
                 else:
-                    mlog.warning(f"유효하지 않은 엔티티 타입: {chat_id}, 타입: {type(entity)}, 클래스: {getattr(entity, '__class__', 'Unknown')}")
+                    mlog.warning("유효하지 않은 엔티티 타입: %s, 타입: %s, 클래스: %s", chat_id, type(entity), getattr(entity, '__class__', 'Unknown'))
                     return
             except Exception as e:
-                mlog.warning(f"@username을 숫자 ID로 변환 실패: {chat_id}, 에러: {e}")
+                mlog.warning("@username을 숫자 ID로 변환 실패: %s, 에러: %s", chat_id, e)
                 return
         
         # numeric_chat_id가 정의되지 않은 경우 안전하게 처리
         if 'numeric_chat_id' not in locals():
-            mlog.warning(f"numeric_chat_id가 정의되지 않음, chat_id 사용: {chat_id}")
+            mlog.warning("numeric_chat_id가 정의되지 않음, chat_id 사용: %s", chat_id)
             numeric_chat_id = chat_id
 
         # 소스 채널 필터링: 설정된 채널만 처리
-        mlog.info(f"채널 필터링 확인: chat_id={numeric_chat_id}, chat_filters={chat_filters}")
+        mlog.debug("채널 필터링 확인: chat_id=%s, chat_filters=%s", numeric_chat_id, chat_filters)
         
         # 제거된 채널인지 확인
         if numeric_chat_id in removed_channels:
-            mlog.info(f"❌ 메시지 버림: 제거된 채널 - {numeric_chat_id}")
+            mlog.info("❌ 메시지 버림: 제거된 채널 - %s", numeric_chat_id)
             return
         
         if numeric_chat_id not in chat_filters:
@@ -497,22 +624,22 @@ async def main() -> None:
             
             # 디버깅: 왜 이 채널이 필터에서 제외되었는지 확인
             mlog.info(
-                f"미모니터링 채널 메시지: {meta.get('title', 'Unknown')} (@{meta.get('username', 'N/A')}) (chat_id={numeric_chat_id}) "
-                f"msg_id={msg.id}, len={len(message_text)} | {message_text[:50]}{'...' if len(message_text) > 50 else ''}"
+                "미모니터링 채널 메시지: %s (@%s) (chat_id=%s) msg_id=%s, len=%s | %.50s",
+                meta.get('title', 'Unknown'), meta.get('username', 'N/A'), numeric_chat_id, msg.id, len(message_text), message_text,
             )
-            mlog.info(f"채널 타입: megagroup={meta.get('is_megagroup')}, broadcast={meta.get('is_broadcast')}")
+            mlog.debug("채널 타입: megagroup=%s, broadcast=%s", meta.get('is_megagroup'), meta.get('is_broadcast'))
             
             # 방송 채널이 아닌 경우에만 무시 (메가그룹도 허용하도록 수정)
             if not meta.get('is_broadcast', False) and not meta.get('is_megagroup', False):
-                mlog.info(f"❌ 메시지 버림: 방송 채널도 메가그룹도 아님 - {meta.get('title', 'Unknown')} (chat_id={numeric_chat_id}, msg_id={msg.id})")
+                mlog.info("❌ 메시지 버림: 방송 채널도 메가그룹도 아님 - %s (chat_id=%s, msg_id=%s)", meta.get('title', 'Unknown'), numeric_chat_id, msg.id)
                 return
             else:
-                mlog.info(f"방송 채널 또는 메가그룹 - 처리 진행: {meta.get('title', 'Unknown')}")
+                mlog.debug("방송 채널 또는 메가그룹 - 처리 진행: %s", meta.get('title', 'Unknown'))
                 # 필터에 추가
-                chat_filters.append(numeric_chat_id)
-                channel_cache[numeric_chat_id] = meta
+                chat_filters.add(numeric_chat_id)
+                cache_channel_meta(numeric_chat_id, meta)
         else:
-            mlog.info(f"모니터링 대상 채널 확인됨: chat_id={numeric_chat_id}")
+            mlog.debug("모니터링 대상 채널 확인됨: chat_id=%s", numeric_chat_id)
 
         # 메시지 내용 분석
         message_text = getattr(msg, "message", "").strip()
@@ -520,51 +647,71 @@ async def main() -> None:
         has_media = bool(msg.media)
         
         # 모든 수신 메시지 로깅 (INFO 레벨)
-        meta = channel_cache.get(numeric_chat_id) or {}
+        meta = cached_channel_meta(numeric_chat_id) or EMPTY_META
         mlog.info(
-            f"수신 메시지: {meta.get('title','Unknown')} ({meta.get('username') or numeric_chat_id}) "
-            f"msg_id={msg.id}, len={len(message_text)} | {message_text[:50]}{'...' if len(message_text) > 50 else ''}"
+            "수신 메시지: %s (%s) msg_id=%s, len=%s | %.50s",
+            meta.get('title','Unknown'), meta.get('username') or numeric_chat_id, msg.id, len(message_text), message_text,
         )
-        mlog.info(f"현재 처리 중인 채널 chat_id: {numeric_chat_id}, 모니터링 대상 여부: {numeric_chat_id in chat_filters}")
+        mlog.debug("현재 처리 중인 채널 chat_id: %s, 모니터링 대상 여부: %s", numeric_chat_id, numeric_chat_id in chat_filters)
         
         # 텍스트가 없고 미디어도 없는 경우 무시
         if not has_text and not has_media:
-            mlog.info(f"❌ 메시지 버림: 빈 메시지 (chat_id={numeric_chat_id}, msg_id={msg.id}) - 텍스트와 미디어 모두 없음")
+            mlog.info("❌ 메시지 버림: 빈 메시지 (chat_id=%s, msg_id=%s) - 텍스트와 미디어 모두 없음", numeric_chat_id, msg.id)
             return
 
         # Forward 메시지 확인 및 원본 정보 추출
         is_forward, original_chat_id, original_message_id, original_text = extract_forward_info(msg)
         
         # 포워드 메시지 여부 로깅
-        mlog.info(f"메시지 포워드 여부: {is_forward}, 원본 chat_id: {original_chat_id}")
+        mlog.debug("메시지 포워드 여부: %s, 원본 chat_id: %s", is_forward, original_chat_id)
         
         # 포워드 메시지가 아닌데 모니터링 대상이 아닌 채널인 경우 무시
         if not is_forward and numeric_chat_id not in chat_filters:
-            mlog.info(f"❌ 메시지 버림: 일반 메시지이지만 모니터링 대상이 아닌 채널 (chat_id={numeric_chat_id}, msg_id={msg.id})")
+            mlog.info("❌ 메시지 버림: 일반 메시지이지만 모니터링 대상이 아닌 채널 (chat_id=%s, msg_id=%s)", numeric_chat_id, msg.id)
+            return
+        
+        # 기본 텍스트 설정 (None 처리 추가)
+        if is_forward and original_text:
+            text = original_text.strip() if original_text else ""
+            raw_for_snippet = original_text or ""
+            mlog.info("Forward 메시지 감지: 원본 chat_id=%s, msg_id=%s", original_chat_id, original_message_id)
+        else:
+            text = message_text.strip() if message_text else ""
+            raw_for_snippet = message_text or ""
+        
+        # 텍스트가 비어있는 경우 처리
+        if not text:
+            mlog.warning("❌ 메시지 버림: 텍스트가 비어있음 (chat_id=%s, msg_id=%s)", numeric_chat_id, msg.id)
+            return
+        
+        # 너무 짧거나 글자가 거의 없는 텍스트 전용 메시지 (이모지/단답 등)는 포워드 원본 조회·임베딩·DB·LLM 처리 전에 버림
+        # (미디어가 있으면 OCR 텍스트가 더해질 수 있으므로 계속 처리)
+        if not has_media and (len(text) < settings.min_text_len or sum(ch.isalpha() for ch in text) < 3):
+            mlog.info("❌ 메시지 버림: 너무 짧은 메시지 (chat_id=%s, msg_id=%s, len=%s)", numeric_chat_id, msg.id, len(text))
             return
         
         # 포워드된 메시지의 경우 원본 채널이 모니터링 대상인지 확인
         if is_forward and original_chat_id:
             # 0) 원본 메시지 (original_chat_id, original_message_id)가 이미 처리되었는지 먼저 확인하여 중복 전송 방지
             try:
-                if original_message_id and store.is_message_processed(original_chat_id, original_message_id):
-                    mlog.info(f"⏭️ 포워드 중복 건너뜀: 원본 이미 처리됨 (orig_chat_id={original_chat_id}, orig_msg_id={original_message_id})")
+                if original_message_id and await asyncio.to_thread(store.is_message_processed, original_chat_id, original_message_id):
+                    mlog.info("⏭️ 포워드 중복 건너뜀: 원본 이미 처리됨 (orig_chat_id=%s, orig_msg_id=%s)", original_chat_id, original_message_id)
                     return
             except Exception as e:
-                mlog.warning(f"원본 처리 여부 확인 실패: {e}")
+                mlog.warning("원본 처리 여부 확인 실패: %s", e)
 
             # 포워드한 채널 정보 가져오기
             forward_channel_meta = await get_channel_meta(numeric_chat_id)
             original_channel_meta = await get_channel_meta(original_chat_id)
             
-            mlog.info(f"=== 포워드 메시지 채널 정보 ===")
-            mlog.info(f"포워드한 채널: {forward_channel_meta.get('title', 'Unknown')} (@{forward_channel_meta.get('username', 'N/A')}) [ID: {numeric_chat_id}]")
-            mlog.info(f"원본 채널: {original_channel_meta.get('title', 'Unknown')} (@{original_channel_meta.get('username', 'N/A')}) [ID: {original_chat_id}]")
-            mlog.info(f"모니터링 대상 채널 목록: {chat_filters}")
+            mlog.debug("=== 포워드 메시지 채널 정보 ===")
+            mlog.debug("포워드한 채널: %s (@%s) [ID: %s]", forward_channel_meta.get('title', 'Unknown'), forward_channel_meta.get('username', 'N/A'), numeric_chat_id)
+            mlog.debug("원본 채널: %s (@%s) [ID: %s]", original_channel_meta.get('title', 'Unknown'), original_channel_meta.get('username', 'N/A'), original_chat_id)
+            mlog.debug("모니터링 대상 채널 목록: %s", chat_filters)
             
             # 원본 채널이 모니터링 대상이 아닌 경우 자동으로 추가
             if original_chat_id not in chat_filters:
-                mlog.info(f"🔍 새로운 원본 채널 발견: {original_channel_meta.get('title', 'Unknown')} (@{original_channel_meta.get('username', 'N/A')}) [ID: {original_chat_id}]")
+                mlog.info("🔍 새로운 원본 채널 발견: %s (@%s) [ID: %s]", original_channel_meta.get('title', 'Unknown'), original_channel_meta.get('username', 'N/A'), original_chat_id)
                 
                 # 원본 채널을 SOURCE_CHANNELS에 추가 (@username 형태로)
                 original_channel_str = str(original_chat_id)
@@ -573,93 +720,120 @@ async def main() -> None:
                 try:
                     from app.config import get_channel_username_async
                     username_form = await get_channel_username_async(original_channel_str, tg.client)
-                    mlog.info(f"채널 ID 변환: {original_channel_str} → {username_form}")
+                    mlog.debug("채널 ID 변환: %s → %s", original_channel_str, username_form)
                 except Exception as e:
-                    mlog.warning(f"채널 ID 변환 실패, 원본 사용: {e}")
+                    mlog.warning("채널 ID 변환 실패, 원본 사용: %s", e)
                     username_form = original_channel_str
                 
                 if add_source_channel(username_form):
-                    mlog.info(f"✅ 원본 채널을 SOURCE_CHANNELS에 추가 완료: {username_form}")
+                    mlog.info("✅ 원본 채널을 SOURCE_CHANNELS에 추가 완료: %s", username_form)
                     # chat_filters에 즉시 추가
-                    chat_filters.append(original_chat_id)
+                    chat_filters.add(original_chat_id)
                     # 채널 캐시에 추가
-                    channel_cache[original_chat_id] = original_channel_meta
+                    cache_channel_meta(original_chat_id, original_channel_meta)
                 else:
-                    mlog.warning(f"⚠️ 원본 채널 추가 실패 또는 이미 존재: {username_form}")
+                    mlog.warning("⚠️ 원본 채널 추가 실패 또는 이미 존재: %s", username_form)
                 
-                mlog.info(f"포워드 메시지 처리: 원본 채널이 모니터링 대상이 아니었지만 자동 추가 후 처리 진행")
+                mlog.info("포워드 메시지 처리: 원본 채널이 모니터링 대상이 아니었지만 자동 추가 후 처리 진행")
             else:
-                mlog.info(f"포워드 원본 채널 모니터링 대상: {original_chat_id}")
+                mlog.debug("포워드 원본 채널 모니터링 대상: %s", original_chat_id)
         elif is_forward and not original_chat_id:
-            mlog.warning(f"❌ 메시지 버림: 포워드 메시지이지만 원본 채널 ID를 추출할 수 없음 (chat_id={numeric_chat_id}, msg_id={msg.id})")
-            return
-        
-        # 기본 텍스트 설정 (None 처리 추가)
-        if is_forward and original_text:
-            text = original_text.strip() if original_text else ""
-            raw_for_snippet = original_text or ""
-            mlog.info(f"Forward 메시지 감지: 원본 chat_id={original_chat_id}, msg_id={original_message_id}")
-        else:
-            text = message_text.strip() if message_text else ""
-            raw_for_snippet = message_text or ""
-        
-        # 텍스트가 비어있는 경우 처리
-        if not text:
-            mlog.warning(f"❌ 메시지 버림: 텍스트가 비어있음 (chat_id={numeric_chat_id}, msg_id={msg.id})")
+            mlog.warning("❌ 메시지 버림: 포워드 메시지이지만 원본 채널 ID를 추출할 수 없음 (chat_id=%s, msg_id=%s)", numeric_chat_id, msg.id)
             return
         
-        # 이미지 처리
-        image_content = None
-        if has_media and msg.media:
+        # 이미지 처리 (OCR)
+        async def process_image():
+            """미디어 다운로드 후 OCR (이미지 분석 결과, 추출 텍스트) 반환"""
             try:
+                # 최근에 OCR한 같은 미디어(여러 채널로 포워딩된 이미지)는 다운로드/OCR 생략
+                since_ts = int(time.time()) - settings.dedup_recent_minutes * 60
+                media_key = _media_key(msg.media)
+                if media_key is not None:
+                    seen_text = await asyncio.to_thread(store.load_media_ocr, media_key, since_ts)
+                    if seen_text is not None:
+                        mlog.info("이미 처리한 미디어, OCR 결과 재사용: %s", media_key)
+                        return image_processor.analyze_image_content(seen_text), seen_text or None
+                
                 # 이미지 다운로드
                 image_data = await tg.client.download_media(msg.media, bytes)
                 if image_data:
+                    # 미디어 ID가 없으면 내용 해시로 OCR만 생략
+                    if media_key is None:
+                        media_key = "blake2b:" + hashlib.blake2b(image_data, digest_size=16).hexdigest()
+                        seen_text = await asyncio.to_thread(store.load_media_ocr, media_key, since_ts)
+                        if seen_text is not None:
+                            mlog.info("이미 처리한 이미지, OCR 결과 재사용: %s", media_key)
+                            return image_processor.analyze_image_content(seen_text), seen_text or None
+                    
                     # OCR로 텍스트 추출
                     extracted_text = await image_processor.extract_text_from_image(image_data)
-                    if extracted_text:
-                        image_content = image_processor.analyze_image_content(extracted_text)
-                        # 이미지에서 추출한 텍스트를 메인 텍스트에 추가 (텍스트가 있을 때만)
-                        if text:
-                            text = f"{text} [이미지 텍스트: {extracted_text}]"
-                        else:
-                            text = f"[이미지 텍스트: {extracted_text}]"
-                        mlog.info(f"이미지에서 텍스트 추출: {len(extracted_text)}자")
-                    else:
-                        image_content = image_processor.analyze_image_content("")
+                    if extracted_text is None:
+                        # OCR 오류는 기록하지 않음 (같은 이미지가 다시 오면 OCR 재시도)
                         mlog.info("이미지에서 텍스트 추출 실패")
+                        return image_processor.analyze_image_content(""), None
+                    await asyncio.to_thread(store.save_media_ocr, media_key, extracted_text, int(time.time()))
+                    if extracted_text:
+                        mlog.info("이미지에서 텍스트 추출: %s자", len(extracted_text))
+                        return image_processor.analyze_image_content(extracted_text), extracted_text
+                    mlog.info("이미지에 텍스트 없음")
+                    return image_processor.analyze_image_content(""), None
             except Exception as e:
-                mlog.error(f"이미지 처리 실패: {e}")
+                mlog.error("이미지 처리 실패: %s", e)
+            return None, None
         
         # 링크 처리
-        link_content = None
+        async def process_links(links):
+            """내용을 가져온 첫 번째 링크의 분석 결과 반환 (최대 2개 링크를 동시에 요청)"""
+            links = links[:2]  # 최대 2개 링크만 처리
+            results = await asyncio.gather(
+                *(link_processor.fetch_webpage_content(link) for link in links), return_exceptions=True
+            )
+            for link, webpage_data in zip(links, results):
+                if isinstance(webpage_data, BaseException):
+                    mlog.error("링크 처리 실패 (%s): %s", link, webpage_data)
+                elif webpage_data:
+                    link_content = link_processor.analyze_link_content(webpage_data)
+                    mlog.info("링크 내용 분석 완료: %.50s", link_content.get('title', ''))
+                    return link_content  # 첫 번째 링크만 처리
+            return None
+        
         extracted_links = []
         if has_text:
             links = link_processor.extract_links_from_text(message_text)
             if links:
-                mlog.info(f"링크 감지: {len(links)}개 - {links}")
+                mlog.info("링크 감지: %s개 - %s", len(links), links)
                 extracted_links = links  # 모든 링크 저장
-                for link in links[:2]:  # 최대 2개 링크만 처리
-                    try:
-                        webpage_data = await link_processor.fetch_webpage_content(link)
-                        if webpage_data:
-                            link_content = link_processor.analyze_link_content(webpage_data)
-                            # 링크 내용을 메인 텍스트에 추가
-                            link_summary = link_content.get("summary", "")
-                            text = f"{text} [링크 내용: {link_summary}]" if text else f"[링크 내용: {link_summary}]"
-                            mlog.info(f"링크 내용 분석 완료: {link_content.get('title', '')[:50]}")
-                            break  # 첫 번째 링크만 처리
-                    except Exception as e:
-                        mlog.error(f"링크 처리 실패 ({link}): {e}")
         
-        meta = channel_cache.get(chat_id) or {}
-        snippet = text[:200] + ("…" if len(text) > 200 else "")
+        run_image = bool(image_processor and has_media and msg.media)
+        run_links = bool(settings.enable_link_fetch and extracted_links)
+        # OCR/링크 결과가 본문에 더해지지 않는 경우(텍스트 없는 이미지, 가져오기 실패 등)를 위해
+        # 원문 임베딩도 함께 요청 (본문이 바뀌면 버리고 최종 본문으로 다시 요청)
+        base_text = text
+        base_embedding_task = (
+            asyncio.create_task(embedding_client.get_embedding(base_text)) if run_image or run_links else None
+        )
+        
+        # OCR과 링크 가져오기는 서로 독립적이므로 동시에 진행 (지연 시간 = 둘 중 긴 쪽)
+        (image_content, extracted_text), link_content = await asyncio.gather(
+            process_image() if run_image else _resolved((None, None)),
+            process_links(extracted_links) if run_links else _resolved(None),
+        )
+        
+        # 이미지에서 추출한 텍스트를 메인 텍스트에 추가
+        if extracted_text:
+            text = f"{text} [이미지 텍스트: {extracted_text}]" if text else f"[이미지 텍스트: {extracted_text}]"
+        # 링크 내용을 메인 텍스트에 추가
+        if link_content:
+            link_summary = link_content.get("summary", "")
+            text = f"{text} [링크 내용: {link_summary}]" if text else f"[링크 내용: {link_summary}]"
         
-        # Forward 여부를 로그에 포함
-        forward_info = " [FORWARD]" if is_forward else ""
+        # 수신 로깅에서 조회한 메타데이터 재사용 (chat_id가 다른 형태로 들어온 경우만 다시 조회)
+        if chat_id != numeric_chat_id:
+            meta = cached_channel_meta(chat_id) or EMPTY_META
+        # Forward 여부를 로그에 포함 (본문 일부는 %.200s로 잘라 로그가 출력될 때만 포맷)
         mlog.info(
-            f"수신 메시지{forward_info}: {meta.get('title','Unknown')} ({meta.get('username') or chat_id}) "
-            f"msg_id={msg.id}, len={len(text)} | {snippet}"
+            "수신 메시지%s: %s (%s) msg_id=%s, len=%s | %.200s",
+            " [FORWARD]" if is_forward else "", meta.get('title','Unknown'), meta.get('username') or chat_id, msg.id, len(text), text,
         )
         
         # 임베딩 생성 및 중복 제거 (원문 기준)
@@ -667,130 +841,149 @@ async def main() -> None:
         embedding_text = text  # 이미 포워딩된 메시지의 경우 원본 텍스트가 text에 설정됨
         
         # 텍스트 해시 생성 (정확한 중복 제거용)
-        import hashlib
         text_hash = hashlib.md5(embedding_text.encode('utf-8')).hexdigest()
         
-        embedding = await embedding_client.get_embedding(embedding_text)
+        if base_embedding_task is not None and embedding_text == base_text:
+            embedding = await base_embedding_task
+        else:
+            if base_embedding_task is not None:
+                base_embedding_task.cancel()
+            embedding = await embedding_client.get_embedding(embedding_text)
         if not embedding:
-            mlog.warning(f"임베딩 생성 실패, 중복 제거 없이 처리 계속: chat_id={chat_id}, msg_id={msg.id}")
+            mlog.warning("임베딩 생성 실패, 중복 제거 없이 처리 계속: chat_id=%s, msg_id=%s", chat_id, msg.id)
             # 임베딩 실패 시에도 메시지 처리를 계속하되, 중복 제거는 건너뜀
-            embedding_json = "[]"  # 빈 임베딩으로 설정
+            embedding_blob = EMPTY_EMBEDDING  # 빈 임베딩으로 설정
         else:
-            embedding_json = json.dumps(embedding)
-        now_ts = int(datetime.utcnow().timestamp())
-        since_ts = now_ts - settings.dedup_recent_minutes * 60
-        
-        # Forward된 메시지인 경우 원본 메시지 ID로 중복 체크
-        check_message_id = original_message_id if is_forward and original_message_id else msg.id
-        check_chat_id = original_chat_id if is_forward and original_chat_id else chat_id
-        
-        # 1단계: 정확한 텍스트 해시 중복 제거
-        exact_duplicate = store.find_exact_duplicate(text_hash, since_ts)
-        if exact_duplicate:
-            duplicate_chat_id, duplicate_msg_id = exact_duplicate
-            mlog.info(f"❌ 메시지 버림: 정확한 중복 메시지 (현재: chat_id={chat_id}, msg_id={msg.id}, 중복: chat_id={duplicate_chat_id}, msg_id={duplicate_msg_id})")
-            mlog.info(f"중복 제거 기준 텍스트: {embedding_text[:100]}...")
-            return  # exact duplicate
+            embedding_blob = pack_embedding(embedding)
         
-        # 2단계: 임베딩 기반 유사도 중복 제거
-        if embedding_json != "[]":
-            similar = store.find_recent_similar(embedding_json, since_ts, settings.dedup_similarity_threshold, embedding_client)
-            if similar:
-                similar_chat_id, similar_msg_id, similarity_score = similar
-                mlog.info(f"❌ 메시지 버림: 유사한 중복 메시지 (현재: chat_id={chat_id}, msg_id={msg.id}, 체크: chat_id={check_chat_id}, msg_id={check_message_id}) - 유사도 점수: {similarity_score:.3f}, 임계값: {settings.dedup_similarity_threshold}")
-                mlog.info(f"중복 제거 기준 텍스트: {embedding_text[:100]}...")
-                return  # similar duplicate
+        # 행 키: Forward된 메시지는 원본 (채널, 메시지 ID), 아니면 현재 (채널, 메시지 ID)
+        # (원본 메시지 ID를 포워드한 채널 ID와 섞으면 그 채널의 다른 메시지와 충돌하므로 항상 짝을 맞춤)
+        if is_forward and original_chat_id and original_message_id:
+            chat_id_to_use, message_id = original_chat_id, original_message_id
         else:
-            mlog.info(f"임베딩 없음, 유사도 중복 제거 건너뜀: chat_id={chat_id}, msg_id={msg.id}")
-
-        # Insert preliminary record
-        # Forward된 메시지인 경우 원본 정보 사용, 아니면 현재 메시지 정보 사용
-        message_id = original_message_id if is_forward and original_message_id else msg.id
+            chat_id_to_use, message_id = numeric_chat_id, msg.id
         author = None
         
-        # numeric_chat_id 사용 (이미 숫자 ID로 변환됨)
-        chat_id_to_use = numeric_chat_id
-        
         # chat_id가 정수인지 확인하고 변환
         if not isinstance(chat_id_to_use, int):
             try:
                 chat_id_to_use = int(chat_id_to_use)
-                mlog.info(f"chat_id를 정수로 변환: {chat_id_to_use}")
+                mlog.debug("chat_id를 정수로 변환: %s", chat_id_to_use)
             except (ValueError, TypeError) as e:
-                mlog.error(f"chat_id를 정수로 변환 실패: {chat_id_to_use}, 에러: {e}")
+                mlog.error("chat_id를 정수로 변환 실패: %s, 에러: %s", chat_id_to_use, e)
                 return
         
         # message_id가 정수인지 확인하고 변환
         if not isinstance(message_id, int):
             try:
                 message_id = int(message_id)
-                mlog.info(f"message_id를 정수로 변환: {message_id}")
+                mlog.debug("message_id를 정수로 변환: %s", message_id)
             except (ValueError, TypeError) as e:
-                mlog.error(f"message_id를 정수로 변환 실패: {message_id}, 에러: {e}")
+                mlog.error("message_id를 정수로 변환 실패: %s, 에러: %s", message_id, e)
                 return
         
-        mlog.debug(f"저장할 메시지 정보: chat_id={chat_id_to_use}, message_id={message_id}, is_forward={is_forward}")
+        mlog.debug("저장할 메시지 정보: chat_id=%s, message_id=%s, is_forward=%s", chat_id_to_use, message_id, is_forward)
         
-        store.insert_message(
-            chat_id=chat_id_to_use,
-            message_id=message_id,
-            date_ts=now_ts,
-            author=author,
-            text=text,
-            original_text=raw_for_snippet,  # 원본 텍스트 추가
-            forward_text="",  # 포워드 텍스트 (기본값)
-            image_paths="[]",  # 이미지 경로들 (기본값)
-            forward_info="{}",  # 포워드 정보 (기본값)
-            embedding_value=embedding_json,
-            text_hash=text_hash,
-        )
+        now_ts = int(time.time())
+        since_ts = now_ts - settings.dedup_recent_minutes * 60
+        
+        # 중복 검사를 통과한 메시지는 분석 전에 바로 등록하여, 분석 중에 들어온 동시 메시지도 중복으로 걸러지게 함
+        # (행 기록은 분석 후 AnalysisWriter가 한 번만 수행)
+        # 1단계: 정확한 텍스트 해시 중복 제거
+        exact_duplicate = await asyncio.to_thread(store.claim_text_hash, text_hash, since_ts, chat_id_to_use, message_id, now_ts)
+        if exact_duplicate:
+            duplicate_chat_id, duplicate_msg_id = exact_duplicate
+            mlog.info("❌ 메시지 버림: 정확한 중복 메시지 (현재: chat_id=%s, msg_id=%s, 중복: chat_id=%s, msg_id=%s)", chat_id, msg.id, duplicate_chat_id, duplicate_msg_id)
+            mlog.debug("중복 제거 기준 텍스트: %.100s...", embedding_text)
+            return  # exact duplicate
+        
+        # 2단계: 임베딩 기반 유사도 중복 제거
+        if embedding_blob:
+            similar = await asyncio.to_thread(
+                store.claim_similar, embedding_blob, since_ts, settings.dedup_similarity_threshold, chat_id_to_use, message_id, now_ts
+            )
+            if similar:
+                similar_chat_id, similar_msg_id, similarity_score = similar
+                mlog.info("❌ 메시지 버림: 유사한 중복 메시지 (현재: chat_id=%s, msg_id=%s, 중복: chat_id=%s, msg_id=%s) - 유사도 점수: %.3f, 임계값: %s", chat_id, msg.id, similar_chat_id, similar_msg_id, similarity_score, settings.dedup_similarity_threshold)
+                mlog.debug("중복 제거 기준 텍스트: %.100s...", embedding_text)
+                return  # similar duplicate
+        else:
+            mlog.info("임베딩 없음, 유사도 중복 제거 건너뜀: chat_id=%s, msg_id=%s", chat_id, msg.id)
+
+        async def save_message(analysis, original_link: str = "") -> None:
+            """메시지 행을 분석 결과와 함께 한 번에 기록 (AnalysisWriter가 모아서 한 트랜잭션으로 UPSERT)"""
+            await analysis_writer.save_message(
+                chat_id=chat_id_to_use,
+                message_id=message_id,
+                date_ts=now_ts,
+                author=author,
+                text=text,
+                original_text=raw_for_snippet,
+                embedding_value=embedding_blob,
+                text_hash=text_hash,
+                importance=analysis.importance,
+                categories=",".join(analysis.categories),
+                tags=",".join(analysis.tags),
+                summary=analysis.summary,
+                money_making_info=analysis.money_making_info,
+                action_guide=analysis.action_guide,
+                event_products=analysis.event_products,
+                original_link=original_link,
+            )
 
-        # LLM analysis
+        # LLM analysis (규칙으로 분류가 확정되는 메시지는 LLM 분석 생략)
         try:
-            analysis = llm.analyze(text)
+            analysis = quick_classify(text)
+            if analysis is None:
+                analysis = await llm.analyze(text)
+                # 이벤트 + 참여 키워드와 중요 링크 URL이 모두 있으면 중요도만 올림 (관련성/정보 가치는 LLM 판단 유지)
+                if analysis.importance != "high" and is_important_event(text, extracted_links):
+                    analysis = dataclasses.replace(analysis, importance="high")
+            else:
+                mlog.info("규칙 기반 사전 분류: importance=%s (chat_id=%s, msg_id=%s)", analysis.importance, chat_id, msg.id)
             
             # 코인 관련성 체크
             if not analysis.is_coin_related:
-                mlog.info(f"❌ 메시지 버림: 코인과 관련없음 (chat_id={chat_id}, msg_id={msg.id}) - {analysis.relevance_reason}")
+                mlog.info("❌ 메시지 버림: 코인과 관련없음 (chat_id=%s, msg_id=%s) - %s", chat_id, msg.id, analysis.relevance_reason)
+                await save_message(analysis)
                 return
                 
-            mlog.info(f"코인 관련성 확인: {analysis.is_coin_related} - {analysis.relevance_reason}")
+            mlog.debug("코인 관련성 확인: %s - %s", analysis.is_coin_related, analysis.relevance_reason)
             
             # 정보 가치 체크
             if not analysis.has_valuable_info:
-                mlog.info(f"❌ 메시지 버림: 정보 가치 없음 (chat_id={chat_id}, msg_id={msg.id}) - {analysis.info_value_reason}")
+                mlog.info("❌ 메시지 버림: 정보 가치 없음 (chat_id=%s, msg_id=%s) - %s", chat_id, msg.id, analysis.info_value_reason)
+                await save_message(analysis)
                 return
                 
-            mlog.info(f"정보 가치 확인: {analysis.has_valuable_info} - {analysis.info_value_reason}")
+            mlog.debug("정보 가치 확인: %s - %s", analysis.has_valuable_info, analysis.info_value_reason)
             
         except Exception as e:
             logging.getLogger("app.llm").exception("LLM analyze failed")
-            mlog.error(f"❌ 메시지 버림: LLM 분석 실패 (chat_id={chat_id}, msg_id={msg.id}) - {e}")
+            mlog.error("❌ 메시지 버림: LLM 분석 실패 (chat_id=%s, msg_id=%s) - %s", chat_id, msg.id, e)
             return
 
         # Rule-based importance boost (e.g., giveaways/events)
         boosted_importance, extra_cats, extra_tags = boost_importance_for_events(text, analysis.importance)
-        if extra_cats:
-            for c in extra_cats:
-                if c not in analysis.categories:
-                    analysis.categories.append(c)
-        if extra_tags:
-            for t in extra_tags:
-                if t not in analysis.tags:
-                    analysis.tags.append(t)
         if boosted_importance != analysis.importance:
             logging.getLogger("app.rules").info(
-                f"Importance boosted: {analysis.importance} -> {boosted_importance}"
+                "Importance boosted: %s -> %s", analysis.importance, boosted_importance
             )
-        analysis.importance = boosted_importance
+        # 순서를 유지한 채 중복 제거 (캐시에 공유된 리스트를 직접 수정하지 않도록 새 리스트 생성)
+        analysis = dataclasses.replace(
+            analysis,
+            importance=boosted_importance,
+            categories=list(dict.fromkeys([*analysis.categories, *extra_cats])),
+            tags=list(dict.fromkeys([*analysis.tags, *extra_tags])),
+        )
 
         # Forward된 메시지의 경우 원본 링크 생성
         if is_forward and original_chat_id and original_message_id:
-            mlog.info(f"Forward 메시지 원본 링크 생성: chat_id={original_chat_id}, msg_id={original_message_id}")
+            mlog.debug("Forward 메시지 원본 링크 생성: chat_id=%s, msg_id=%s", original_chat_id, original_message_id)
             
-            # 원본 채널 메타데이터 가져오기
-            original_meta = await get_channel_meta(original_chat_id)
-            mlog.info(f"원본 채널 메타데이터: {original_meta}")
+            # 원본 채널 메타데이터 (포워드 확인 단계에서 조회한 값 재사용)
+            original_meta = original_channel_meta
+            mlog.debug("원본 채널 메타데이터: %s", original_meta)
             
             # 원본 메시지 링크 생성
             orig_link = build_original_link(
@@ -801,14 +994,15 @@ async def main() -> None:
                 internal_id=original_meta.get("internal_id"),
             )
             source_title = original_meta.get("title", f"Unknown Channel {original_chat_id}")
-            mlog.info(f"원본 링크 생성 결과: {orig_link}")
+            mlog.debug("원본 링크 생성 결과: %s", orig_link)
         else:
             # 일반 메시지의 경우 현재 채널 링크 사용
-            mlog.info(f"일반 메시지 링크 생성: chat_id={chat_id}, msg_id={message_id}")
+            mlog.debug("일반 메시지 링크 생성: chat_id=%s, msg_id=%s", chat_id, message_id)
             
-            # 현재 채널 메타데이터 가져오기
-            meta = await get_channel_meta(chat_id)
-            mlog.info(f"현재 채널 메타데이터: {meta}")
+            # 현재 채널 메타데이터 (수신 로깅에서 조회한 값 재사용, 캐시에 없었던 경우만 조회)
+            if meta is EMPTY_META:
+                meta = await get_channel_meta(chat_id)
+            mlog.debug("현재 채널 메타데이터: %s", meta)
             
             orig_link = build_original_link(
                 chat_id=chat_id,
@@ -818,91 +1012,60 @@ async def main() -> None:
                 internal_id=meta.get("internal_id"),
             )
             source_title = meta.get("title", "Unknown")
-            mlog.info(f"일반 링크 생성 결과: {orig_link}")
+            mlog.debug("일반 링크 생성 결과: %s", orig_link)
 
         # Importance thresholding
-        importance_order = IMPORTANCE_ORDER.get(analysis.importance, 0)
-        threshold_order = IMPORTANCE_ORDER.get(settings.important_threshold, 0)  # low일 때 0으로 수정
+        importance_order = Importance.parse(analysis.importance)
+        threshold_order = Importance.parse(settings.important_threshold)  # 알 수 없는 값은 low
         
-        mlog.info(f"중요도 판단: {analysis.importance} (순서: {importance_order}) vs 임계값: {settings.important_threshold} (순서: {threshold_order})")
+        mlog.debug("중요도 판단: %s (순서: %d) vs 임계값: %s (순서: %d)", analysis.importance, importance_order, settings.important_threshold, threshold_order)
         
         # 중요도 임계값 로직 수정: low 설정 시 모든 메시지 전송
         should_forward = importance_order >= threshold_order
         
         # 무의미한 메시지 필터링 강화
-        meaningless_patterns = [
-            r'^\s*[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>/?~`]+\s*$',  # 특수문자만
-            r'^\s*[a-zA-Z0-9]{1,3}\s*$',  # 1-3자리 영숫자만
-            r'^\s*(안녕|하이|ㅎㅇ|ㅎㅇㅎㅇ|ㅋㅋ|ㅎㅎ|ㅇㅇ|ㄴㄴ|ㅇㅈ|ㄴㄴㄴ)\s*$',  # 인사말만
-            r'^\s*(좋아요|👍|❤️|💕|💖|💗|💘|💙|💚|💛|💜|🖤|🤍|🤎)\s*$',  # 이모지만
-            r'^\s*(ㅇ|ㄴ|ㅇㅇ|ㄴㄴ|ㅇㅈ|ㄴㄴㄴ)\s*$',  # 짧은 답변만
-        ]
-        
-        is_meaningless = any(re.search(pattern, text, re.IGNORECASE) for pattern in meaningless_patterns)
+        is_meaningless = _MEANINGLESS_RE.search(text) is not None
         
         # 추가 조건: 텍스트 길이가 일정 이상이거나 특별한 키워드가 포함된 경우
         if not should_forward and len(text.strip()) > 30 and not is_meaningless:  # 50자에서 30자로 완화
             # 텍스트가 충분히 긴 경우 low 중요도라도 전송 고려
             should_forward = True
-            mlog.info(f"텍스트 길이로 인한 전송 승인: {len(text)}자")
+            mlog.debug("텍스트 길이로 인한 전송 승인: %s자", len(text))
         
         # 추가 조건: 특별한 키워드가 포함된 경우
-        important_keywords = ['airdrop', 'launch', 'listing', 'whitelist', 'presale', 'ico', 'ido', 'nft', 'dao', 'defi', 'gamefi', 'metaverse']
-        if not should_forward and any(keyword in text.lower() for keyword in important_keywords):
-            should_forward = True
-            mlog.info(f"중요 키워드로 인한 전송 승인: {[k for k in important_keywords if k in text.lower()]}")
+        if not should_forward:
+            text_lc = text.lower()
+            matched_keywords = [k for k in _IMPORTANT_KEYWORDS if k in text_lc]
+            if matched_keywords:
+                should_forward = True
+                mlog.debug("중요 키워드로 인한 전송 승인: %s", matched_keywords)
         
         # 추가 조건: 이미지나 링크가 포함된 경우
         if not should_forward and (has_media or link_content):
             should_forward = True
-            mlog.info(f"미디어/링크 포함으로 인한 전송 승인: has_media={has_media}, has_link={bool(link_content)}")
+            mlog.debug("미디어/링크 포함으로 인한 전송 승인: has_media=%s, has_link=%s", has_media, bool(link_content))
         
         # 무의미한 메시지는 무조건 차단
         if is_meaningless:
             should_forward = False
-            mlog.info(f"❌ 무의미한 메시지 차단: {text[:50]}...")
+            mlog.info("❌ 무의미한 메시지 차단: %.50s...", text)
         
         # 내용 없는 요약 필터링
-        meaningless_summary_patterns = [
-            r'구체적인 내용이 부족',
-            r'요약하기 어렵습니다',
-            r'추가적인 정보나 문맥이 필요',
-            r'요약할 수 있는 구체적인 내용이 없',
-            r'내용이 부족하여 요약하기 어렵',
-            r'구체적인 정보가 부족',
-            r'요약할 만한 내용이',
-            r'추가 정보가 필요합니다',
-            r'문맥이 부족',
-            r'구체적인 내용이 없습니다',
-            r'요약하기 어려운 내용입니다',
-            r'추가적인 내용이나 맥락이 부족'
-        ]
-        
-        is_meaningless_summary = any(re.search(pattern, analysis.summary, re.IGNORECASE) for pattern in meaningless_summary_patterns)
+        is_meaningless_summary = _MEANINGLESS_SUMMARY_RE.search(analysis.summary) is not None
         
         if is_meaningless_summary:
             should_forward = False
-            mlog.info(f"❌ 내용 없는 요약 차단: {analysis.summary[:100]}...")
+            mlog.info("❌ 내용 없는 요약 차단: %.100s...", analysis.summary)
+        
+        # Store message with analysis (전달 여부와 관계없이 한 번만 기록)
+        await save_message(analysis, orig_link)
         
         if not should_forward:
-            # Store analysis but do not forward
-            store.update_analysis(
-                chat_id=chat_id,
-                message_id=message_id,
-                importance=analysis.importance,
-                categories=",".join(analysis.categories),
-                tags=",".join(analysis.tags),
-                summary=analysis.summary,
-                money_making_info=analysis.money_making_info,
-                action_guide=analysis.action_guide,
-                event_products=analysis.event_products,
-                original_link=orig_link,
-            )
-            mlog.info(f"❌ 메시지 버림: 중요도 부족 (chat_id={chat_id}, msg_id={message_id}, importance={analysis.importance} < {settings.important_threshold}, 텍스트 길이: {len(text)}자)")
+            mlog.info("❌ 메시지 버림: 중요도 부족 (chat_id=%s, msg_id=%s, importance=%s < %s, 텍스트 길이: %s자)", chat_id, message_id, analysis.importance, settings.important_threshold, len(text))
             return
 
         # Forward to aggregator channel
-        mlog.info(f"✅ 전달 승인: 중요도 충족 (chat_id={chat_id}, msg_id={message_id}, importance={analysis.importance} >= {settings.important_threshold})")
+        mlog.info("✅ 전달 승인: 중요도 충족 (chat_id=%s, msg_id=%s, importance=%s >= %s)", chat_id, message_id, analysis.importance, settings.important_threshold)
         
         # 메시지 작성시간 정보 수집
         try:
@@ -921,15 +1084,16 @@ async def main() -> None:
             current_time_str = format_time(current_message_time)
             original_time_str = format_time(original_message_time)
         except Exception as e:
-            mlog.warning(f"시간 정보 처리 실패: {e}")
+            mlog.warning("시간 정보 처리 실패: %s", e)
             current_time_str = None
             original_time_str = None
         
         # 포워드 정보 준비
         forward_info = None
         if is_forward and original_chat_id:
-            forward_channel_meta = await get_channel_meta(chat_id)
-            original_channel_meta = await get_channel_meta(original_chat_id)
+            # 포워드 확인 단계에서 조회한 메타데이터 재사용 (chat_id가 다른 형태로 들어온 경우만 다시 조회)
+            if chat_id != numeric_chat_id:
+                forward_channel_meta = await get_channel_meta(chat_id)
             forward_info = {
                 "forward_channel": f"{forward_channel_meta.get('title', 'Unknown')} (@{forward_channel_meta.get('username', 'N/A')})",
                 "original_channel": f"{original_channel_meta.get('title', 'Unknown')} (@{original_channel_meta.get('username', 'N/A')})",
@@ -961,7 +1125,7 @@ async def main() -> None:
         try:
             # 기본 채널로 전송
             await tg.send_html(settings.aggregator_channel, html)
-            mlog.info(f"✅ 전송 성공: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id}) → {settings.aggregator_channel}")
+            mlog.info("✅ 전송 성공: %s (chat_id=%s, msg_id=%s) → %s", meta.get('title','Unknown'), chat_id, message_id, settings.aggregator_channel)
             
             # high 중요도인 경우 중요 채널로도 중복 전송
             should_send_to_important = (
@@ -971,9 +1135,9 @@ async def main() -> None:
             if should_send_to_important:
                 try:
                     await tg.send_html(settings.important_channel, html)
-                    mlog.info(f"🔥 중요 채널 전송 성공: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id}) → {settings.important_channel}")
+                    mlog.info("🔥 중요 채널 전송 성공: %s (chat_id=%s, msg_id=%s) → %s", meta.get('title','Unknown'), chat_id, message_id, settings.important_channel)
                 except Exception as e:
-                    mlog.error(f"❌ 중요 채널 전송 실패: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id}) → {settings.important_channel} - {e}")
+                    mlog.error("❌ 중요 채널 전송 실패: %s (chat_id=%s, msg_id=%s) → %s - %s", meta.get('title','Unknown'), chat_id, message_id, settings.important_channel, e)
             
             # 봇 개인 알림 전송 (모든 전송된 메시지에 대해)
             try:
@@ -996,9 +1160,9 @@ async def main() -> None:
                 )
                 
                 if await bot_notifier.send_personal_html(personal_html):
-                    mlog.info(f"📱 봇 개인 알림 전송 성공: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id})")
+                    mlog.info("📱 봇 개인 알림 전송 성공: %s (chat_id=%s, msg_id=%s)", meta.get('title','Unknown'), chat_id, message_id)
                 else:
-                    mlog.warning(f"⚠️ 봇 개인 알림 전송 실패: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id})")
+                    mlog.warning("⚠️ 봇 개인 알림 전송 실패: %s (chat_id=%s, msg_id=%s)", meta.get('title','Unknown'), chat_id, message_id)
                 
                 # 중요 봇 알림 (medium 이상 + 돈버는 정보)
                 is_important = (
@@ -1008,13 +1172,13 @@ async def main() -> None:
                 if is_important and bot_notifier.important_bot_token:
                     try:
                         if await bot_notifier.send_important_html(personal_html):
-                            mlog.info(f"🔥 중요 봇 알림 전송 성공: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id})")
+                            mlog.info("🔥 중요 봇 알림 전송 성공: %s (chat_id=%s, msg_id=%s)", meta.get('title','Unknown'), chat_id, message_id)
                         else:
-                            mlog.warning(f"⚠️ 중요 봇 알림 전송 실패: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id})")
+                            mlog.warning("⚠️ 중요 봇 알림 전송 실패: %s (chat_id=%s, msg_id=%s)", meta.get('title','Unknown'), chat_id, message_id)
                     except Exception as e:
-                        mlog.error(f"❌ 중요 봇 알림 전송 오류: {e}")
+                        mlog.error("❌ 중요 봇 알림 전송 오류: %s", e)
             except Exception as e:
-                mlog.error(f"❌ 봇 개인 알림 전송 오류: {e}")
+                mlog.error("❌ 봇 개인 알림 전송 오류: %s", e)
             
             # 전송된 메시지 로깅
             sent_logger.log_sent_message(
@@ -1035,23 +1199,9 @@ async def main() -> None:
             )
         except Exception as e:
             logging.getLogger("app.tg").exception("Failed to send message to aggregator")
-            mlog.error(f"❌ 전송 실패: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id}) → {settings.aggregator_channel} - {e}")
+            mlog.error("❌ 전송 실패: %s (chat_id=%s, msg_id=%s) → %s - %s", meta.get('title','Unknown'), chat_id, message_id, settings.aggregator_channel, e)
             return
 
-        # Update DB
-        store.update_analysis(
-            chat_id=chat_id,
-            message_id=message_id,
-            importance=analysis.importance,
-            categories=",".join(analysis.categories),
-            tags=",".join(analysis.tags),
-            summary=analysis.summary,
-            money_making_info=analysis.money_making_info,
-            action_guide=analysis.action_guide,
-            event_products=analysis.event_products,
-            original_link=orig_link,
-        )
-        
         # 돈버는 정보가 있는 메시지는 별도 저장
         if analysis.money_making_info and analysis.money_making_info != "없음":
             try:
@@ -1067,8 +1217,9 @@ async def main() -> None:
                 if is_forward and forward_info:
                     forward_text = forward_info.get('text', '')
                 
-                store.save_money_message(
-                    chat_id=chat_id,
+                await asyncio.to_thread(
+                    store.save_money_message,
+                    chat_id=chat_id_to_use,
                     message_id=message_id,
                     date_ts=now_ts,
                     author=author,
@@ -1085,11 +1236,11 @@ async def main() -> None:
                     tags=",".join(analysis.tags),
                     summary=analysis.summary,
                 )
-                mlog.info(f"💰 돈버는 정보 메시지 별도 저장: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id})")
+                mlog.info("💰 돈버는 정보 메시지 별도 저장: %s (chat_id=%s, msg_id=%s)", meta.get('title','Unknown'), chat_id, message_id)
             except Exception as e:
-                mlog.error(f"❌ 돈버는 정보 메시지 저장 실패: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id}) - {e}")
+                mlog.error("❌ 돈버는 정보 메시지 저장 실패: %s (chat_id=%s, msg_id=%s) - %s", meta.get('title','Unknown'), chat_id, message_id, e)
         forward_log = f" [FORWARD from {original_chat_id}:{original_message_id}]" if is_forward else ""
-        mlog.info(f"✅ 메시지 처리 완료: {meta.get('title','Unknown')} (chat_id={chat_id}, msg_id={message_id}, importance={analysis.importance}){forward_log}")
+        mlog.info("✅ 메시지 처리 완료: %s (chat_id=%s, msg_id=%s, importance=%s)%s", meta.get('title','Unknown'), chat_id, message_id, analysis.importance, forward_log)
 
     # 폴링 방식만 사용 (이벤트 리스너 제거로 중복 처리 방지)
     logger.info("폴링 방식만 사용하여 메시지 중복 처리 방지")
@@ -1097,7 +1248,7 @@ async def main() -> None:
     # 채널 접근 권한 테스트
     async def test_channel_access():
         logger.info("=== 채널 접근 권한 테스트 시작 ===")
-        for channel_id in chat_filters:
+        for channel_id in tuple(chat_filters):
             try:
                 # 채널 정보 가져오기 시도
                 chat = await tg.client.get_entity(channel_id)
@@ -1124,19 +1275,34 @@ async def main() -> None:
     await test_channel_access()
     
     # 폴링 방식으로 메시지 수신 (실시간 수신 대안)
+    async def process_polled_message(channel_id: int, channel_title: str, msg) -> None:
+        """폴링으로 받은 메시지 하나를 처리하고 처리 완료로 기록"""
+        try:
+            # 폴링 메시지의 경우 chat_id가 이미 숫자 ID
+            async with pipeline_sem:
+                await handle_message(PolledEvent(msg, channel_id))
+            
+            # 처리 완료 후 DB에 기록 (중복 방지)
+            await asyncio.to_thread(store.mark_message_processed, channel_id, msg.id)
+            logger.info(f"✅ 폴링 메시지 처리 완료: {channel_title} (ID: {msg.id})")
+        except Exception as e:
+            logger.error(f"❌ 폴링 메시지 처리 실패: {channel_title} (ID: {msg.id}) - {e}")
+            # 실패한 메시지도 DB에 기록하여 재시도 방지
+            await asyncio.to_thread(store.mark_message_processed, channel_id, msg.id)
+
     async def poll_messages():
         logger.info("=== 폴링 방식 메시지 수신 시작 ===")
         
         # 초기화: 각 채널의 마지막 처리된 메시지 ID를 데이터베이스에서 가져오기
         # 기존 채널들의 마지막 메시지 ID 로드 (안전하게)
         try:
-            last_message_ids = store.get_all_channel_last_message_ids()
+            last_message_ids = await asyncio.to_thread(store.get_all_channel_last_message_ids)
         except Exception as e:
             logger.warning(f"채널 마지막 메시지 ID 로드 실패: {e}")
             last_message_ids = {}
         
         # 재시작 시 모든 모니터링 채널을 현재 최신 메시지 ID로 초기화하여 백필 방지
-        for channel_id in chat_filters:
+        for channel_id in tuple(chat_filters):
             try:
                 chat = entity_cache.get(channel_id)
                 if not chat:
@@ -1151,7 +1317,7 @@ async def main() -> None:
                         latest_id = messages[0].id
                 
                 last_message_ids[channel_id] = latest_id
-                store.update_channel_last_message_id(channel_id, latest_id)
+                await asyncio.to_thread(store.update_channel_last_message_id, channel_id, latest_id)
                 logger.info(f"채널 {channel_id} 최신 메시지 ID 초기화: {latest_id}")
             except Exception as e:
                 logger.warning(f"채널 {channel_id} 초기화 실패: {e}")
@@ -1165,7 +1331,7 @@ async def main() -> None:
             try:
                 # SOURCE_CHANNELS 최신화 후 숫자 ID로 정규화
                 raw_updated_chat_filters = load_source_channels()
-                normalized_updated_chat_filters = []
+                normalized_updated_chat_filters = set()
                 for ch in raw_updated_chat_filters:
                     if ch in removed_channels:
                         continue
@@ -1176,7 +1342,7 @@ async def main() -> None:
                             numeric_id = utils.get_peer_id(ent)
                             # 엔티티 캐시 업데이트
                             entity_cache[numeric_id] = ent
-                            normalized_updated_chat_filters.append(numeric_id)
+                            normalized_updated_chat_filters.add(numeric_id)
                         else:
                             logger.warning(f"유효하지 않은 엔티티 타입: {type(ent)} (채널: {ch})")
                     except Exception as e:
@@ -1185,7 +1351,7 @@ async def main() -> None:
 
                 if normalized_updated_chat_filters != chat_filters:
                     logger.info(f"🔄 SOURCE_CHANNELS 업데이트 감지: {len(chat_filters)} → {len(normalized_updated_chat_filters)}")
-                    new_channels = set(normalized_updated_chat_filters) - set(chat_filters)
+                    new_channels = normalized_updated_chat_filters - chat_filters
                     if new_channels:
                         logger.info(f"새로운 채널: {new_channels}")
                     else:
@@ -1207,15 +1373,25 @@ async def main() -> None:
                                     latest_id = msgs[0].id
 
                             last_message_ids[new_channel_id] = latest_id
-                            store.update_channel_last_message_id(new_channel_id, latest_id)
+                            await asyncio.to_thread(store.update_channel_last_message_id, new_channel_id, latest_id)
                             logger.info(f"새 채널 {new_channel_id} 최신 메시지 ID 초기화: {latest_id}")
                         except Exception as e:
                             logger.warning(f"새 채널 {new_channel_id} 초기화 실패: {e}")
 
                     chat_filters.clear()
-                    chat_filters.extend(normalized_updated_chat_filters)
+                    chat_filters.update(normalized_updated_chat_filters)
                 
-                for channel_id in chat_filters:
+                # 채널별 최신 메시지 ID를 GetPeerDialogs로 한꺼번에 확인하여 새 메시지가 있는 채널만 기록 조회
+                try:
+                    top_message_ids = await tg.get_top_message_ids(
+                        entity_cache[channel_id] for channel_id in tuple(chat_filters) if channel_id in entity_cache
+                    )
+                except Exception as e:
+                    logger.warning(f"채널 최신 메시지 ID 일괄 조회 실패, 채널별 조회로 대체: {e}")
+                    top_message_ids = {}
+                
+                # 처리 중 handle_message가 chat_filters에 채널을 추가할 수 있으므로 스냅샷을 순회
+                for channel_id in tuple(chat_filters):
                     try:
                         # 채널 정보 가져오기 (엔티티 캐시 활용)
                         chat = entity_cache.get(channel_id)
@@ -1231,7 +1407,7 @@ async def main() -> None:
                         # 동적 추가된 채널 초기화: last_message_ids에 없으면 최신 ID 스냅샷 후 그 이후만 처리
                         if channel_id not in last_message_ids:
                             try:
-                                db_last_id = store.get_channel_last_message_id(channel_id)
+                                db_last_id = await asyncio.to_thread(store.get_channel_last_message_id, channel_id)
                             except Exception as e:
                                 logger.warning(f"채널 {channel_id} 마지막 ID DB 조회 실패: {e}")
                                 db_last_id = None
@@ -1247,11 +1423,14 @@ async def main() -> None:
                                 except Exception as e:
                                     logger.warning(f"채널 {channel_id} 최신 ID 스냅샷 실패: {e}")
                                 last_message_ids[channel_id] = latest_id
-                                store.update_channel_last_message_id(channel_id, latest_id)
+                                await asyncio.to_thread(store.update_channel_last_message_id, channel_id, latest_id)
                                 logger.info(f"채널 {channel_id} 최신 메시지 ID 초기화(동적 추가): {latest_id}")
                         
                         # 마지막 처리된 메시지 ID 이후의 메시지만 가져오기
                         last_known_id = last_message_ids.get(channel_id, 0)
+                        top_message_id = top_message_ids.get(channel_id)
+                        if top_message_id is not None and top_message_id <= last_known_id:
+                            continue
                         messages = await tg.client.get_messages(chat, min_id=last_known_id, limit=50)
                         
                         if not messages:
@@ -1263,40 +1442,22 @@ async def main() -> None:
                             channel_title = getattr(chat, 'title', f'Channel {channel_id}')
                             logger.info(f"🔍 폴링으로 새 메시지 발견: {channel_title} ({len(messages)}개)")
                             
-                            # 새로운 메시지들 처리 (ID 순서대로)
+                            # 새로운 메시지들을 동시에 처리 (LLM/임베딩/링크 대기 시간이 겹치도록)
+                            tasks = []
                             for msg in messages:
                                 # 이미 처리된 메시지인지 한번 더 확인
-                                if not store.is_message_processed(channel_id, msg.id):
-                                    # 메시지를 이벤트 객체로 래핑하여 handle_message 호출
-                                    try:
-                                        # 메시지 객체를 이벤트 객체로 래핑
-                                        class EventWrapper:
-                                            def __init__(self, message, chat_id):
-                                                self.message = message
-                                                self.chat_id = chat_id
-                                                self.chat = None
-                                        
-                                        # 폴링 메시지의 경우 chat_id가 이미 숫자 ID이므로 numeric_chat_id로 설정
-                                        numeric_chat_id = channel_id
-                                        
-                                        event = EventWrapper(msg, numeric_chat_id)
-                                        await handle_message(event)
-                                        
-                                        # 처리 완료 후 DB에 기록 (중복 방지)
-                                        store.mark_message_processed(channel_id, msg.id)
-                                        logger.info(f"✅ 폴링 메시지 처리 완료: {channel_title} (ID: {msg.id})")
-                                    except Exception as e:
-                                        logger.error(f"❌ 폴링 메시지 처리 실패: {channel_title} (ID: {msg.id}) - {e}")
-                                        # 실패한 메시지도 DB에 기록하여 재시도 방지
-                                        store.mark_message_processed(channel_id, msg.id)
+                                if not await asyncio.to_thread(store.is_message_processed, channel_id, msg.id):
+                                    tasks.append(asyncio.create_task(process_polled_message(channel_id, channel_title, msg)))
                                 else:
                                     logger.debug(f"⏭️ 이미 처리된 메시지 건너뜀: {channel_title} (ID: {msg.id})")
+                            if tasks:
+                                await asyncio.gather(*tasks)
                             
                             # 마지막 메시지 ID 업데이트 (DB에 저장)
                             if messages:
                                 latest_message_id = max(msg.id for msg in messages)
                                 last_message_ids[channel_id] = latest_message_id
-                                store.update_channel_last_message_id(channel_id, latest_message_id)
+                                await asyncio.to_thread(store.update_channel_last_message_id, channel_id, latest_message_id)
                                 logger.info(f"채널 {channel_id} 최신 메시지 ID 업데이트: {latest_message_id}")
                             
                     except Exception as e:
@@ -1325,16 +1486,16 @@ async def main() -> None:
         while True:
             await asyncio.sleep(300)  # 5분마다
             try:
-                total_messages = store.get_message_count()
+                total_messages = await asyncio.to_thread(store.get_message_count)
                 logger.info(f"=== 처리 통계 === 총 메시지: {total_messages}, 모니터링 채널: {len(chat_filters)}개")
                 
                 # 중요도별 통계
-                importance_stats = store.get_importance_stats()
+                importance_stats = await asyncio.to_thread(store.get_importance_stats)
                 if importance_stats:
                     logger.info(f"중요도별 통계: {importance_stats}")
                 
                 # 최근 처리된 메시지 수
-                recent_count = store.get_recent_message_count(300)  # 5분 내
+                recent_count = await asyncio.to_thread(store.get_recent_message_count, 300)  # 5분 내
                 logger.info(f"최근 5분 처리: {recent_count}개 메시지")
                 
                 # 연결 상태 확인
@@ -1345,6 +1506,9 @@ async def main() -> None:
                 
                 # 캐시 정리
                 clear_old_cache()
+                await asyncio.to_thread(
+                    store.prune_media_seen, int(time.time()) - settings.dedup_recent_minutes * 60
+                )
                 
             except Exception as e:
                 logger.error(f"통계 출력 실패: {e}")
@@ -1352,7 +1516,18 @@ async def main() -> None:
     # 통계 출력 태스크 시작
     asyncio.create_task(print_stats())
     
-    await asyncio.Future()  # run forever
+    try:
+        await asyncio.Future()  # run forever
+    finally:
+        await bot_notifier.aclose()
+        await embedding_client.aclose()
+        await tg.aclose()
+        await link_processor.aclose()
+        await llm.aclose()
+        await analysis_writer.aclose()
+        if image_processor is not None:
+            image_processor.close()
+        store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba 미설치 시 numpy 경로 사용
+    njit = None
+
+
+def _first_above_numpy(
+    matrix: np.ndarray, query: np.ndarray, scales: np.ndarray,
+    date_ts: np.ndarray, since_ts: int, threshold: float,
+) -> int:
+    sims = (matrix @ query) * scales
+    sims[date_ts < since_ts] = -np.inf
+    hits = np.flatnonzero(sims >= threshold)
+    return int(hits[0]) if hits.size else -1
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _first_above_jit(matrix, query, scales, date_ts, since_ts, threshold):
+        n, dim = matrix.shape
+        for i in range(n):
+            if date_ts[i] < since_ts:
+                continue
+            acc = 0.0
+            for j in range(dim):
+                acc += matrix[i, j] * query[j]
+            if acc * scales[i] >= threshold:
+                return i
+        return -1
+else:
+    _first_above_jit = None
+
+
+def first_above(
+    matrix: np.ndarray, query: np.ndarray, scales: np.ndarray,
+    date_ts: np.ndarray, since_ts: int, threshold: float,
+) -> int:
+    """since_ts 이후 행 중 (matrix[i] @ query) * scales[i] >= threshold인 첫 행 번호 (없으면 -1)
+
+    numba가 있으면 내적·임계값 비교·조기 종료를 한 번의 순회로 처리하고
+    (중간 배열 없음), 없거나 float16 행렬이면 numpy로 계산한다.
+    """
+    if _first_above_jit is not None and matrix.dtype != np.float16:
+        return int(_first_above_jit(matrix, query, scales, date_ts, since_ts, threshold))
+    return _first_above_numpy(matrix, query, scales, date_ts, since_ts, threshold)
+
+
+def warm_up(dtype: str, dim: int) -> None:
+    """첫 메시지에서 JIT 컴파일 지연이 생기지 않도록 미리 컴파일"""
+    matrix = np.zeros((1, dim), dtype=dtype)
+    first_above(
+        matrix, np.zeros(dim, dtype=np.float32), np.ones(1, dtype=np.float32),
+        np.zeros(1, dtype=np.int64), 0, 1.0,
+    )
@@ -1,15 +1,39 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import queue
 import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
 from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Iterable, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 import logging
 
+from app.json_utils import dumps_str, loads
+
 logger = logging.getLogger("app.storage")
 
+# 임베딩이 없는 행의 embedding 값
+EMPTY_EMBEDDING = b""
+
+
+def pack_embedding(embedding: Sequence[float]) -> bytes:
+    """임베딩을 float32 바이트열로 직렬화 (BLOB 저장용, JSON 대비 약 1/5 크기)"""
+    return array("f", embedding).tobytes()
+
+
+def _unpack_embedding(value: Union[bytes, str]) -> Sequence[float]:
+    """저장된 임베딩 복원 (float32 BLOB, 이전 버전의 JSON 문자열도 허용)"""
+    if isinstance(value, (bytes, memoryview)):
+        vector = array("f")
+        vector.frombytes(value)
+        return vector
+    return loads(value)
+
 
 @dataclass
 class MessageRecord:
@@ -19,7 +43,7 @@ class MessageRecord:
     date_ts: int
     author: Optional[str]
     text: str
-    embedding: str  # JSON 형태의 임베딩 벡터
+    embedding: bytes  # float32 임베딩 벡터 (BLOB)
     text_hash: str  # 원본 텍스트의 해시값 (중복 제거용)
     importance: str
     categories: str
@@ -53,19 +77,131 @@ class MoneyMessageRecord:
     summary: str
 
 
-class SQLiteStore:
-    def __init__(self, db_path: str) -> None:
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+# 메시지마다 실행되는 SQL (같은 문자열 객체를 재사용하여 연결별 prepared statement 캐시 적중)
+# 분석이 끝난 메시지 행 기록 (이미 있으면 덮어씀, 예: 처리 완료 표시만 된 행)
+_SAVE_MESSAGE_SQL = """
+    INSERT INTO messages (
+        chat_id, message_id, date_ts, author, text, original_text, embedding, text_hash,
+        importance, categories, tags, summary, money_making_info, action_guide, event_products, original_link
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(chat_id, message_id) DO UPDATE SET
+        date_ts = excluded.date_ts, author = excluded.author, text = excluded.text,
+        original_text = excluded.original_text, embedding = excluded.embedding, text_hash = excluded.text_hash,
+        importance = excluded.importance, categories = excluded.categories, tags = excluded.tags,
+        summary = excluded.summary, money_making_info = excluded.money_making_info,
+        action_guide = excluded.action_guide, event_products = excluded.event_products,
+        original_link = excluded.original_link
+"""
+_FIND_EXACT_DUPLICATE_SQL = """
+    SELECT chat_id, message_id
+    FROM messages
+    WHERE date_ts >= ? AND text_hash = ?
+    ORDER BY date_ts DESC
+    LIMIT 1
+"""
+_MESSAGE_EXISTS_SQL = "SELECT 1 FROM messages WHERE chat_id = ? AND message_id = ? LIMIT 1"
+_MARK_PROCESSED_SQL = """
+    INSERT OR IGNORE INTO messages (
+        chat_id, message_id, date_ts, author, text, original_text, forward_text,
+        image_paths, forward_info, embedding, importance, categories, tags, summary,
+        money_making_info, action_guide, event_products, text_hash, original_link
+    ) VALUES (?, ?, 0, NULL, '', '', '', '[]', '{}', '[]', 'low', '', '', '', '', '', '', '', '')
+"""
+
+
+class _ConnectionPool:
+    """재사용 sqlite3 읽기 연결 풀 + 단일 쓰기 연결 (PRAGMA는 연결 생성 시 한 번만 적용)"""
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+    )
+
+    def __init__(self, db_path: str, size: int = 4) -> None:
         self.db_path = db_path
-        self._init_db()
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._write_lock = threading.Lock()
+        self._write_conn: Optional[sqlite3.Connection] = None
+
+    def _create(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
 
     @contextmanager
-    def connect(self):
-        conn = sqlite3.connect(self.db_path)
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._create()
         try:
             yield conn
         finally:
-            conn.close()
+            # 커밋되지 않은 트랜잭션은 다음 사용자에게 넘기지 않음
+            if conn.in_transaction:
+                conn.rollback()
+            if self._idle.qsize() < self.size:
+                self._idle.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def writer(self):
+        """단일 쓰기 연결 (스레드 간 잠금으로 직렬화, 쓰기끼리 SQLITE_BUSY 재시도 대기 없이 순서대로 처리)"""
+        with self._write_lock:
+            if self._write_conn is None:
+                self._write_conn = self._create()
+            try:
+                yield self._write_conn
+            finally:
+                if self._write_conn.in_transaction:
+                    self._write_conn.rollback()
+
+    def close(self) -> None:
+        with self._write_lock:
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SQLiteStore:
+    def __init__(self, db_path: str, embedding_dtype: str = "float32") -> None:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.embedding_dtype = embedding_dtype
+        self._pool = _ConnectionPool(db_path)
+        from app.embedding_index import RecentEmbeddingIndex
+
+        # 최근 임베딩 메모리 캐시 (생성 시 dtype 검증, DB의 최근 임베딩은 첫 조회 때 적재)
+        self._embedding_index = RecentEmbeddingIndex(capacity=1000, dtype=embedding_dtype)
+        self._embedding_index_loaded = False
+        self._embedding_index_lock = threading.Lock()
+        # 중복 검사를 통과해 처리 중인 메시지의 텍스트 해시 (행이 기록되기 전에도 동시 메시지의 중복 검사에 사용)
+        self._claimed_hashes: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
+        self._claim_lock = threading.Lock()
+        self._init_db()
+
+    def connect(self):
+        """풀에서 연결을 빌려 쓰고 반환하는 컨텍스트 매니저 (읽기용, WAL에서 쓰기와 병렬 실행)"""
+        return self._pool.connection()
+
+    def connect_write(self):
+        """단일 쓰기 연결을 잠그고 쓰는 컨텍스트 매니저"""
+        return self._pool.writer()
+
+    def close(self) -> None:
+        self._pool.close()
 
     def _init_db(self) -> None:
         with self.connect() as conn:
@@ -143,7 +279,7 @@ class SQLiteStore:
                     event_products TEXT NOT NULL DEFAULT '',
                     image_paths TEXT NOT NULL DEFAULT '[]',
                     forward_info TEXT NOT NULL DEFAULT '{}',
-                    embedding TEXT NOT NULL DEFAULT '[]',
+                    embedding BLOB NOT NULL DEFAULT X'',
                     text_hash TEXT NOT NULL DEFAULT '',
                     original_link TEXT NOT NULL DEFAULT '',
                     importance TEXT NOT NULL,
@@ -196,6 +332,38 @@ class SQLiteStore:
             c.execute("CREATE INDEX IF NOT EXISTS idx_money_messages_chat_id ON money_messages(chat_id)")
             c.execute("CREATE INDEX IF NOT EXISTS idx_money_messages_importance ON money_messages(importance)")
             
+            # LLM 분석 결과 캐시 테이블 (재시작 후에도 유지)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    text_sha TEXT PRIMARY KEY,
+                    result_json TEXT NOT NULL,
+                    ts INTEGER NOT NULL
+                )
+            """)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_ts ON analysis_cache(ts)")
+            
+            # 채널 메타데이터 캐시 테이블 (재시작 후 get_entity 재호출 방지)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS channel_meta (
+                    chat_id INTEGER PRIMARY KEY,
+                    title TEXT,
+                    username TEXT,
+                    internal_id INTEGER,
+                    is_public INTEGER NOT NULL,
+                    updated_ts INTEGER NOT NULL
+                )
+            """)
+            
+            # 최근 처리한 미디어의 OCR 결과 (같은 이미지 재포워딩 시 다운로드/OCR 생략)
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS media_seen (
+                    media_key TEXT PRIMARY KEY,
+                    ocr_text TEXT NOT NULL,
+                    ts INTEGER NOT NULL
+                )
+            """)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_media_seen_ts ON media_seen(ts)")
+            
             # 채널별 최신 메시지 ID 추적 테이블 생성
             c.execute("""
                 CREATE TABLE IF NOT EXISTS channel_last_message_ids (
@@ -219,7 +387,7 @@ class SQLiteStore:
                         forward_text TEXT NOT NULL DEFAULT '',
                         image_paths TEXT NOT NULL DEFAULT '[]',
                         forward_info TEXT NOT NULL DEFAULT '{}',
-                        embedding TEXT NOT NULL DEFAULT '[]',
+                        embedding BLOB NOT NULL DEFAULT X'',
                         importance TEXT NOT NULL,
                         categories TEXT NOT NULL,
                         tags TEXT NOT NULL,
@@ -272,6 +440,9 @@ class SQLiteStore:
                     if "duplicate column name" not in str(e).lower():
                         logger.warning(f"forward_info 컬럼 추가 실패: {e}")
             
+            # 정확한 중복 검사용 (text_hash 일치 행만 조회, 시간 창의 모든 행을 훑지 않음)
+            c.execute("CREATE INDEX IF NOT EXISTS idx_messages_text_hash ON messages(text_hash, date_ts)")
+            
             conn.commit()
 
     def _migrate_schema(self, c, table_exists: bool) -> bool:
@@ -345,217 +516,105 @@ class SQLiteStore:
         
         return table_exists
 
-    def insert_message(
-        self,
-        chat_id: int,
-        message_id: int,
-        date_ts: int,
-        author: Optional[str],
-        text: str,
-        original_text: str = "",  # 원본 텍스트
-        forward_text: str = "",  # 포워드 텍스트
-        image_paths: str = "[]",  # 이미지 경로들 (JSON 형태)
-        forward_info: str = "{}",  # 포워드 정보 (JSON 형태)
-        embedding_value: str = "[]",  # JSON 형태의 임베딩 벡터
-        text_hash: str = "",  # 원본 텍스트의 해시값
-        importance: Optional[str] = None,
-        categories: Optional[str] = None,
-        tags: Optional[str] = None,
-        summary: Optional[str] = None,
-        original_link: Optional[str] = None,
-    ) -> int:
-        # 디버깅: 값 타입과 크기 확인
-        logger = logging.getLogger("app.storage")
-        logger.debug(f"insert_message 호출: chat_id={chat_id} (타입: {type(chat_id)}), message_id={message_id} (타입: {type(message_id)})")
-        
-        # chat_id와 message_id가 정수인지 확인하고 bit_length 호출
-        if isinstance(chat_id, int):
-            logger.debug(f"chat_id 크기: {chat_id.bit_length()} bits")
-        else:
-            logger.warning(f"chat_id가 정수가 아님: {chat_id} (타입: {type(chat_id)})")
-            
-        if isinstance(message_id, int):
-            logger.debug(f"message_id 크기: {message_id.bit_length()} bits")
-        else:
-            logger.warning(f"message_id가 정수가 아님: {message_id} (타입: {type(message_id)})")
-        
-        # SQLite INTEGER 범위 확인 (chat_id, message_id만)
-        max_sqlite_int = 2**63 - 1
-        if isinstance(chat_id, int) and isinstance(message_id, int):
-            if chat_id > max_sqlite_int or message_id > max_sqlite_int:
-                logger.error(f"SQLite INTEGER 범위 초과: chat_id={chat_id}, message_id={message_id}, 최대값={max_sqlite_int}")
-                raise OverflowError(f"SQLite INTEGER 범위 초과: chat_id={chat_id}, message_id={message_id}")
-        else:
-            logger.error(f"chat_id 또는 message_id가 정수가 아님: chat_id={chat_id} (타입: {type(chat_id)}), message_id={message_id} (타입: {type(message_id)})")
-            raise ValueError(f"chat_id와 message_id는 정수여야 함: chat_id={chat_id}, message_id={message_id}")
-        
-        with self.connect() as conn:
-            c = conn.cursor()
-            try:
-                c.execute(
-                    """
-                    INSERT OR IGNORE INTO messages (
-                        chat_id, message_id, date_ts, author, text, original_text, forward_text, image_paths, forward_info, embedding, text_hash, importance, categories, tags, summary, original_link
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        chat_id,
-                        message_id,
-                        date_ts,
-                        author,
-                        text,
-                        original_text,  # 원본 텍스트
-                        "",  # forward_text (기본값)
-                        "[]",  # image_paths (기본값)
-                        "{}",  # forward_info (기본값)
-                        embedding_value,  # JSON 형태의 임베딩 벡터
-                        text_hash,  # 원본 텍스트의 해시값
-                        importance,
-                        categories,
-                        tags,
-                        summary,
-                        original_link,
-                    ),
-                )
-                conn.commit()
-                logger.debug(f"메시지 저장 성공: chat_id={chat_id}, message_id={message_id}")
-                return c.lastrowid
-            except Exception as e:
-                logger.error(f"메시지 저장 실패: chat_id={chat_id}, message_id={message_id}, 에러: {e}")
-                raise
+    def save_messages(self, rows: Sequence[Tuple]) -> None:
+        """분석이 끝난 메시지 여러 건을 한 트랜잭션으로 UPSERT (행 순서는 _SAVE_MESSAGE_SQL 컬럼 순서)
 
-    def update_analysis(
-        self,
-        chat_id: int,
-        message_id: int,
-        importance: str,
-        categories: str,
-        tags: str,
-        summary: str,
-        money_making_info: str,
-        action_guide: str,
-        event_products: str,
-        original_link: str,
-    ) -> None:
-        with self.connect() as conn:
-            c = conn.cursor()
-            c.execute(
-                """
-                UPDATE messages 
-                SET importance = ?, categories = ?, tags = ?, summary = ?, money_making_info = ?, action_guide = ?, event_products = ?, original_link = ?
-                WHERE chat_id = ? AND message_id = ?
-                """,
-                (importance, categories, tags, summary, money_making_info, action_guide, event_products, original_link, chat_id, message_id),
-            )
+        임베딩 인덱스 등록은 중복 검사 시점에 claim_similar가 이미 수행하므로 여기서는 하지 않는다.
+        """
+        with self.connect_write() as conn:
+            conn.executemany(_SAVE_MESSAGE_SQL, rows)
             conn.commit()
 
-    def find_recent_similar(
-        self, embedding_value: str, since_ts: int, similarity_threshold: float, embedding_client
-    ) -> Optional[Tuple[int, int, float]]:
-        """임베딩 벡터를 사용하여 유사한 메시지를 찾습니다."""
-        import json
-        
+    def _get_embedding_index(self, since_ts: int):
+        """최근 임베딩 캐시 (처음 호출 시 DB의 최근 메시지로 채움)"""
+        index = self._embedding_index
+        if self._embedding_index_loaded:
+            return index
+
+        with self._embedding_index_lock:
+            if not self._embedding_index_loaded:
+                self._load_embedding_index(since_ts)
+                self._embedding_index_loaded = True
+        return index
+
+    def _load_embedding_index(self, since_ts: int) -> None:
+        """DB의 최근 임베딩을 메모리 캐시에 적재"""
+        index = self._embedding_index
         with self.connect() as conn:
             c = conn.cursor()
             c.execute(
                 """
-                SELECT chat_id, message_id, embedding
+                SELECT chat_id, message_id, date_ts, embedding
                 FROM messages
-                WHERE date_ts >= ? AND embedding != '[]'
+                WHERE date_ts >= ? AND length(embedding) > 0 AND embedding != '[]'
                 ORDER BY date_ts DESC
-                LIMIT 1000
+                LIMIT ?
                 """,
-                (since_ts,),
+                (since_ts, index.capacity),
             )
             rows = c.fetchall()
 
-        try:
-            current_embedding = json.loads(embedding_value)
-        except (ValueError, TypeError) as e:
-            logger = logging.getLogger("app.storage")
-            logger.error(f"현재 임베딩 파싱 실패: {e}")
-            return None
-
-        best: Optional[Tuple[int, int, float]] = None
-        best_similarity = 0.0
-        
-        for chat_id, message_id, stored_embedding_json in rows:
+        # 오래된 것부터 넣어 링 버퍼 순서를 시간순으로 유지
+        for chat_id, message_id, date_ts, stored_embedding in reversed(rows):
             try:
-                # 저장된 임베딩 벡터 파싱
-                stored_embedding = json.loads(stored_embedding_json)
-                
-                # 코사인 유사도 계산
-                similarity = embedding_client.cosine_similarity(current_embedding, stored_embedding)
-                
-                if similarity >= similarity_threshold and similarity > best_similarity:
-                    best = (chat_id, message_id, similarity)
-                    best_similarity = similarity
-                    
+                index.add(chat_id, message_id, date_ts, _unpack_embedding(stored_embedding))
             except (ValueError, TypeError) as e:
-                # 파싱 실패 시 로그 기록하고 건너뛰기
-                logger = logging.getLogger("app.storage")
-                logger.warning(f"저장된 임베딩 파싱 실패: {stored_embedding_json}, 에러: {e}")
-                continue
-                
-        return best
+                logger.warning(f"저장된 임베딩 파싱 실패: chat_id={chat_id}, msg_id={message_id}, 에러: {e}")
 
     def find_exact_duplicate(self, text_hash: str, since_ts: int) -> Optional[Tuple[int, int]]:
         """텍스트 해시를 사용하여 정확한 중복 메시지를 찾습니다."""
         with self.connect() as conn:
-            c = conn.cursor()
-            c.execute(
-                """
-                SELECT chat_id, message_id
-                FROM messages
-                WHERE date_ts >= ? AND text_hash = ?
-                ORDER BY date_ts DESC
-                LIMIT 1
-                """,
-                (since_ts, text_hash),
-            )
-            row = c.fetchone()
+            row = conn.execute(_FIND_EXACT_DUPLICATE_SQL, (since_ts, text_hash)).fetchone()
             return row if row else None
 
+    def claim_text_hash(
+        self, text_hash: str, since_ts: int, chat_id: int, message_id: int, date_ts: int
+    ) -> Optional[Tuple[int, int]]:
+        """since_ts 이후 같은 텍스트 해시가 있으면 (chat_id, message_id) 반환, 없으면 이 메시지로 등록 (검사와 등록을 한 잠금 안에서 수행)"""
+        with self._claim_lock:
+            # 중복 제거 기간이 지난 등록은 앞에서부터 정리 (등록 순서 = 시간순)
+            while self._claimed_hashes and next(iter(self._claimed_hashes.values()))[2] < since_ts:
+                self._claimed_hashes.popitem(last=False)
+            claimed = self._claimed_hashes.get(text_hash)
+            if claimed is not None:
+                return claimed[0], claimed[1]
+            duplicate = self.find_exact_duplicate(text_hash, since_ts)
+            if duplicate is None:
+                self._claimed_hashes[text_hash] = (chat_id, message_id, date_ts)
+            return duplicate
+
+    def claim_similar(
+        self,
+        embedding_value: bytes,
+        since_ts: int,
+        similarity_threshold: float,
+        chat_id: int,
+        message_id: int,
+        date_ts: int,
+    ) -> Optional[Tuple[int, int, float]]:
+        """최근 메시지 중 임베딩 유사도가 임계값 이상인 (chat_id, message_id, similarity) 반환, 없으면 이 임베딩을 바로 인덱스에 등록"""
+        try:
+            current_embedding = _unpack_embedding(embedding_value)
+        except (ValueError, TypeError) as e:
+            logger.error(f"현재 임베딩 파싱 실패: {e}")
+            return None
+
+        index = self._get_embedding_index(since_ts)
+        return index.search_or_add(chat_id, message_id, date_ts, current_embedding, since_ts, similarity_threshold)
+
     def is_message_processed(self, chat_id: int, message_id: int) -> bool:
         """메시지가 이미 처리되었는지 확인합니다."""
         with self.connect() as conn:
-            c = conn.cursor()
-            c.execute(
-                """
-                SELECT COUNT(*)
-                FROM messages
-                WHERE chat_id = ? AND message_id = ?
-                """,
-                (chat_id, message_id),
-            )
-            count = c.fetchone()[0]
-            return count > 0
+            return conn.execute(_MESSAGE_EXISTS_SQL, (chat_id, message_id)).fetchone() is not None
 
     def mark_message_processed(self, chat_id: int, message_id: int) -> None:
         """메시지를 처리됨으로 표시합니다 (중복 방지용)."""
         try:
-            with self.connect() as conn:
-                c = conn.cursor()
-                # 먼저 메시지가 이미 존재하는지 확인
-                c.execute(
-                    "SELECT COUNT(*) FROM messages WHERE chat_id = ? AND message_id = ?",
-                    (chat_id, message_id)
-                )
-                count = c.fetchone()[0]
-                
-                if count == 0:
-                    # 메시지가 없으면 새로 삽입
-                    c.execute(
-                        """
-                        INSERT INTO messages (
-                            chat_id, message_id, date_ts, author, text, original_text, forward_text, 
-                            image_paths, forward_info, embedding, importance, categories, tags, summary,
-                            money_making_info, action_guide, event_products, text_hash, original_link
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (chat_id, message_id, 0, None, "", "", "", "[]", "{}", "[]", "low", "", "", "", "", "", "", "", ""),
-                    )
-                    conn.commit()
+            with self.connect_write() as conn:
+                # 메시지가 없을 때만 삽입 (UNIQUE(chat_id, message_id)로 존재 확인과 삽입을 한 문장에서 처리)
+                c = conn.execute(_MARK_PROCESSED_SQL, (chat_id, message_id))
+                conn.commit()
+                if c.rowcount:
                     logger.debug(f"메시지 처리 완료 표시: chat_id={chat_id}, message_id={message_id}")
                 else:
                     logger.debug(f"이미 처리된 메시지: chat_id={chat_id}, message_id={message_id}")
@@ -619,9 +678,7 @@ class SQLiteStore:
         summary: str,
     ) -> int:
         """돈버는 정보가 있는 메시지를 별도 테이블에 저장"""
-        import json
-        
-        with self.connect() as conn:
+        with self.connect_write() as conn:
             c = conn.cursor()
             try:
                 c.execute(
@@ -643,9 +700,9 @@ class SQLiteStore:
                         money_making_info,
                         action_guide,
                         event_products,
-                        json.dumps(image_paths),
-                        json.dumps(forward_info),
-                        "[]",  # embedding (기본값)
+                        dumps_str(image_paths),
+                        dumps_str(forward_info),
+                        EMPTY_EMBEDDING,  # embedding (기본값)
                         "",  # text_hash (기본값)
                         original_link,
                         importance,
@@ -663,8 +720,12 @@ class SQLiteStore:
 
     def get_money_messages(self, limit: int = 100) -> list[MoneyMessageRecord]:
         """저장된 돈버는 정보 메시지들을 조회"""
-        import json
-        
+        return list(self.iter_money_messages(limit=limit))
+
+    def iter_money_messages(
+        self, limit: Optional[int] = None, batch_size: int = 200
+    ) -> Iterator[MoneyMessageRecord]:
+        """돈버는 정보 메시지를 최신순으로 batch_size개씩 읽어 하나씩 반환 (limit이 None이면 전체)"""
         with self.connect() as conn:
             c = conn.cursor()
             c.execute(
@@ -676,45 +737,82 @@ class SQLiteStore:
                 ORDER BY date_ts DESC
                 LIMIT ?
                 """,
-                (limit,),
+                (-1 if limit is None else limit,),
             )
-            rows = c.fetchall()
-            
-            records = []
-            for row in rows:
-                try:
-                    record = MoneyMessageRecord(
-                        id=row[0],
-                        chat_id=row[1],
-                        message_id=row[2],
-                        date_ts=row[3],
-                        author=row[4],
-                        text=row[5],  # text는 5번째 컬럼
-                        original_text=row[6],  # original_text는 6번째 컬럼
-                        forward_text=row[7],
-                        money_making_info=row[8],
-                        action_guide=row[9],
-                        event_products=row[10],
-                        image_paths=row[11],
-                        forward_info=row[12],
-                        original_link=row[15],  # original_link는 15번째 컬럼
-                        importance=row[16],
-                        categories=row[17],
-                        tags=row[18],
-                        summary=row[19],
-                    )
-                    records.append(record)
-                except Exception as e:
-                    logger.warning(f"돈버는 정보 메시지 레코드 파싱 실패: {e}")
-                    continue
-                    
-            return records
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    try:
+                        record = MoneyMessageRecord(
+                            id=row[0],
+                            chat_id=row[1],
+                            message_id=row[2],
+                            date_ts=row[3],
+                            author=row[4],
+                            text=row[5],  # text는 5번째 컬럼
+                            original_text=row[6],  # original_text는 6번째 컬럼
+                            forward_text=row[7],
+                            money_making_info=row[8],
+                            action_guide=row[9],
+                            event_products=row[10],
+                            image_paths=row[11],
+                            forward_info=row[12],
+                            original_link=row[15],  # original_link는 15번째 컬럼
+                            importance=row[16],
+                            categories=row[17],
+                            tags=row[18],
+                            summary=row[19],
+                        )
+                    except Exception as e:
+                        logger.warning(f"돈버는 정보 메시지 레코드 파싱 실패: {e}")
+                        continue
+                    yield record
+
+    def _count_money_csv_values(self, c, column: str, limit: int) -> Dict[str, int]:
+        """쉼표로 구분된 컬럼(categories/tags)을 재귀 CTE로 분리하여 값별 개수 상위 limit개 집계"""
+        c.execute(
+            f"""
+            WITH RECURSIVE split(value, rest) AS (
+                SELECT '', {column} || ',' FROM money_messages WHERE {column} IS NOT NULL AND {column} != ''
+                UNION ALL
+                SELECT trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+                FROM split WHERE rest != ''
+            )
+            SELECT value, COUNT(*) AS count FROM split
+            WHERE value != ''
+            GROUP BY value
+            ORDER BY count DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return {row[0]: row[1] for row in c.fetchall()}
+
+    def get_money_stats(self, top_n: int = 10) -> dict:
+        """돈버는 정보 메시지 통계 (전체 개수, 중요도별, 카테고리/태그별 상위 top_n개)"""
+        with self.connect() as conn:
+            c = conn.cursor()
+            c.execute("""
+                SELECT importance, COUNT(*) as count
+                FROM money_messages
+                GROUP BY importance
+                ORDER BY count DESC
+            """)
+            importance = {row[0]: row[1] for row in c.fetchall()}
+            return {
+                "total": sum(importance.values()),
+                "importance": importance,
+                "categories": self._count_money_csv_values(c, "categories", top_n),
+                "tags": self._count_money_csv_values(c, "tags", top_n),
+            }
 
     def get_recent_message_count(self, seconds: int) -> int:
         """최근 N초 내 메시지 개수를 반환"""
         with self.connect() as conn:
             c = conn.cursor()
-            current_ts = int(datetime.utcnow().timestamp())
+            current_ts = int(time.time())
             since_ts = current_ts - seconds
             c.execute("SELECT COUNT(*) FROM messages WHERE date_ts >= ?", (since_ts,))
             return c.fetchone()[0]
@@ -758,9 +856,9 @@ class SQLiteStore:
                 except Exception as conv_err:
                     logger.error(f"update_channel_last_message_id 형변환 실패: message_id={message_id}, 오류={conv_err}")
                     return
-            with self.connect() as conn:
+            with self.connect_write() as conn:
                 c = conn.cursor()
-                current_ts = int(datetime.utcnow().timestamp())
+                current_ts = int(time.time())
                 c.execute(
                     """
                     INSERT OR REPLACE INTO channel_last_message_ids (chat_id, last_message_id, updated_at)
@@ -774,6 +872,96 @@ class SQLiteStore:
             logger.error(f"update_channel_last_message_id 오류: chat_id={chat_id}, message_id={message_id}, 오류={e}")
             # 오류가 발생해도 봇이 계속 동작하도록 예외를 다시 발생시키지 않음
 
+    def load_analysis_cache(self, since_ts: int, limit: int) -> List[Tuple[str, str, int]]:
+        """since_ts 이후 저장된 LLM 분석 캐시 항목을 최신순으로 반환"""
+        with self.connect() as conn:
+            c = conn.cursor()
+            c.execute(
+                """
+                SELECT text_sha, result_json, ts
+                FROM analysis_cache
+                WHERE ts >= ?
+                ORDER BY ts DESC
+                LIMIT ?
+                """,
+                (since_ts, limit),
+            )
+            return c.fetchall()
+
+    def save_analysis_cache(self, text_sha: str, result_json: str, ts: int) -> None:
+        """LLM 분석 결과를 캐시 테이블에 저장 (같은 키는 갱신)"""
+        with self.connect_write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (text_sha, result_json, ts) VALUES (?, ?, ?)",
+                (text_sha, result_json, ts),
+            )
+            conn.commit()
+
+    def prune_analysis_cache(self, before_ts: int) -> int:
+        """만료된 LLM 분석 캐시 항목 삭제"""
+        with self.connect_write() as conn:
+            c = conn.execute("DELETE FROM analysis_cache WHERE ts < ?", (before_ts,))
+            conn.commit()
+            return c.rowcount
+
+    def load_channel_meta(self, chat_id: int, since_ts: int) -> Optional[dict]:
+        """since_ts 이후 저장된 채널 메타데이터 반환 (없거나 만료되면 None)"""
+        with self.connect() as conn:
+            row = conn.execute(
+                """
+                SELECT title, username, internal_id, is_public
+                FROM channel_meta
+                WHERE chat_id = ? AND updated_ts >= ?
+                """,
+                (chat_id, since_ts),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "chat_id": chat_id,
+            "title": row[0],
+            "username": row[1],
+            "internal_id": row[2],
+            "is_public": bool(row[3]),
+        }
+
+    def save_channel_meta(self, meta: dict, ts: int) -> None:
+        """채널 메타데이터 저장 (같은 chat_id는 갱신)"""
+        with self.connect_write() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO channel_meta (chat_id, title, username, internal_id, is_public, updated_ts)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (meta["chat_id"], meta["title"], meta["username"], meta["internal_id"], int(meta["is_public"]), ts),
+            )
+            conn.commit()
+
+    def load_media_ocr(self, media_key: str, since_ts: int) -> Optional[str]:
+        """since_ts 이후 처리한 미디어의 OCR 텍스트 반환 (텍스트 없는 이미지는 "", 처음 보는 미디어는 None)"""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT ocr_text FROM media_seen WHERE media_key = ? AND ts >= ?",
+                (media_key, since_ts),
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_media_ocr(self, media_key: str, ocr_text: str, ts: int) -> None:
+        """미디어 OCR 결과 저장 (같은 키는 갱신)"""
+        with self.connect_write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO media_seen (media_key, ocr_text, ts) VALUES (?, ?, ?)",
+                (media_key, ocr_text, ts),
+            )
+            conn.commit()
+
+    def prune_media_seen(self, before_ts: int) -> int:
+        """만료된 미디어 OCR 기록 삭제"""
+        with self.connect_write() as conn:
+            c = conn.execute("DELETE FROM media_seen WHERE ts < ?", (before_ts,))
+            conn.commit()
+            return c.rowcount
+
     def get_all_channel_last_message_ids(self) -> Dict[int, int]:
         """모든 채널의 마지막 메시지 ID를 반환합니다."""
         try:
@@ -792,3 +980,98 @@ class SQLiteStore:
             return {}
 
 
+# AnalysisWriter 배치 기록 시도 횟수
+WRITE_RETRIES = 3
+
+
+class AnalysisWriter:
+    """분석이 끝난 메시지 기록 요청을 모아 한 트랜잭션으로 UPSERT하는 단일 writer (커밋/fsync 횟수를 배치 단위로 줄임)"""
+
+    def __init__(self, store: SQLiteStore, max_batch: int = 50, max_wait_ms: int = 100) -> None:
+        self.store = store
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._pending: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def save_message(
+        self,
+        chat_id: int,
+        message_id: int,
+        date_ts: int,
+        author: Optional[str],
+        text: str,
+        original_text: str,
+        embedding_value: bytes,
+        text_hash: str,
+        importance: str,
+        categories: str,
+        tags: str,
+        summary: str,
+        money_making_info: str,
+        action_guide: str,
+        event_products: str,
+        original_link: str,
+    ) -> None:
+        """메시지 행과 분석 결과 기록 요청을 큐에 넣음 (기록은 writer 작업이 배치로 수행)"""
+        if self._pending is None:
+            self._pending = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+        await self._pending.put((
+            chat_id, message_id, date_ts, author, text, original_text, embedding_value, text_hash,
+            importance, categories, tags, summary, money_making_info, action_guide, event_products, original_link,
+        ))
+
+    async def aclose(self) -> None:
+        """남은 요청을 모두 기록하고 writer 작업 종료"""
+        if self._task is None or self._task.done():
+            return
+        await self._pending.put(None)
+        await self._task
+        self._task = None
+
+    async def _worker(self) -> None:
+        """max_batch개 또는 max_wait_ms까지 모은 요청을 한 번에 기록 (None은 종료 신호)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._pending.get()
+            if row is None:
+                return
+            batch = [row]
+            closing = False
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._pending.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    closing = True
+                    break
+                batch.append(row)
+
+            await self._write(batch)
+            if closing:
+                return
+
+    async def _write(self, batch: List[Tuple]) -> None:
+        """배치 기록 (실패 시 재시도, 끝내 실패하면 한 건씩 기록하여 문제 행만 남기고 오류 로그)"""
+        for attempt in range(1, WRITE_RETRIES + 1):
+            try:
+                await asyncio.to_thread(self.store.save_messages, batch)
+                logger.debug("메시지 %d건 일괄 기록", len(batch))
+                return
+            except Exception as e:
+                logger.warning(f"메시지 일괄 기록 실패 ({len(batch)}건, 시도 {attempt}/{WRITE_RETRIES}): {e}")
+                if attempt < WRITE_RETRIES:
+                    await asyncio.sleep(attempt)
+
+        for row in batch:
+            try:
+                await asyncio.to_thread(self.store.save_messages, [row])
+            except Exception as e:
+                logger.error(f"메시지 기록 실패, 행 유실: chat_id={row[0]}, message_id={row[1]}, 에러: {e}")
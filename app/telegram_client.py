@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 from telethon import TelegramClient, events, utils, functions
-from telethon.tl.types import Message, Channel, Chat, User
+from telethon.tl.types import Message, Channel, Chat, User, InputDialogPeer
 import aiohttp
 import json
 
+from app.rate_limit import TokenBucket
+
+# 초당 메시지 전송 수 (버스트가 FloodWait로 이어지지 않도록 전송 속도 평탄화)
+SEND_RATE_PER_SEC = 30
+# GetPeerDialogs 한 번에 조회하는 채널 수
+PEER_DIALOGS_BATCH = 100
+
 
 @dataclass
 class ChannelMeta:
@@ -28,14 +35,42 @@ class TG:
     def __init__(self, session: str, api_id: int, api_hash: str, bot_token: str = None) -> None:
         self.client = TelegramClient(session, api_id, api_hash)
         self.bot_token = bot_token
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._send_limiter = TokenBucket(SEND_RATE_PER_SEC)
 
     async def start(self):
         await self.client.start()
         return self
 
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Bot API 호출용 재사용 HTTP 세션"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15, connect=5))
+        return self._http_session
+
+    async def aclose(self) -> None:
+        """Bot API HTTP 세션 종료"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
     def on_new_message(self, handler, chats: Optional[list] = None):
         self.client.add_event_handler(handler, events.NewMessage(chats=chats))
 
+    async def get_top_message_ids(self, entities: Iterable) -> Dict[int, int]:
+        """여러 채널의 최신 메시지 ID를 GetPeerDialogs로 한 번에 조회 (peer_id -> top_message, 대화 목록에 없는 채널은 빠짐)"""
+        entities = list(entities)
+        top_ids: Dict[int, int] = {}
+        for i in range(0, len(entities), PEER_DIALOGS_BATCH):
+            peers = [
+                InputDialogPeer(peer=await self.client.get_input_entity(entity))
+                for entity in entities[i:i + PEER_DIALOGS_BATCH]
+            ]
+            result = await self.client(functions.messages.GetPeerDialogsRequest(peers=peers))
+            for dialog in result.dialogs:
+                top_ids[utils.get_peer_id(dialog.peer)] = dialog.top_message
+        return top_ids
+
     async def iter_channel_meta(self, identifier: str) -> Optional[ChannelMeta]:
         try:
             entity = await self.client.get_entity(identifier)
@@ -143,7 +178,8 @@ class TG:
         )
 
     async def send_html(self, target: str | int, html: str) -> Message:
-        return await self.client.send_message(target, html, parse_mode="html", link_preview=True)
+        async with self._send_limiter:
+            return await self.client.send_message(target, html, parse_mode="html", link_preview=True)
 
     async def get_chat_permissions(self, chat_id: str) -> dict:
         """Bot API를 통해 채팅 권한 정보를 가져옵니다."""
@@ -154,23 +190,23 @@ class TG:
             url = f"https://api.telegram.org/bot{self.bot_token}/getChat"
             params = {"chat_id": chat_id}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("ok"):
-                            result = data.get("result", {})
-                            permissions = result.get("permissions", {})
-                            
-                            return {
-                                "can_send_messages": permissions.get("can_send_messages", False),
-                                "join_to_send_messages": result.get("join_to_send_messages", False),
-                                "chat_type": result.get("type", "unknown"),
-                                "title": result.get("title", ""),
-                                "username": result.get("username", ""),
-                                "linked_chat_id": result.get("linked_chat_id"),
-                                "description": result.get("description", "")
-                            }
+            session = await self._get_http_session()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get("ok"):
+                        result = data.get("result", {})
+                        permissions = result.get("permissions", {})
+                        
+                        return {
+                            "can_send_messages": permissions.get("can_send_messages", False),
+                            "join_to_send_messages": result.get("join_to_send_messages", False),
+                            "chat_type": result.get("type", "unknown"),
+                            "title": result.get("title", ""),
+                            "username": result.get("username", ""),
+                            "linked_chat_id": result.get("linked_chat_id"),
+                            "description": result.get("description", "")
+                        }
             return {}
         except Exception as e:
             print(f"Bot API 호출 실패: {e}")